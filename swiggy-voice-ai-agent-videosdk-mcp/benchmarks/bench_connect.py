@@ -0,0 +1,180 @@
+"""
+Startup benchmark: sequential vs concurrent SwiggyMCPServer.connect().
+
+Runs three local stub MCP servers (food, instamart, dineout) with different
+injected latencies and compares:
+  - sequential: one endpoint after another (the old connect() behaviour)
+  - concurrent: SwiggyMCPServer.connect()
+
+Concurrent connect time should track the slowest handshake, not the sum.
+It then connects `--calls` servers at once (like a busy phone worker) and
+reports how many connections the shared HTTP transport actually opened.
+
+Last, `--calls` servers on one event loop connect to the Swiggy simulator,
+where all three services share one origin as on mcp.swiggy.com, and each
+makes --tool-calls calls per service: once over HTTP/1.1, where every
+session's SSE stream needs its own connection, and once over HTTPS with
+HTTP/2 (needs hypercorn), where everything is multiplexed.
+
+Run: python benchmarks/bench_connect.py [--rounds 5] [--calls 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from http_transport import get_shared_transport, transport_stats  # noqa: E402
+from stub_mcp import start_stub_endpoints  # noqa: E402
+from swiggy_simulator import HYPERCORN_AVAILABLE, SwiggySimulator, seed_token_storage  # noqa: E402
+from swiggy_mcp import (  # noqa: E402
+    FileTokenStorage,
+    SwiggyMCPServer,
+    _ServiceConnection,
+    create_oauth_provider,
+)
+
+LATENCIES = {
+    "swiggy-food": 0.15,
+    "swiggy-instamart": 0.10,
+    "swiggy-dineout": 0.20,
+}
+
+
+def _bench_auth(tmpdir: Path):
+    """OAuth provider backed by a throwaway token file with a dummy token."""
+    token_file = tmpdir / "tokens.json"
+    token_file.write_text(json.dumps({
+        "tokens": {"access_token": "bench", "token_type": "Bearer"},
+    }))
+    return create_oauth_provider(storage=FileTokenStorage(token_file))
+
+
+async def _sequential(endpoints: dict[str, str], auth) -> float:
+    start = time.perf_counter()
+    conns = []
+    for name, url in endpoints.items():
+        conn = _ServiceConnection(name, url, auth)
+        await conn.open(timeout=30)
+        conns.append(conn)
+    elapsed = time.perf_counter() - start
+    for conn in conns:
+        await conn.close()
+    return elapsed
+
+
+async def _concurrent(endpoints: dict[str, str], auth) -> float:
+    server = SwiggyMCPServer(endpoints=endpoints, auth=auth, connect_timeout=30)
+    start = time.perf_counter()
+    await server.connect()
+    elapsed = time.perf_counter() - start
+    await server.disconnect()
+    return elapsed
+
+
+async def _concurrent_calls(endpoints: dict[str, str], auth, calls: int) -> dict:
+    servers = [
+        SwiggyMCPServer(endpoints=endpoints, auth=auth, connect_timeout=30)
+        for _ in range(calls)
+    ]
+    before = transport_stats()["new_connections"]
+    await asyncio.gather(*(server.connect() for server in servers))
+    stats = transport_stats()
+    await asyncio.gather(*(server.disconnect() for server in servers))
+    stats["new_connections"] -= before
+    return stats
+
+
+SHARED_ORIGIN_CALLS = {"swiggy-food": "get_addresses", "swiggy-instamart": "get_cart", "swiggy-dineout": "get_saved_locations"}
+
+
+async def _shared_origin(endpoints: dict[str, str], token_path: Path, calls: int, tool_calls: int) -> dict:
+    auth = create_oauth_provider(storage=FileTokenStorage(token_path))
+    servers = [SwiggyMCPServer(endpoints=endpoints, auth=auth, connect_timeout=30) for _ in range(calls)]
+    await asyncio.gather(*(server.connect() for server in servers))
+    for _ in range(tool_calls):
+        await asyncio.gather(*(
+            server._connections[svc_name].session.call_tool(tool, {})
+            for server in servers for svc_name, tool in SHARED_ORIGIN_CALLS.items()
+        ))
+    transport = get_shared_transport()
+    stats = {**transport.stats.as_dict(), "open_connections": transport.open_connections()}
+    # The last disconnect shuts the loop's transport down.
+    await asyncio.gather(*(server.disconnect() for server in servers))
+    return stats
+
+
+def shared_origin(calls: int, tool_calls: int) -> list[tuple[str, dict]]:
+    rows = []
+    for tls in (False, True):
+        if tls and not HYPERCORN_AVAILABLE:
+            rows.append(("https, HTTP/2", None))
+            continue
+        sim = SwiggySimulator(port=0, latency_scale=0.2, tls=tls).start()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                token_path = Path(tmp) / "tokens.json"
+                seed_token_storage(sim.base_url, token_path, ca_file=sim.ca_file)
+                if tls:
+                    # Trust the simulator's certificate in the shared transport.
+                    os.environ["SSL_CERT_FILE"] = sim.ca_file
+                # A fresh loop gets a fresh shared transport.
+                stats = asyncio.run(_shared_origin(sim.endpoints(), token_path, calls, tool_calls))
+        finally:
+            os.environ.pop("SSL_CERT_FILE", None)
+            sim.stop()
+        rows.append(("https, HTTP/2" if tls else "http, HTTP/1.1", stats))
+    return rows
+
+
+async def main(rounds: int, calls: int):
+    stubs = start_stub_endpoints(LATENCIES)
+    endpoints = {name: stub.url for name, stub in stubs.items()}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            auth = _bench_auth(Path(tmp))
+            await _concurrent(endpoints, auth)  # warm-up
+
+            seq = [await _sequential(endpoints, auth) for _ in range(rounds)]
+            con = [await _concurrent(endpoints, auth) for _ in range(rounds)]
+            pool = await _concurrent_calls(endpoints, auth, calls)
+    finally:
+        for stub in stubs.values():
+            stub.stop()
+
+    print(f"Injected per-request latency: {LATENCIES}")
+    print(f"sequential  median {statistics.median(seq) * 1000:7.1f} ms")
+    print(f"concurrent  median {statistics.median(con) * 1000:7.1f} ms")
+    print(f"speedup     {statistics.median(seq) / statistics.median(con):.2f}x")
+    print(
+        f"{calls} concurrent calls x {len(endpoints)} sessions: "
+        f"{pool['new_connections']} connections opened, "
+        f"{pool['open_connections']} open after connect "
+        f"(http2={pool['http2']}, queue max {pool['queue_ms_max']} ms)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--tool-calls", type=int, default=5, help="calls per service per server (shared origin)")
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.calls))
+
+    print(f"\nshared origin: {args.calls} servers x 3 sessions on one loop, "
+          f"{args.tool_calls} calls per session")
+    print(f"  {'':<16}{'requests':>9}{'opened':>8}{'reuse':>7}{'open at end':>13}{'HTTP/2 reqs':>13}")
+    for label, stats in shared_origin(args.calls, args.tool_calls):
+        if stats is None:
+            print(f"  {label:<16}skipped: pip install hypercorn")
+            continue
+        print(f"  {label:<16}{stats['requests']:>9}{stats['new_connections']:>8}{stats['reuse_ratio']:>7.0%}"
+              f"{stats['open_connections']:>13}{stats['http2_requests']:>13}")
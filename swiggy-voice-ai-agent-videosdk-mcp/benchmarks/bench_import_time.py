@@ -0,0 +1,139 @@
+"""
+Agent startup import cost per mode, from `python -X importtime`.
+
+Each case runs in a fresh interpreter, imports the plugins it needs and
+then swiggy_agent, the way main() and the framework's forkserver do:
+  - eager:      every plugin of every mode (what each agent script
+                imported before there was one entry point)
+  - <mode>:     only MODE_PLUGINS[mode]
+  - core:       swiggy_agent alone, no plugins
+Reported per case (median of --repeat runs): total import time, modules
+imported, wall time of the interpreter, and the packages that take the
+longest to import (their modules' own time, summed). Plugins that are not
+installed are listed and skipped, so cases that differ only by missing
+plugins look the same.
+
+Use --max-ms to fail (exit 1) when a mode's import time goes over a budget,
+e.g. in CI: python benchmarks/bench_import_time.py --max-ms 1500
+
+Run: python benchmarks/bench_import_time.py [--repeat 5] [--top 8]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+SNIPPET = """
+import importlib, json, sys
+missing = []
+for module in {plugins!r}:
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        missing.append(module)
+import swiggy_agent
+print(json.dumps(missing))
+"""
+
+
+def _mode_plugins() -> dict[str, tuple[str, ...]]:
+    # Asked of a child so this process never imports the agent itself.
+    output = subprocess.run(
+        [sys.executable, "-c", "import json, swiggy_agent; print(json.dumps(swiggy_agent.MODE_PLUGINS))"],
+        cwd=AGENT_DIR, capture_output=True, text=True, check=True,
+        env={k: v for k, v in os.environ.items() if k != "SWIGGY_AGENT_MODE"},
+    ).stdout
+    return {mode: tuple(plugins) for mode, plugins in json.loads(output.splitlines()[-1]).items()}
+
+
+def _run(plugins: tuple[str, ...]) -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "SWIGGY_AGENT_MODE"}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(plugins=list(plugins))],
+        cwd=AGENT_DIR, capture_output=True, text=True, env=env,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        tail = [line for line in result.stderr.splitlines() if not line.startswith("import time:")][-5:]
+        raise SystemExit("import failed:\n" + "\n".join(tail))
+
+    total_us, modules = 0, 0
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        modules += 1
+        own, cumulative, indent, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+        if indent == 1:
+            # Top-level imports; nested ones are inside their cumulative time.
+            total_us += cumulative
+        packages[name.split(".")[0]] += own
+    return {
+        "total_ms": total_us / 1000,
+        "modules": modules,
+        "wall_ms": wall * 1000,
+        "packages": packages,
+        "missing": json.loads(result.stdout.splitlines()[-1]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="packages listed per case")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if a mode's import time is over this")
+    args = parser.parse_args()
+
+    mode_plugins = _mode_plugins()
+    every_plugin = tuple(dict.fromkeys(p for plugins in mode_plugins.values() for p in plugins))
+    cases = [("eager", every_plugin), *mode_plugins.items(), ("core", ())]
+
+    results = {}
+    for label, plugins in cases:
+        runs = [_run(plugins) for _ in range(args.repeat)]
+        packages = defaultdict(list)
+        for run in runs:
+            for name, us in run["packages"].items():
+                packages[name].append(us)
+        results[label] = {
+            "total_ms": statistics.median(r["total_ms"] for r in runs),
+            "modules": runs[0]["modules"],
+            "wall_ms": statistics.median(r["wall_ms"] for r in runs),
+            "packages": {name: statistics.median(us) / 1000 for name, us in packages.items()},
+            "missing": runs[0]["missing"],
+        }
+
+    print(f"median of {args.repeat} runs, {sys.executable} {sys.version.split()[0]}\n")
+    print(f"  {'case':<12}{'imports ms':>12}{'modules':>9}{'wall ms':>9}")
+    for label, r in results.items():
+        print(f"  {label:<12}{r['total_ms']:>12.0f}{r['modules']:>9}{r['wall_ms']:>9.0f}")
+
+    for label, r in results.items():
+        top = sorted(r["packages"].items(), key=lambda item: -item[1])[:args.top]
+        print(f"\n  {label}: " + ", ".join(f"{name} {ms:.0f}" for name, ms in top))
+        if r["missing"]:
+            print(f"    not installed, skipped: {', '.join(r['missing'])}")
+
+    if args.max_ms is not None:
+        over = [label for label in mode_plugins if results[label]["total_ms"] > args.max_ms]
+        if over:
+            print(f"\n  over the {args.max_ms:.0f} ms budget: {', '.join(over)}")
+            sys.exit(1)
+        print(f"\n  all modes within the {args.max_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
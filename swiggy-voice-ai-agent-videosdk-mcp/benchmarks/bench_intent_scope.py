@@ -0,0 +1,201 @@
+"""
+Per-turn LLM input size with and without intent scoping.
+
+Connects a SwiggyMCPServer to the in-process simulator, builds a real agent
+with its tools, and replays scripted conversations through IntentScope.
+For every turn it reports the system prompt + tool declarations the LLM
+would be sent (tokens estimated at ~4 bytes each) in full and scoped mode,
+how often the router picked the expected service, and its latency.
+
+With --live (needs google-genai and GOOGLE_API_KEY) each distinct prompt is
+also sent to Gemini --repeats times to count real input tokens and measure
+time to first token.
+
+Run: python benchmarks/bench_intent_scope.py [--live --model gemini-2.5-flash]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from videosdk.agents import Agent, ChatRole  # noqa: E402
+from videosdk.agents.utils import get_tool_info  # noqa: E402
+
+from instructions import SHARED_INSTRUCTIONS, SWIGGY_AGENT_INSTRUCTIONS  # noqa: E402
+from intent_router import IntentRouter, IntentScope  # noqa: E402
+from result_compaction import estimate_tokens  # noqa: E402
+from swiggy_mcp import SwiggyMCPServer, create_oauth_provider  # noqa: E402
+from swiggy_simulator import SwiggySimulator, seed_token_storage  # noqa: E402
+from token_store import FileTokenStorage  # noqa: E402
+from tool_catalog import ToolCatalogCache  # noqa: E402
+
+try:
+    from google import genai
+    from google.genai import types as genai_types
+    from videosdk.agents.utils import build_gemini_schema
+    GENAI_AVAILABLE = True
+except ImportError:
+    GENAI_AVAILABLE = False
+
+# (utterance, service the turn belongs to)
+CONVERSATIONS = {
+    "food": [
+        ("I'm really hungry, can you get me some biryani", "swiggy-food"),
+        ("the home one", "swiggy-food"),
+        ("the second restaurant sounds good", "swiggy-food"),
+        ("add one chicken biryani and a coke", "swiggy-food"),
+        ("any coupons?", "swiggy-food"),
+        ("okay place the order", "swiggy-food"),
+    ],
+    "instamart": [
+        ("I need some groceries", "swiggy-instamart"),
+        ("deliver to office", "swiggy-instamart"),
+        ("two litres of Amul milk and a dozen eggs", "swiggy-instamart"),
+        ("and some Maggi", "swiggy-instamart"),
+        ("what's the total", "swiggy-instamart"),
+        ("checkout please", "swiggy-instamart"),
+    ],
+    "dineout": [
+        ("book a table for four tomorrow night", "swiggy-dineout"),
+        ("somewhere in Indiranagar, north indian", "swiggy-dineout"),
+        ("tell me about the first one", "swiggy-dineout"),
+        ("eight pm works", "swiggy-dineout"),
+        ("yes confirm it", "swiggy-dineout"),
+    ],
+    "switch": [
+        ("order me a pizza", "swiggy-food"),
+        ("home", "swiggy-food"),
+        ("actually I also need groceries, milk and bread", "swiggy-instamart"),
+        ("add both", "swiggy-instamart"),
+        ("and book a table for two on saturday", "swiggy-dineout"),
+    ],
+}
+
+
+class _BenchAgent(Agent):
+    async def on_enter(self):
+        pass
+
+    async def on_exit(self):
+        pass
+
+
+def _prompt(agent: Agent, instructions: str) -> tuple[str, list]:
+    declarations = []
+    for tool in agent.tools:
+        info = get_tool_info(tool)
+        declarations.append({"name": info.name, "description": info.description,
+                             "parameters": info.parameters_schema})
+    return instructions, declarations
+
+
+def _prompt_tokens(instructions: str, declarations: list) -> int:
+    return estimate_tokens(len(instructions.encode()) + len(json.dumps(declarations)))
+
+
+def _system_prompt(agent: Agent) -> str:
+    for item in agent.chat_context.items:
+        if getattr(item, "role", None) == ChatRole.SYSTEM:
+            return item.content[0]
+    return SWIGGY_AGENT_INSTRUCTIONS
+
+
+async def _live_ttft(client, model: str, agent_tools: list, instructions: str, text: str, repeats: int):
+    config = genai_types.GenerateContentConfig(
+        system_instruction=instructions,
+        tools=[genai_types.Tool(function_declarations=[build_gemini_schema(t) for t in agent_tools])],
+    )
+    first_tokens, input_tokens = [], None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        stream = await client.aio.models.generate_content_stream(model=model, contents=text, config=config)
+        async for chunk in stream:
+            first_tokens.append((time.perf_counter() - started) * 1000)
+            if chunk.usage_metadata and chunk.usage_metadata.prompt_token_count:
+                input_tokens = chunk.usage_metadata.prompt_token_count
+            break
+    return statistics.median(first_tokens), input_tokens
+
+
+async def bench(args):
+    sim = SwiggySimulator(port=0, latency_scale=0.0).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_token_storage(sim.base_url, Path(tmp) / "tokens.json")
+        auth = create_oauth_provider(server_url=sim.base_url, storage=FileTokenStorage(Path(tmp) / "tokens.json"))
+        server = SwiggyMCPServer(endpoints=sim.endpoints(), auth=auth, catalog=ToolCatalogCache(path=Path(tmp) / "c.json"))
+        await server.connect()
+        tools = await server.get_available_tools()
+
+        router = IntentRouter()
+        started = time.perf_counter()
+        for _ in range(1000):
+            router.detect("actually I also need groceries, milk and bread")
+        route_us = (time.perf_counter() - started) * 1000
+
+        full_tokens = _prompt_tokens(*_prompt(_BenchAgent(instructions=SWIGGY_AGENT_INSTRUCTIONS, tools=list(tools)),
+                                              SWIGGY_AGENT_INSTRUCTIONS))
+        full_per_turn, scoped_per_turn, routed = [], [], 0
+        live_prompts: dict[str, tuple] = {}
+        print(f"  {'conversation':<14}{'turns':>6}{'full tok/turn':>15}{'scoped tok/turn':>17}{'router ok':>11}")
+        for name, turns in CONVERSATIONS.items():
+            agent = _BenchAgent(instructions=SWIGGY_AGENT_INSTRUCTIONS, tools=list(tools))
+            scope = IntentScope(agent, server, router)
+            tokens, correct = [], 0
+            for text, expected in turns:
+                service = scope.route(text)
+                correct += service == expected
+                instructions = _system_prompt(agent)
+                tokens.append(_prompt_tokens(*_prompt(agent, instructions)))
+                live_prompts.setdefault(service or "full", (list(agent.tools), instructions, text))
+            full_per_turn += [full_tokens] * len(turns)
+            scoped_per_turn += tokens
+            routed += correct
+            print(f"  {name:<14}{len(turns):>6}{full_tokens:>15}{statistics.mean(tokens):>17.0f}"
+                  f"{correct:>7}/{len(turns)}")
+        await server.disconnect()
+    sim.stop()
+
+    saved = 1 - sum(scoped_per_turn) / sum(full_per_turn)
+    print(f"\n  all turns: {statistics.mean(full_per_turn):.0f} -> {statistics.mean(scoped_per_turn):.0f} "
+          f"estimated input tokens per turn before history ({saved:.0%} less)")
+    print(f"  shared prefix: {estimate_tokens(len(SHARED_INSTRUCTIONS.encode()))} tokens, identical in every scope")
+    print(f"  router: {routed}/{len(scoped_per_turn)} turns on the expected service, {route_us:.1f} us per call")
+
+    if not args.live:
+        return
+    if not GENAI_AVAILABLE or not os.environ.get("GOOGLE_API_KEY"):
+        print("\n  --live needs google-genai and GOOGLE_API_KEY; skipped")
+        return
+    client = genai.Client()
+    print(f"\n  live ({args.model}, median of {args.repeats}):")
+    print(f"  {'prompt':<18}{'input tokens':>14}{'first token ms':>16}")
+    first_text = CONVERSATIONS["food"][0][0]
+    ttft, input_tokens = await _live_ttft(client, args.model, list(tools), SWIGGY_AGENT_INSTRUCTIONS,
+                                          first_text, args.repeats)
+    print(f"  {'full':<18}{input_tokens or 0:>14}{ttft:>16.0f}")
+    for service, (agent_tools, instructions, text) in live_prompts.items():
+        if service == "full":
+            continue
+        ttft, input_tokens = await _live_ttft(client, args.model, agent_tools, instructions, text, args.repeats)
+        print(f"  {service:<18}{input_tokens or 0:>14}{ttft:>16.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="also measure real tokens and TTFT on Gemini")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+A 10-ingredient recipe turn: sequential tool calls vs call_tools_parallel.
+
+Starts the Swiggy simulator in-process (real per-tool latency, result cache
+off) and runs --rounds recipe turns, each one search_products per
+ingredient:
+  - sequential: one call after another, as the agent pipelines run the
+    function calls of a model turn
+  - parallel:   one call_tools_parallel call, at each Instamart
+    concurrency limit in --limits
+
+Reports p50/p99 wall time of the whole turn and checks every parallel
+result came back in the order requested.
+
+Run: python benchmarks/bench_parallel_calls.py [--rounds 20] [--limits 1 3 6 10]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from swiggy_mcp import SERVICE_CONCURRENCY, SwiggyMCPServer, create_oauth_provider  # noqa: E402
+from swiggy_simulator import SwiggySimulator, seed_token_storage  # noqa: E402
+from token_store import FileTokenStorage  # noqa: E402
+from tool_cache import ToolResultCache  # noqa: E402
+from tool_catalog import ToolCatalogCache  # noqa: E402
+
+INGREDIENTS = ["basmati rice", "onion", "tomato", "ginger garlic paste", "curd", "ghee",
+               "garam masala", "mint leaves", "saffron", "chicken"]
+SERVICE = "swiggy-instamart"
+
+
+def _pct(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))]
+
+
+def _arguments(round_index: int, ingredient: str) -> dict:
+    # A different address per round keeps every request a real round-trip.
+    return {"addressId": f"addr_{round_index}", "query": ingredient}
+
+
+async def _sequential(server: SwiggyMCPServer, round_index: int) -> float:
+    started = time.perf_counter()
+    for ingredient in INGREDIENTS:
+        await server._call_tool(SERVICE, "search_products", _arguments(round_index, ingredient))
+    return (time.perf_counter() - started) * 1000
+
+
+async def _parallel(server: SwiggyMCPServer, round_index: int) -> float:
+    calls = [{"tool": "search_products", "arguments": json.dumps(_arguments(round_index, ingredient))}
+             for ingredient in INGREDIENTS]
+    started = time.perf_counter()
+    outcome = await server._parallel_calls({"calls": calls})
+    elapsed = (time.perf_counter() - started) * 1000
+    results = outcome["results"]
+    assert [r["tool"] for r in results] == ["search_products"] * len(INGREDIENTS), results
+    assert all("result" in r for r in results), [r.get("error") for r in results]
+    return elapsed
+
+
+async def bench(args):
+    sim = SwiggySimulator(port=0, latency_scale=args.latency_scale).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_token_storage(sim.base_url, Path(tmp) / "tokens.json")
+        auth = create_oauth_provider(server_url=sim.base_url, storage=FileTokenStorage(Path(tmp) / "tokens.json"))
+        server = SwiggyMCPServer(endpoints=sim.endpoints(), auth=auth, catalog=ToolCatalogCache(path=Path(tmp) / "c.json"),
+                                 tool_cache=ToolResultCache(ttls={}))
+        await server.connect()
+        await server.get_available_tools()
+
+        rows = []
+        round_index = 0
+
+        async def run(label: str, turn):
+            nonlocal round_index
+            times = []
+            for _ in range(args.rounds):
+                round_index += 1
+                times.append(await turn(server, round_index))
+            rows.append((label, times))
+
+        await run("sequential", _sequential)
+        for limit in args.limits:
+            server._service_slots[SERVICE] = asyncio.Semaphore(limit)
+            default = " (default)" if limit == SERVICE_CONCURRENCY[SERVICE] else ""
+            await run(f"parallel, limit {limit}{default}", _parallel)
+        await server.disconnect()
+    sim.stop()
+
+    print(f"{len(INGREDIENTS)} search_products calls per turn, {args.rounds} turns each, "
+          f"latency scale {args.latency_scale}\n")
+    print(f"  {'mode':<28}{'p50 ms':>9}{'p99 ms':>9}")
+    for label, times in rows:
+        print(f"  {label:<28}{_pct(times, 50):>9.0f}{_pct(times, 99):>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limits", type=int, nargs="+", default=[1, 3, 6, 10])
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
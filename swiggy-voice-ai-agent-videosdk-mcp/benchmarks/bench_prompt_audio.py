@@ -0,0 +1,135 @@
+"""
+Participant join -> first greeting audio frame, live TTS vs prompt audio.
+
+Stands in for the pipeline with a fake TTS whose first audio chunk arrives
+after --ttfb-ms (jittered +-40%, then 20 ms PCM chunks in real time) and a
+fake session.say() that records when the first frame reaches the audio
+track. Each of --joins sessions runs what on_enter does: build a
+PromptVoice and say GREETING. Modes:
+  - live:        no cached audio, every greeting goes through TTS
+  - cache, disk: a fresh PromptAudioCache per join (a new worker process
+                 reading the files warm() wrote)
+  - cache, memo: one cache shared by all joins (later calls in a worker)
+Filler lines are measured the same way. Also reports how long warm() takes
+for all PROMPT_LINES at worker startup.
+
+Run: python benchmarks/bench_prompt_audio.py [--joins 50] [--ttfb-ms 300]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from filler_speech import FILLER_LINES  # noqa: E402
+from instructions import GREETING  # noqa: E402
+from prompt_audio import PROMPT_LINES, PromptAudioCache, PromptVoice  # noqa: E402
+
+SAMPLE_RATE = 24000
+CHUNK_SECONDS = 0.02
+CHUNK = b"\x00\x00" * int(SAMPLE_RATE * CHUNK_SECONDS)
+
+
+class _FakeTTS:
+    """Streams silence: first chunk after the TTFB, then real-time chunks."""
+
+    def __init__(self, ttfb: float, rng: random.Random):
+        self.ttfb = ttfb
+        self.rng = rng
+        self.voice_id = "bench-voice"
+        self.sample_rate = SAMPLE_RATE
+        self.requests = 0
+
+    async def stream_synthesize(self, text_stream, **kwargs):
+        text = "".join([part async for part in text_stream])
+        self.requests += 1
+        await asyncio.sleep(self.ttfb * self.rng.uniform(0.6, 1.4))
+        # About 14 characters per second of speech.
+        for _ in range(max(1, int(len(text) / 14 / CHUNK_SECONDS))):
+            yield CHUNK
+            await asyncio.sleep(CHUNK_SECONDS)
+
+
+class _FakeSession:
+    """session.say(): the time of the first frame put on the audio track."""
+
+    def __init__(self, tts: _FakeTTS):
+        self.tts = tts
+        self.first_frame: float | None = None
+
+    async def say(self, message: str, interruptible: bool = True, audio_data=None,
+                  add_to_chat_context: bool = True):
+        if audio_data is not None:
+            self.first_frame = time.perf_counter()
+            return
+
+        async def text_stream():
+            yield message
+
+        async for _ in self.tts.stream_synthesize(text_stream()):
+            self.first_frame = time.perf_counter()
+            return
+
+
+async def _first_frame_ms(tts: _FakeTTS, cache: PromptAudioCache, line: str, cached: bool) -> float:
+    session = _FakeSession(tts)
+    joined = time.perf_counter()
+    voice = PromptVoice(session.say, tts if cached else None, cache)
+    await voice.say(line)
+    return (session.first_frame - joined) * 1000
+
+
+def _pct(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))]
+
+
+async def bench(args):
+    rng = random.Random(11)
+    tts = _FakeTTS(args.ttfb_ms / 1000, rng)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "audio"
+        started = time.perf_counter()
+        synthesized = await PromptAudioCache(directory).warm(tts)
+        warm_seconds = time.perf_counter() - started
+        rewarm = await PromptAudioCache(directory).warm(tts)
+        stored = sum(f.stat().st_size for f in directory.glob("*.pcm"))
+
+        live = PromptAudioCache(Path(tmp) / "empty")
+        rows.append(("greeting, live TTS", [await _first_frame_ms(tts, live, GREETING, False)
+                                            for _ in range(args.joins)]))
+        rows.append(("greeting, cache, disk", [await _first_frame_ms(tts, PromptAudioCache(directory), GREETING, True)
+                                               for _ in range(args.joins)]))
+        shared = PromptAudioCache(directory)
+        rows.append(("greeting, cache, memo", [await _first_frame_ms(tts, shared, GREETING, True)
+                                               for _ in range(args.joins)]))
+        rows.append(("filler, live TTS", [await _first_frame_ms(tts, live, rng.choice(FILLER_LINES), False)
+                                          for _ in range(args.joins)]))
+        rows.append(("filler, cache, memo", [await _first_frame_ms(tts, shared, rng.choice(FILLER_LINES), True)
+                                             for _ in range(args.joins)]))
+
+    print(f"{args.joins} joins per mode, fake TTS first byte {args.ttfb_ms:.0f} ms +-40%\n")
+    print(f"  {'join -> first audio frame':<26}{'p50 ms':>9}{'p99 ms':>9}{'mean ms':>9}")
+    for label, times in rows:
+        print(f"  {label:<26}{_pct(times, 50):>9.1f}{_pct(times, 99):>9.1f}{statistics.mean(times):>9.1f}")
+    print(f"\n  warm(): {synthesized} of {len(PROMPT_LINES)} lines in {warm_seconds:.1f}s at startup, "
+          f"{stored / 1024:.0f} KiB on disk; a restart re-synthesized {rewarm}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--joins", type=int, default=50)
+    parser.add_argument("--ttfb-ms", type=float, default=300)
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Micro-benchmark: legacy _sanitize_schema vs the memoized SchemaCompiler.
+
+Builds a large synthetic tool catalog in which, like the real Swiggy
+services, many tools repeat the same address/cart/item sub-schemas, then
+checks both produce identical output and compares:
+  - cold: a fresh compiler (first catalog miss in a worker)
+  - warm: the same catalog again (later sessions in the same worker)
+  - allocations: memory blocks still held after one catalog pass (tracemalloc)
+
+Run: python benchmarks/bench_schema.py [--tools 300] [--rounds 20]
+"""
+
+import argparse
+import copy
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from schema_compiler import SchemaCompiler  # noqa: E402
+
+
+def legacy_sanitize_schema(schema: dict) -> dict:
+    """The sanitizer swiggy_mcp used before SchemaCompiler (reference)."""
+    if not isinstance(schema, dict):
+        return schema
+    cleaned = {}
+    for k, v in schema.items():
+        if isinstance(v, dict):
+            cleaned[k] = legacy_sanitize_schema(v)
+        elif isinstance(v, list) and k == "type":
+            cleaned[k] = v[0] if len(v) == 1 else "string"
+        elif isinstance(v, list) and k == "enum":
+            cleaned[k] = [str(x) for x in v]
+        else:
+            cleaned[k] = v
+    if "properties" in cleaned and isinstance(cleaned["properties"], dict):
+        for prop_name, prop_val in cleaned["properties"].items():
+            cleaned["properties"][prop_name] = legacy_sanitize_schema(prop_val)
+    return cleaned
+
+
+def _address():
+    return {
+        "type": "object",
+        "properties": {
+            "addressId": {"type": ["string"], "description": "Saved address id"},
+            "lat": {"type": ["number", "null"]},
+            "lng": {"type": ["number", "null"]},
+            "label": {"type": "string", "enum": ["Home", "Work", "Other"]},
+        },
+        "required": ["addressId"],
+    }
+
+
+def _item():
+    return {
+        "type": "object",
+        "properties": {
+            "itemId": {"type": "string"},
+            "quantity": {"type": "integer", "minimum": 1, "default": 1},
+            "variant": {
+                "type": "object",
+                "properties": {
+                    "groupId": {"type": "string"},
+                    "variationId": {"type": ["string", "integer"]},
+                },
+            },
+            "addons": {"type": "array", "items": {"type": "object", "properties": {
+                "groupId": {"type": "string"}, "choiceId": {"type": "string"},
+            }}},
+        },
+    }
+
+
+def synthetic_catalog(n_tools: int) -> list[dict]:
+    """Tool input schemas with the kind of repetition the Swiggy servers have."""
+    catalog = []
+    for i in range(n_tools):
+        properties = {
+            "address": _address(),
+            "query": {"type": "string", "description": f"Search text for tool {i % 40}"},
+            "sort": {"type": "string", "enum": [1, 2, 3, "relevance"]},
+        }
+        if i % 2 == 0:
+            properties["items"] = {"type": "array", "items": _item()}
+        if i % 3 == 0:
+            properties["cart"] = {
+                "type": "object",
+                "properties": {"restaurantId": {"type": "string"}, "items": {"type": "array", "items": _item()}},
+            }
+        catalog.append({"type": "object", "properties": properties, "required": ["address"]})
+    return catalog
+
+
+def _time(fn, schemas, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for schema in schemas:
+            fn(schema)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _allocations(fn, schemas) -> int:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [fn(schema) for schema in schemas]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del results
+    return sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+
+def _row(label: str, samples: list[float], allocations: int):
+    print(
+        f"{label:<22} median {statistics.median(samples):8.2f} ms   "
+        f"min {min(samples):8.2f} ms   retained blocks {allocations:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    schemas = synthetic_catalog(args.tools)
+    check = SchemaCompiler()
+    for schema in schemas:
+        assert check.compile(copy.deepcopy(schema)) == legacy_sanitize_schema(schema), "output differs"
+    print(f"{args.tools} tool schemas; compiled output identical to legacy sanitizer\n")
+
+    _row("legacy", _time(legacy_sanitize_schema, schemas, args.rounds),
+         _allocations(legacy_sanitize_schema, schemas))
+
+    cold = []
+    for _ in range(args.rounds):
+        compiler = SchemaCompiler()
+        cold.extend(_time(compiler.compile, schemas, 1))
+    _row("compiler (cold)", cold, _allocations(SchemaCompiler().compile, schemas))
+
+    warm = SchemaCompiler()
+    _time(warm.compile, schemas, 1)
+    _row("compiler (warm)", _time(warm.compile, schemas, args.rounds), _allocations(warm.compile, schemas))
+    print(f"\ncompiler stats: {warm.stats()}")
+
+
+if __name__ == "__main__":
+    main()
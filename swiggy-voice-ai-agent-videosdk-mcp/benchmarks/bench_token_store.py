@@ -0,0 +1,110 @@
+"""
+CallerTokenStore lookup latency as the number of enrolled callers grows.
+
+Enrolls synthetic callers in a temporary SQLite store, then measures for
+each size:
+  - cold lookups (row read from SQLite in a worker thread)
+  - hot lookups (in-process LRU)
+  - the worst event-loop stall while 1000 cold lookups run, 16 at a time
+    (far more concurrent callers than one job process serves)
+
+Run: python benchmarks/bench_token_store.py [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from token_store import CallerTokenStore  # noqa: E402
+
+LOOKUPS = 1000
+CONCURRENCY = 16
+
+
+def _caller(i: int) -> str:
+    return f"+9190{i:08d}"
+
+
+def _enroll(store: CallerTokenStore, start: int, stop: int):
+    client_info = {"client_id": "bench", "redirect_uris": ["http://localhost:8765/callback"]}
+    for i in range(start, stop):
+        store._write(_caller(i), {
+            "tokens": {"access_token": f"at-{i}", "token_type": "Bearer", "expires_in": 3600, "refresh_token": f"rt-{i}"},
+            "expires_at": time.time() + 3600,
+            "client_info": client_info,
+        })
+
+
+def _pct(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(pct / 100 * len(values)))]
+
+
+async def _timed_lookups(store: CallerTokenStore, callers: list[str]) -> list[float]:
+    durations = []
+    for caller in callers:
+        started = time.perf_counter()
+        await store.get(caller)
+        durations.append((time.perf_counter() - started) * 1e6)
+    return durations
+
+
+async def _max_loop_stall(store: CallerTokenStore, callers: list[str]) -> float:
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, time.perf_counter() - started - 0.001)
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def lookup(caller):
+        async with semaphore:
+            await store.get(caller)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.gather(*(lookup(caller) for caller in callers))
+    done.set()
+    await tick
+    return worst * 1000
+
+
+async def bench(sizes: list[int]):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CallerTokenStore(path=Path(tmp) / "tokens.db", cache_size=LOOKUPS)
+        print(f"  {'callers':>8}{'cold p50 us':>13}{'cold p99 us':>13}{'hot p50 us':>12}"
+              f"{'hot p99 us':>12}{'loop stall ms':>15}")
+        enrolled = 0
+        for size in sizes:
+            await asyncio.to_thread(_enroll, store, enrolled, size)
+            enrolled = size
+            step = max(1, size // LOOKUPS)
+            callers = [_caller(i) for i in range(0, size, step)][:LOOKUPS]
+
+            store._cache.clear()
+            cold = await _timed_lookups(store, callers)
+            hot = await _timed_lookups(store, callers)
+            store._cache.clear()
+            stall = await _max_loop_stall(store, callers)
+            print(f"  {size:>8}{_pct(cold, 50):>13.0f}{_pct(cold, 99):>13.0f}{_pct(hot, 50):>12.1f}"
+                  f"{_pct(hot, 99):>12.1f}{stall:>15.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+    asyncio.run(bench(sorted(args.sizes)))
+
+
+if __name__ == "__main__":
+    main()
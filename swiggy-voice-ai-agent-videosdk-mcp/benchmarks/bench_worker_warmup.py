@@ -0,0 +1,181 @@
+"""
+Cold vs pre-warmed phone worker: call answer latency and admission control.
+
+Starts the Swiggy simulator in-process. A call is "answered" once its job
+process has the agent's Swiggy tools listed and the first read
+(get_addresses) back, the point where the greeting's follow-up can use
+them. Latency runs from the call being assigned to that point:
+  - cold:                a new process per call (interpreter start and
+                         imports included), empty tool catalog
+  - cold, catalog:       a new process per call, catalog already on disk
+  - warm:                prewarm_worker() ran first; job processes are
+                         forked from a forkserver that preloaded the
+                         modules and ran warm_job_process() (session pool
+                         connected) before reporting ready
+
+Then --burst calls arrive at once at a CallAdmission with --slots slots,
+each holding its slot --hold seconds, and ScalingPolicy is shown for a
+range of in-flight counts.
+
+Run: python benchmarks/bench_worker_warmup.py [--calls 8] [--burst 20]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from call_admission import CallAdmission, ScalingPolicy  # noqa: E402
+from session_pool import SessionPool  # noqa: E402
+from swiggy_mcp import SwiggyMCPServer, create_oauth_provider  # noqa: E402
+from swiggy_simulator import SwiggySimulator, seed_token_storage  # noqa: E402
+from token_store import FileTokenStorage  # noqa: E402
+from tool_catalog import ToolCatalogCache  # noqa: E402
+from worker_warmup import prewarm_worker, warm_job_process  # noqa: E402
+
+PRELOAD = ["swiggy_mcp", "session_pool", "worker_warmup", "call_admission"]
+
+
+async def _answer(endpoints: dict, token_path: str, catalog_path: str, pool=None) -> None:
+    auth = create_oauth_provider(storage=FileTokenStorage(Path(token_path)))
+    server = SwiggyMCPServer(endpoints=endpoints, auth=auth, catalog=ToolCatalogCache(path=Path(catalog_path)),
+                             pool=pool, lazy=True)
+    await server.connect()
+    try:
+        await server.get_available_tools()
+        await server._call_tool("swiggy-food", "get_addresses", {})
+    finally:
+        await server.disconnect()
+
+
+def _cold_call(endpoints, token_path, catalog_path, assigned_at, results):
+    asyncio.run(_answer(endpoints, token_path, catalog_path))
+    results.put(time.time() - assigned_at)
+
+
+def _warm_worker(endpoints, token_path, catalog_path, calls, results):
+    auth = create_oauth_provider(storage=FileTokenStorage(Path(token_path)))
+    pool = SessionPool(endpoints=endpoints, auth=auth)
+    warm_job_process(pool)
+    results.put("ready")
+    while True:
+        assigned_at = calls.get()
+        if assigned_at is None:
+            return
+        asyncio.run(_answer(endpoints, token_path, catalog_path, pool=pool))
+        results.put(time.time() - assigned_at)
+
+
+def _cold(ctx, args, endpoints, token_path, tmp, with_catalog) -> list[float]:
+    times = []
+    results = ctx.Queue()
+    for i in range(args.calls):
+        catalog_path = Path(tmp) / ("catalog.json" if with_catalog else f"empty-{i}.json")
+        process = ctx.Process(target=_cold_call, args=(endpoints, token_path, str(catalog_path), time.time(), results))
+        process.start()
+        times.append(results.get(timeout=60))
+        process.join()
+    return times
+
+
+def _warm(args, endpoints, token_path, catalog_path) -> list[float]:
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(PRELOAD)
+    calls, results = ctx.Queue(), ctx.Queue()
+    workers = [ctx.Process(target=_warm_worker, args=(endpoints, token_path, catalog_path, calls, results))
+               for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        assert results.get(timeout=60) == "ready"
+    times = []
+    for _ in range(args.calls):
+        calls.put(time.time())
+        times.append(results.get(timeout=60))
+    for _ in workers:
+        calls.put(None)
+    for worker in workers:
+        worker.join()
+    return times
+
+
+async def _burst(args, directory: Path) -> dict:
+    admission = CallAdmission(directory=directory, max_active=args.slots, queue_timeout=args.queue_timeout)
+    outcomes = {"immediate": 0, "queued": 0, "rejected": 0}
+    waits = []
+
+    async def call(i: int):
+        await asyncio.sleep(i * 0.01)
+        async with admission.admit() as queued:
+            if queued is None:
+                outcomes["rejected"] += 1
+                return
+            outcomes["queued" if queued > 0.01 else "immediate"] += 1
+            if queued > 0.01:
+                waits.append(queued)
+            await asyncio.sleep(args.hold)
+
+    async def peak():
+        await asyncio.sleep(args.hold / 2)
+        return await asyncio.to_thread(admission.counts)
+
+    counts, *_ = await asyncio.gather(peak(), *(call(i) for i in range(args.burst)))
+    return {**outcomes, "waits": waits, "peak": counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2, help="warm job processes")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--hold", type=float, default=1.5)
+    parser.add_argument("--queue-timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    sim = SwiggySimulator(port=0, latency_scale=args.latency_scale).start()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        token_path = str(Path(tmp) / "tokens.json")
+        catalog_path = str(Path(tmp) / "catalog.json")
+        seed_token_storage(sim.base_url, Path(token_path))
+        endpoints = sim.endpoints()
+        spawn = multiprocessing.get_context("spawn")
+
+        rows.append(("cold", _cold(spawn, args, endpoints, token_path, tmp, with_catalog=False)))
+        started = time.perf_counter()
+        report = asyncio.run(prewarm_worker(endpoints=endpoints, storage=FileTokenStorage(Path(token_path)),
+                                            catalog=ToolCatalogCache(path=Path(catalog_path))))
+        prewarm_seconds = time.perf_counter() - started
+        rows.append(("cold, catalog", _cold(spawn, args, endpoints, token_path, tmp, with_catalog=True)))
+        rows.append(("warm", _warm(args, endpoints, token_path, catalog_path)))
+        burst = asyncio.run(_burst(args, Path(tmp) / "admission"))
+    sim.stop()
+
+    print(f"{args.calls} calls per mode, latency scale {args.latency_scale}\n")
+    print(f"  {'assigned -> answered':<22}{'p50 ms':>9}{'max ms':>9}")
+    for label, times in rows:
+        print(f"  {label:<22}{statistics.median(times) * 1000:>9.0f}{max(times) * 1000:>9.0f}")
+    print(f"\n  prewarm_worker: {prewarm_seconds:.2f}s before registering, {report}")
+
+    waits = burst["waits"]
+    print(f"\n  burst of {args.burst} calls, {args.slots} slots, {args.hold}s each, queue timeout {args.queue_timeout}s:")
+    print(f"    immediate {burst['immediate']}, queued {burst['queued']}"
+          f"{f' (waited {min(waits):.1f}-{max(waits):.1f}s)' if waits else ''}, rejected {burst['rejected']}")
+    print(f"    at peak: {burst['peak'][0]} active, {burst['peak'][1]} queued")
+
+    policy = ScalingPolicy(capacity=args.slots, scale_down_delay=300.0)
+    curve = [(0, 0), (60, 5), (120, 12), (180, 30), (240, 4), (400, 4), (600, 4)]
+    steps = ", ".join(f"t={t}s {n} calls -> {policy.desired(n, now=t)}" for t, n in curve)
+    print(f"\n  scaling policy (capacity {args.slots}, 70% target, 300s scale-down delay):\n    {steps}")
+
+
+if __name__ == "__main__":
+    main()
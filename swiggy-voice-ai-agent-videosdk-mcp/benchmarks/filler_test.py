@@ -0,0 +1,134 @@
+"""
+Filler speech timing against the local Swiggy simulator.
+
+Runs --calls tool calls through SwiggyMCPServer with a FillerSpeech whose
+say() stands in for TTS playback (about 60 ms per character). A share of
+the calls stall (--stall-rate), a share are cancelled midway like a caller
+barging in (--cancel-rate), and every fourth turn the agent is already
+speaking when the tool starts. Reports:
+  - how many calls got a filler, by call latency
+  - fillers on calls that finished before the threshold (should be 0)
+  - replies that would have started while a filler was playing (0)
+  - fillers left playing after a cancelled call (0)
+  - the wait covered by fillers
+
+Run: python benchmarks/filler_test.py [--calls 200] [--stall-rate 0.1]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from filler_speech import FILLER_THRESHOLD, FillerSpeech  # noqa: E402
+from swiggy_mcp import SwiggyMCPServer, create_oauth_provider  # noqa: E402
+from swiggy_simulator import SwiggySimulator, seed_token_storage  # noqa: E402
+from token_store import FileTokenStorage  # noqa: E402
+from tool_cache import ToolResultCache  # noqa: E402
+from tool_catalog import ToolCatalogCache  # noqa: E402
+
+CALLS = [
+    ("swiggy-food", "search_restaurants", {"addressId": "addr_0", "query": "biryani"}),
+    ("swiggy-food", "get_restaurant_menu", {"addressId": "addr_0", "restaurantId": "4"}),
+    ("swiggy-instamart", "search_products", {"addressId": "addr_0", "query": "milk"}),
+    ("swiggy-dineout", "get_available_slots", {"restaurantId": "d1", "date": "2025-01-01", "partySize": 2}),
+]
+
+
+class _FakeVoice:
+    """Records when each filler line plays."""
+
+    def __init__(self):
+        self.playing: list[tuple[float, float | None]] = []
+        self.speaking = False
+
+    async def say(self, line: str, add_to_chat_context: bool = True):
+        started = time.perf_counter()
+        self.playing.append((started, None))
+        index = len(self.playing) - 1
+        try:
+            await asyncio.sleep(len(line) * 0.06)
+        finally:
+            self.playing[index] = (started, time.perf_counter())
+
+    def is_playing(self) -> bool:
+        return any(end is None for _, end in self.playing)
+
+
+async def run(args):
+    sim = SwiggySimulator(port=0, latency_scale=args.latency_scale, stall_rate=args.stall_rate).start()
+    rng = random.Random(7)
+    buckets = Counter()
+    fillers_by_bucket = Counter()
+    early_fillers = overlaps = leaked = cancelled = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_token_storage(sim.base_url, Path(tmp) / "tokens.json")
+        auth = create_oauth_provider(server_url=sim.base_url, storage=FileTokenStorage(Path(tmp) / "tokens.json"))
+        server = SwiggyMCPServer(endpoints=sim.endpoints(), auth=auth, catalog=ToolCatalogCache(path=Path(tmp) / "c.json"),
+                                 tool_cache=ToolResultCache(ttls={}))
+        await server.connect()
+        await server.get_available_tools()
+        voice = _FakeVoice()
+        server.filler = filler = FillerSpeech(voice.say, is_speaking=lambda: voice.speaking)
+
+        for i in range(args.calls):
+            svc_name, tool_name, parameters = rng.choice(CALLS)
+            parameters = {**parameters, "addressId": f"addr_{i}"} if "addressId" in parameters else parameters
+            voice.speaking = i % 4 == 0
+            before = filler.stats["fillers"]
+            started = time.perf_counter()
+            call = asyncio.ensure_future(server._call_tool(svc_name, tool_name, parameters))
+            if rng.random() < args.cancel_rate:
+                await asyncio.sleep(rng.uniform(0.5, 2.5))
+                call.cancel()
+                cancelled += 1
+            try:
+                await call
+            except BaseException:
+                pass
+            elapsed = time.perf_counter() - started
+            voice.speaking = False
+            if call.cancelled():
+                await asyncio.sleep(0)
+                leaked += voice.is_playing()
+                while voice.is_playing():
+                    await asyncio.sleep(0.01)
+                continue
+            # The reply would start now: a filler must not still be playing.
+            overlaps += voice.is_playing()
+            bucket = "<1s" if elapsed < FILLER_THRESHOLD else "1-3s" if elapsed < 3 else ">3s"
+            buckets[bucket] += 1
+            fired = filler.stats["fillers"] - before
+            fillers_by_bucket[bucket] += fired > 0
+            early_fillers += bucket == "<1s" and fired > 0
+        await server.disconnect()
+    sim.stop()
+
+    print(f"{args.calls} tool calls, stall rate {args.stall_rate}, {cancelled} cancelled, threshold {FILLER_THRESHOLD}s\n")
+    print(f"  {'call latency':<14}{'calls':>7}{'with filler':>13}")
+    for bucket in ("<1s", "1-3s", ">3s"):
+        print(f"  {bucket:<14}{buckets[bucket]:>7}{fillers_by_bucket[bucket]:>13}")
+    print(f"\n  fillers on calls under the threshold: {early_fillers}")
+    print(f"  replies that would overlap a filler:  {overlaps}")
+    print(f"  fillers still playing after a cancel: {leaked}")
+    print(f"  stats: {filler.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--stall-rate", type=float, default=0.1)
+    parser.add_argument("--cancel-rate", type=float, default=0.05)
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
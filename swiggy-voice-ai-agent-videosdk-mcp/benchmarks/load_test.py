@@ -0,0 +1,291 @@
+"""
+Concurrent-conversation load test against the local Swiggy MCP simulator.
+
+Starts benchmarks/swiggy_simulator.py in a subprocess, logs in against it,
+and runs N simulated conversations, at most --concurrency at a time. Every
+conversation goes through the real SwiggyMCPServer code path: connect(),
+get_available_tools() and one scripted tool-call sequence (SCRIPTS) via
+the same entry point the LLM's tool calls use, then disconnect().
+
+Reports throughput, p50/p99 per tool and for connect, errors, client and
+server connection counts, MCP sessions opened and peak open sessions,
+approximate memory per concurrent session and the tool policy's retries,
+hedges and timeouts. The tool catalog is warmed first, as in a running
+worker; compare eager and --lazy connects. Inject stalls (--stall-rate)
+and compare tail latency with and without --hedge or a tighter
+--tool-timeout. --duplicate-rate issues some reads twice at once, like a
+realtime model repeating a function call, to exercise call coalescing.
+
+Run: python benchmarks/load_test.py [--conversations 200] [--concurrency 20]
+       [--script mixed] [--latency-scale 0.2] [--error-rate 0.01]
+       [--stall-rate 0.05] [--hedge] [--tool-timeout 2] [--lazy]
+       [--duplicate-rate 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from http_transport import transport_stats  # noqa: E402
+from metrics import get_metrics  # noqa: E402
+from swiggy_mcp import FileTokenStorage, SwiggyMCPServer, create_oauth_provider  # noqa: E402
+from swiggy_simulator import SERVICE_PATHS, TOOL_SPECS, seed_token_storage  # noqa: E402
+from tool_cache import MUTATING_TOOLS, ToolResultCache  # noqa: E402
+from tool_catalog import ToolCatalogCache  # noqa: E402
+from tool_deadlines import ToolExecutionPolicy  # noqa: E402
+
+QUERIES = ["biryani", "pizza", "paneer", "dosa", "noodles", "momos", "burger", "thali"]
+GROCERIES = ["milk", "bread", "eggs", "atta", "onion", "tomato", "butter", "rice"]
+
+SCRIPTS = {
+    "food": lambda rng: [
+        ("get_addresses", {}),
+        ("search_restaurants", {"addressId": "addr_0", "query": rng.choice(QUERIES)}),
+        ("get_restaurant_menu", {"addressId": "addr_0", "restaurantId": str(rng.randrange(20))}),
+        ("update_food_cart", {"restaurantId": "r1", "items": [{"itemId": "i1", "quantity": 1}]}),
+        ("get_food_cart", {}),
+        ("place_food_order", {"addressId": "addr_0", "paymentMethod": "COD"}),
+    ],
+    "instamart": lambda rng: [
+        ("get_addresses", {}),
+        *[("search_products", {"addressId": "addr_0", "query": q}) for q in rng.sample(GROCERIES, 3)],
+        ("update_cart", {"items": [{"productId": "p1", "quantity": 2}]}),
+        ("get_cart", {}),
+        ("checkout", {"addressId": "addr_0", "paymentMethod": "COD"}),
+    ],
+    "dineout": lambda rng: [
+        ("get_saved_locations", {}),
+        ("search_restaurants_dineout", {"query": rng.choice(QUERIES), "lat": 12.93, "lng": 77.62}),
+        ("get_restaurant_details", {"restaurantId": str(rng.randrange(12))}),
+        ("get_available_slots", {"restaurantId": "d1", "date": "2025-01-01", "partySize": 2}),
+        ("create_cart", {"restaurantId": "d1", "slotId": "s3", "partySize": 2}),
+        ("book_table", {"cartId": "c1"}),
+    ],
+}
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _pct(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))]
+
+
+class LoadResults:
+    def __init__(self):
+        self.tool_ms: dict[str, list[float]] = defaultdict(list)
+        self.tool_errors: dict[str, int] = defaultdict(int)
+        self.connect_ms: list[float] = []
+        self.conversations = 0
+        self.failed_conversations = 0
+        self.peak_rss = 0
+        self.peak_sessions = 0
+        self.sessions_opened = 0
+        self.cache_stats: dict = {}
+        self.policy_stats: dict = {}
+        self.duplicates = 0
+        self.coalesced = 0
+
+
+async def _conversation(index: int, args, endpoints, auth, catalog, tool_cache, policy, results: LoadResults,
+                        active: set):
+    rng = random.Random(index)
+    script = args.script if args.script != "mixed" else rng.choice(list(SCRIPTS))
+    server = SwiggyMCPServer(endpoints=endpoints, auth=auth, catalog=catalog, tool_cache=tool_cache,
+                             cache_scope=f"caller-{index % args.callers}", tool_policy=policy, lazy=args.lazy)
+    active.add(server)
+    started = time.perf_counter()
+    try:
+        await server.connect()
+        await server.get_available_tools()
+    except Exception as e:
+        results.failed_conversations += 1
+        print(f"  conversation {index} could not connect: {e}")
+        await server.disconnect()
+        active.discard(server)
+        return
+    results.connect_ms.append((time.perf_counter() - started) * 1000)
+
+    try:
+        for tool_name, parameters in SCRIPTS[script](rng):
+            if args.think_ms:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+            copies = 1
+            if tool_name not in MUTATING_TOOLS and rng.random() < args.duplicate_rate:
+                copies = 2
+                results.duplicates += 1
+            call_started = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(server._call_tool(server._tool_services.get(tool_name, ""), tool_name, parameters)
+                  for _ in range(copies)),
+                return_exceptions=True,
+            )
+            if any(isinstance(outcome, Exception) for outcome in outcomes):
+                results.tool_errors[tool_name] += 1
+            results.tool_ms[tool_name].append((time.perf_counter() - call_started) * 1000)
+        results.conversations += 1
+    finally:
+        results.coalesced += server.coalesced_calls
+        await server.disconnect()
+        active.discard(server)
+
+
+def _sessions_opened() -> int:
+    return sum(int(state[-1]) for name, _, state in get_metrics().snapshot()["histograms"]
+               if name == "swiggy_mcp_connect_seconds")
+
+
+async def _warm_catalog(endpoints, auth, catalog):
+    server = SwiggyMCPServer(endpoints=endpoints, auth=auth, catalog=catalog)
+    await server.connect()
+    await server.get_available_tools()
+    for _ in range(100):
+        if all(await asyncio.gather(*(catalog.get(url) for url in endpoints.values()))):
+            break
+        await asyncio.sleep(0.05)
+    await server.disconnect()
+
+
+async def _sample_rss(results: LoadResults, stop: asyncio.Event, active: set):
+    while not stop.is_set():
+        results.peak_rss = max(results.peak_rss, _rss_bytes())
+        open_sessions = sum(conn.alive for server in active for conn in server._connections.values())
+        results.peak_sessions = max(results.peak_sessions, open_sessions)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.05)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args, base_url: str, tmpdir: Path) -> tuple[LoadResults, float, int]:
+    endpoints = {service: base_url + path for service, path in SERVICE_PATHS.items()}
+    token_file = tmpdir / "tokens.json"
+    seed_token_storage(base_url, token_file)
+    auth = create_oauth_provider(server_url=base_url, storage=FileTokenStorage(token_file))
+    catalog = ToolCatalogCache(path=tmpdir / "catalog.json")
+    tool_cache = ToolResultCache(ttls={} if args.no_cache else None)
+    timeouts = None if args.tool_timeout is None else dict.fromkeys(TOOL_SPECS, args.tool_timeout)
+    policy = ToolExecutionPolicy(timeouts=timeouts, hedging=args.hedge)
+
+    await _warm_catalog(endpoints, auth, catalog)
+    results = LoadResults()
+    active: set = set()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(i):
+        async with semaphore:
+            await _conversation(i, args, endpoints, auth, catalog, tool_cache, policy, results, active)
+
+    baseline_rss = _rss_bytes()
+    sessions_before = _sessions_opened()
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(results, stop, active))
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(args.conversations)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    results.cache_stats = tool_cache.stats()
+    results.policy_stats = policy.stats
+    results.sessions_opened = _sessions_opened() - sessions_before
+    return results, elapsed, baseline_rss
+
+
+def report(args, results: LoadResults, elapsed: float, baseline_rss: int, server_stats: dict):
+    calls = sum(len(v) for v in results.tool_ms.values())
+    print(f"\n{results.conversations}/{args.conversations} conversations in {elapsed:.1f}s "
+          f"(concurrency {args.concurrency}, script {args.script})")
+    print(f"  throughput: {results.conversations / elapsed:.2f} conversations/s, {calls / elapsed:.1f} tool calls/s")
+    if results.connect_ms:
+        print(f"  connect + tools: p50 {_pct(results.connect_ms, 50):.0f} ms, p99 {_pct(results.connect_ms, 99):.0f} ms")
+
+    print(f"\n  {'tool':<28}{'calls':>7}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for tool_name in sorted(results.tool_ms):
+        values = results.tool_ms[tool_name]
+        print(f"  {tool_name:<28}{len(values):>7}{results.tool_errors[tool_name]:>8}"
+              f"{_pct(values, 50):>9.0f}{_pct(values, 99):>9.0f}")
+
+    client = transport_stats()
+    print(f"\n  client HTTP: {client['new_connections']} connections opened for {client['requests']} requests "
+          f"(reuse {client['reuse_ratio']:.0%}), queue avg {client['queue_ms_avg']} ms")
+    print(f"  simulator:   {server_stats['tcp_connections']} TCP connections, {server_stats['requests']} requests, "
+          f"{server_stats['tool_errors']} injected tool errors, {server_stats['stalls']} stalls, "
+          f"{server_stats['http_errors']} HTTP 503s")
+    print(f"  MCP sessions: {results.sessions_opened} opened "
+          f"({results.sessions_opened / max(1, results.conversations):.2f} per conversation), "
+          f"peak {results.peak_sessions} open")
+    print(f"  tool cache:  {results.cache_stats}")
+    print(f"  tool policy: {results.policy_stats}")
+    if results.duplicates:
+        print(f"  duplicates:  {results.duplicates} reads issued twice at once, {results.coalesced} calls coalesced, "
+              f"{sum(server_stats['tool_calls'].values())} tool calls reached the simulator")
+    per_session = (results.peak_rss - baseline_rss) / max(1, min(args.concurrency, args.conversations))
+    print(f"  memory:      peak RSS +{(results.peak_rss - baseline_rss) / 2**20:.1f} MiB, "
+          f"~{per_session / 2**10:.0f} KiB per concurrent session")
+    if results.failed_conversations:
+        print(f"  {results.failed_conversations} conversations failed to connect")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--script", choices=[*SCRIPTS, "mixed"], default="mixed")
+    parser.add_argument("--callers", type=int, default=50, help="distinct users (personalized cache scope)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between tool calls")
+    parser.add_argument("--no-cache", action="store_true", help="disable the tool result cache")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-scale", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--http-error-rate", type=float, default=0.0)
+    parser.add_argument("--hedge", action="store_true", help="hedge slow read-only tool calls")
+    parser.add_argument("--lazy", action="store_true", help="open each service's session on first use")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0,
+                        help="chance a read is issued twice at once (duplicate function call)")
+    parser.add_argument("--tool-timeout", type=float, default=None, help="per-attempt timeout for every tool")
+    args = parser.parse_args()
+
+    simulator = subprocess.Popen([
+        sys.executable, str(Path(__file__).with_name("swiggy_simulator.py")),
+        "--port", str(args.port), "--latency-scale", str(args.latency_scale),
+        "--error-rate", str(args.error_rate), "--stall-rate", str(args.stall_rate),
+        "--http-error-rate", str(args.http_error_rate),
+    ], stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/sim/stats", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        with tempfile.TemporaryDirectory() as tmp:
+            results, elapsed, baseline_rss = asyncio.run(run(args, base_url, Path(tmp)))
+            server_stats = json.loads(httpx.get(base_url + "/sim/stats").text)
+        report(args, results, elapsed, baseline_rss, server_stats)
+    finally:
+        simulator.terminate()
+        simulator.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Single-service outage test for the per-service circuit breakers.
+
+Starts the Swiggy simulator in-process and keeps --conversations
+SwiggyMCPServer instances busy with read-only calls spread across food,
+instamart and dineout. After --healthy seconds one service (--service)
+goes down (--mode down: every request gets a 503; hang: tool calls never
+return) for --outage seconds, then comes back for --recovery seconds.
+
+Reports, per phase and service, calls, errors and p50/p99 latency, when the
+circuit opened and closed, and how many tools the servers expose during the
+outage. Expected: the failing service's calls turn into instant rejections
+once its circuit opens, the other services are unaffected, and the circuit
+closes on its own shortly after the service returns.
+
+Run: python benchmarks/outage_test.py [--service swiggy-dineout] [--mode hang]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from circuit_breaker import CircuitBreakers  # noqa: E402
+from swiggy_mcp import SwiggyMCPServer, create_oauth_provider  # noqa: E402
+from swiggy_simulator import SwiggySimulator, seed_token_storage  # noqa: E402
+from token_store import FileTokenStorage  # noqa: E402
+from tool_cache import ToolResultCache  # noqa: E402
+from tool_catalog import ToolCatalogCache  # noqa: E402
+from tool_deadlines import ToolExecutionPolicy  # noqa: E402
+
+READS = {
+    "swiggy-food": [("search_restaurants", {"addressId": "addr_0", "query": "biryani"}),
+                    ("get_food_cart", {})],
+    "swiggy-instamart": [("search_products", {"addressId": "addr_0", "query": "milk"}),
+                         ("get_cart", {})],
+    "swiggy-dineout": [("get_restaurant_details", {"restaurantId": "7"}),
+                       ("get_available_slots", {"restaurantId": "d1", "date": "2025-01-01", "partySize": 2})],
+}
+
+
+def _pct(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))] if values else 0.0
+
+
+async def _conversation(index: int, server: SwiggyMCPServer, stop: asyncio.Event, calls: list):
+    rng = random.Random(index)
+    while not stop.is_set():
+        svc_name = rng.choice(list(READS))
+        tool_name, parameters = rng.choice(READS[svc_name])
+        started = time.perf_counter()
+        try:
+            await server._call_tool(svc_name, tool_name, parameters)
+            ok = True
+        except Exception:
+            ok = False
+        calls.append((started, svc_name, ok, (time.perf_counter() - started) * 1000))
+        await asyncio.sleep(rng.uniform(0.05, 0.15))
+
+
+async def run(args):
+    sim = SwiggySimulator(port=0, latency_scale=0.2).start()
+    breakers = CircuitBreakers(cooldown=(args.cooldown, args.cooldown * 8))
+    policy = ToolExecutionPolicy()
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_token_storage(sim.base_url, Path(tmp) / "tokens.json")
+        auth = create_oauth_provider(server_url=sim.base_url, storage=FileTokenStorage(Path(tmp) / "tokens.json"))
+        catalog = ToolCatalogCache(path=Path(tmp) / "catalog.json")
+        servers = [
+            SwiggyMCPServer(endpoints=sim.endpoints(), auth=auth, catalog=catalog, tool_cache=ToolResultCache(ttls={}),
+                            tool_policy=policy, breakers=breakers)
+            for _ in range(args.conversations)
+        ]
+        await asyncio.gather(*(server.connect() for server in servers))
+        await asyncio.gather(*(server.get_available_tools() for server in servers))
+        tools_before = len(servers[0].tool_registry.get_cached_tools())
+
+        calls: list = []
+        events: list = []
+        breaker = breakers.get(args.service)
+        stop = asyncio.Event()
+
+        async def watch():
+            state = breaker.state
+            while not stop.is_set():
+                if breaker.state != state:
+                    state = breaker.state
+                    events.append((time.perf_counter(), state))
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(_conversation(i, s, stop, calls)) for i, s in enumerate(servers)]
+        watcher = asyncio.create_task(watch())
+        await asyncio.sleep(args.healthy)
+        sim.outages[args.service] = args.mode
+        outage_start = time.perf_counter()
+        await asyncio.sleep(args.outage)
+        tools_during = len(servers[0].tool_registry.get_cached_tools())
+        del sim.outages[args.service]
+        outage_end = time.perf_counter()
+        await asyncio.sleep(args.recovery)
+        stop.set()
+        await asyncio.gather(*tasks, watcher)
+        tools_after = len(servers[0].tool_registry.get_cached_tools())
+        await asyncio.gather(*(server.disconnect() for server in servers))
+    sim.stop()
+
+    phases = {
+        "healthy": (started, outage_start),
+        "outage": (outage_start, outage_end),
+        "recovery": (outage_end, float("inf")),
+    }
+    print(f"{args.conversations} conversations; {args.service} {args.mode} for {args.outage:.0f}s "
+          f"after {args.healthy:.0f}s, then {args.recovery:.0f}s recovery\n")
+    print(f"  {'phase':<10}{'service':<18}{'calls':>7}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for phase, (begin, end) in phases.items():
+        by_service = defaultdict(list)
+        for at, svc_name, ok, ms in calls:
+            if begin <= at < end:
+                by_service[svc_name].append((ok, ms))
+        for svc_name in READS:
+            rows = by_service[svc_name]
+            latencies = [ms for _, ms in rows]
+            print(f"  {phase:<10}{svc_name:<18}{len(rows):>7}{sum(1 for ok, _ in rows if not ok):>8}"
+                  f"{_pct(latencies, 50):>9.0f}{_pct(latencies, 99):>9.0f}")
+
+    print(f"\n  circuit ({args.service}):")
+    for at, state in events:
+        print(f"    {at - outage_start:+7.2f}s from outage start: {state}")
+    print(f"  tools exposed: {tools_before} before, {tools_during} during, {tools_after} after")
+    print(f"  breaker: {breaker.stats}, policy: {policy.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=10)
+    parser.add_argument("--service", default="swiggy-dineout", choices=list(READS))
+    parser.add_argument("--mode", default="hang", choices=["hang", "down"])
+    parser.add_argument("--healthy", type=float, default=5.0)
+    parser.add_argument("--outage", type=float, default=15.0)
+    parser.add_argument("--recovery", type=float, default=10.0)
+    parser.add_argument("--cooldown", type=float, default=2.0, help="first open-circuit cooldown in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Local stub MCP servers for benchmarks.
+
+Each stub is a FastMCP streamable-HTTP app served by uvicorn on a free local
+port, in a background thread with its own event loop. Every HTTP request is
+delayed by `latency` seconds to stand in for the network + TLS round-trip to
+mcp.swiggy.com.
+"""
+
+import asyncio
+import logging
+import socket
+import threading
+import time
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+# Client teardown races in-flight POSTs on the stub side; that noise is not
+# what the benchmarks measure.
+for _name in ("mcp.server.streamable_http", "uvicorn.error"):
+    logging.getLogger(_name).setLevel(logging.CRITICAL)
+
+
+class _LatencyMiddleware:
+    """ASGI middleware that sleeps before handing each HTTP request on."""
+
+    def __init__(self, app, latency: float):
+        self.app = app
+        self.latency = latency
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.latency:
+            await asyncio.sleep(self.latency)
+        await self.app(scope, receive, send)
+
+
+class StubMCPServer:
+    """A FastMCP server on 127.0.0.1 with injected per-request latency."""
+
+    def __init__(self, name: str, latency: float = 0.0, tools: list[str] | None = None):
+        self.name = name
+        self.mcp = FastMCP(name, log_level="WARNING")
+        for tool_name in tools or []:
+            self._add_echo_tool(tool_name)
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self.port = self._sock.getsockname()[1]
+
+        app = _LatencyMiddleware(self.mcp.streamable_http_app(), latency)
+        config = uvicorn.Config(app, log_level="warning", lifespan="on")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._sock]}, daemon=True
+        )
+
+    def _add_echo_tool(self, tool_name: str):
+        def echo(query: str = "") -> str:
+            return f"{tool_name}: {query}"
+
+        self.mcp.add_tool(echo, name=tool_name, description=f"Stub for {tool_name}")
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/mcp"
+
+    def start(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def start_stub_endpoints(latencies: dict[str, float], tools: dict[str, list[str]] | None = None) -> dict[str, StubMCPServer]:
+    """Start one stub per service name. Returns {service_name: StubMCPServer}."""
+    tools = tools or {}
+    return {
+        name: StubMCPServer(name, latency, tools.get(name)).start()
+        for name, latency in latencies.items()
+    }
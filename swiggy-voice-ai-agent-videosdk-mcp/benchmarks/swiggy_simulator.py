@@ -0,0 +1,618 @@
+"""
+Local Swiggy MCP simulator for load tests.
+
+Serves the food, instamart and dineout tool sets the agent instructions
+use (see instructions.py) on one local port, at the same paths as
+mcp.swiggy.com (/food, /im, /dineout):
+  - realistic payloads: restaurant lists, menus and product searches are
+    generated with the fields and sizes of the real responses, and the same
+    arguments always return the same payload
+  - per-tool log-normal latency from (p50, p99) in TOOL_SPECS, scaled by
+    --latency-scale
+  - error injection: tool errors (isError results), stalls (20x latency)
+    and HTTP 503s, each with its own rate
+  - outages: a service in `outages` answers every request with 503
+    ("down") or never finishes its tool calls ("hang")
+  - OAuth 2.0: protected-resource and authorization-server metadata,
+    dynamic client registration, an auto-approving /authorize and /token
+    (authorization_code + refresh_token); /mcp requests need a valid bearer
+  - /sim/stats: TCP connections, requests, tool calls, tokens issued
+  - tls=True (needs hypercorn): HTTPS with a throwaway self-signed
+    certificate and HTTP/2 via ALPN, like mcp.swiggy.com; point clients at
+    `ca_file` (e.g. SSL_CERT_FILE) to trust it
+
+Run standalone: python benchmarks/swiggy_simulator.py --port 9000 [--tls]
+Or in-process:  SwiggySimulator(port=0).start().endpoints()
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import secrets
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlencode, urlparse, parse_qs
+
+import httpx
+import uvicorn
+from mcp import types
+from mcp.server.lowlevel import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse, Response
+
+try:
+    import hypercorn.asyncio
+    import hypercorn.config
+    HYPERCORN_AVAILABLE = True
+except ImportError:
+    HYPERCORN_AVAILABLE = False
+
+for _name in ("mcp.server.streamable_http", "mcp.server.streamable_http_manager", "uvicorn.error"):
+    logging.getLogger(_name).setLevel(logging.CRITICAL)
+
+SERVICE_PATHS = {"swiggy-food": "/food", "swiggy-instamart": "/im", "swiggy-dineout": "/dineout"}
+
+# Tool name -> services, input parameters, payload shape and latency (p50, p99) in ms.
+TOOL_SPECS = {
+    # Food
+    "get_addresses": {"services": ("swiggy-food", "swiggy-instamart"), "params": {}, "payload": ("addresses", 3), "latency_ms": (90, 300)},
+    "search_restaurants": {"services": ("swiggy-food",), "params": {"addressId": "string", "query": "string"}, "payload": ("restaurants", 20), "latency_ms": (350, 1400)},
+    "search_menu": {"services": ("swiggy-food",), "params": {"addressId": "string", "query": "string"}, "payload": ("dishes", 20), "latency_ms": (300, 1200)},
+    "get_restaurant_menu": {"services": ("swiggy-food",), "params": {"addressId": "string", "restaurantId": "string"}, "payload": ("menu", 120), "latency_ms": (450, 1800)},
+    "get_food_cart": {"services": ("swiggy-food",), "params": {}, "payload": ("cart", 3), "latency_ms": (120, 450)},
+    "update_food_cart": {"services": ("swiggy-food",), "params": {"restaurantId": "string", "items": "array"}, "payload": ("cart", 3), "latency_ms": (200, 800)},
+    "flush_food_cart": {"services": ("swiggy-food",), "params": {}, "payload": ("ack", 1), "latency_ms": (100, 350)},
+    "fetch_food_coupons": {"services": ("swiggy-food",), "params": {"restaurantId": "string"}, "payload": ("coupons", 6), "latency_ms": (150, 500)},
+    "apply_food_coupon": {"services": ("swiggy-food",), "params": {"couponCode": "string"}, "payload": ("cart", 3), "latency_ms": (200, 700)},
+    "place_food_order": {"services": ("swiggy-food",), "params": {"addressId": "string", "paymentMethod": "string"}, "payload": ("order", 3), "latency_ms": (700, 2500)},
+    "get_food_orders": {"services": ("swiggy-food",), "params": {}, "payload": ("orders", 5), "latency_ms": (200, 700)},
+    "get_food_order_details": {"services": ("swiggy-food",), "params": {"orderId": "string"}, "payload": ("order", 4), "latency_ms": (150, 600)},
+    "track_food_order": {"services": ("swiggy-food",), "params": {"orderId": "string"}, "payload": ("tracking", 1), "latency_ms": (120, 450)},
+    # Instamart
+    "search_products": {"services": ("swiggy-instamart",), "params": {"addressId": "string", "query": "string"}, "payload": ("products", 12), "latency_ms": (250, 1000)},
+    "get_cart": {"services": ("swiggy-instamart",), "params": {}, "payload": ("cart", 4), "latency_ms": (120, 450)},
+    "update_cart": {"services": ("swiggy-instamart",), "params": {"items": "array"}, "payload": ("cart", 4), "latency_ms": (200, 800)},
+    "clear_cart": {"services": ("swiggy-instamart",), "params": {}, "payload": ("ack", 1), "latency_ms": (100, 350)},
+    "checkout": {"services": ("swiggy-instamart",), "params": {"addressId": "string", "paymentMethod": "string"}, "payload": ("order", 4), "latency_ms": (700, 2500)},
+    "get_orders": {"services": ("swiggy-instamart",), "params": {}, "payload": ("orders", 5), "latency_ms": (200, 700)},
+    "track_order": {"services": ("swiggy-instamart",), "params": {"orderId": "string"}, "payload": ("tracking", 1), "latency_ms": (120, 450)},
+    # Dineout
+    "get_saved_locations": {"services": ("swiggy-dineout",), "params": {}, "payload": ("locations", 3), "latency_ms": (90, 300)},
+    "search_restaurants_dineout": {"services": ("swiggy-dineout",), "params": {"query": "string", "lat": "number", "lng": "number"}, "payload": ("restaurants", 12), "latency_ms": (350, 1400)},
+    "get_restaurant_details": {"services": ("swiggy-dineout",), "params": {"restaurantId": "string"}, "payload": ("details", 1), "latency_ms": (200, 700)},
+    "get_available_slots": {"services": ("swiggy-dineout",), "params": {"restaurantId": "string", "date": "string", "partySize": "integer"}, "payload": ("slots", 16), "latency_ms": (250, 900)},
+    "create_cart": {"services": ("swiggy-dineout",), "params": {"restaurantId": "string", "slotId": "string", "partySize": "integer"}, "payload": ("cart", 1), "latency_ms": (250, 900)},
+    "book_table": {"services": ("swiggy-dineout",), "params": {"cartId": "string"}, "payload": ("booking", 1), "latency_ms": (600, 2200)},
+    "get_booking_status": {"services": ("swiggy-dineout",), "params": {"bookingId": "string"}, "payload": ("booking", 1), "latency_ms": (120, 450)},
+}
+
+_CUISINES = ["North Indian", "South Indian", "Chinese", "Biryani", "Pizzas", "Desserts", "Mughlai", "Thai", "Cafe", "Street Food"]
+_AREAS = ["Koramangala", "Indiranagar", "HSR Layout", "Bandra West", "Andheri East", "Kalavad Road", "Salt Lake"]
+_DISHES = ["Paneer Butter Masala", "Chicken Biryani", "Masala Dosa", "Veg Hakka Noodles", "Margherita Pizza",
+           "Dal Makhani", "Butter Naan", "Gulab Jamun", "Chole Bhature", "Hyderabadi Dum Biryani"]
+_PRODUCTS = ["Amul Taaza Milk", "Aashirvaad Atta", "Fortune Sunflower Oil", "Tata Salt", "Britannia Bread",
+             "Mother Dairy Curd", "Maggi Noodles", "India Gate Basmati Rice", "Onion", "Tomato"]
+
+
+def _image(rng: random.Random) -> str:
+    return f"https://media-assets.swiggy.com/swiggy/image/upload/fl_lossy,f_auto,q_auto/{rng.getrandbits(64):x}.png"
+
+
+def _analytics(rng: random.Random) -> dict:
+    return {"context": "seo-data-" + secrets.token_hex(6), "screenName": "listing", "objectValue": str(rng.getrandbits(48))}
+
+
+def _restaurant(rng: random.Random, i: int) -> dict:
+    return {
+        "id": str(100000 + rng.randrange(900000)),
+        "name": f"{rng.choice(['Meghana', 'Truffles', 'Empire', 'Paradise', 'Behrouz', 'Haldiram'])} {rng.choice(_CUISINES)} {i}",
+        "cuisines": rng.sample(_CUISINES, 3),
+        "avgRating": round(rng.uniform(3.5, 4.8), 1),
+        "totalRatingsString": f"{rng.randrange(1, 50)}K+",
+        "sla": {"deliveryTime": rng.randrange(18, 55), "lastMileTravel": round(rng.uniform(0.5, 7.5), 1), "slaString": "25-30 mins"},
+        "costForTwo": f"₹{rng.randrange(2, 12) * 100} for two",
+        "areaName": rng.choice(_AREAS),
+        "isOpen": True,
+        "aggregatedDiscountInfoV3": {"header": f"{rng.choice([10, 20, 40, 50])}% OFF", "subHeader": "UPTO ₹100"},
+        "cloudinaryImageId": _image(rng),
+        "badges": {"imageBadges": [{"imageId": _image(rng), "description": "pureveg"}]},
+        "analytics": _analytics(rng),
+        "__typename": "Restaurant",
+    }
+
+
+def _dish(rng: random.Random, i: int) -> dict:
+    return {
+        "id": str(rng.getrandbits(40)),
+        "name": f"{rng.choice(_DISHES)}{'' if i < len(_DISHES) else f' ({i})'}",
+        "description": "Slow-cooked with whole spices, fresh cream and a hint of kasuri methi. Serves 1-2. " * 2,
+        "price": rng.randrange(9, 60) * 1000,
+        "isVeg": rng.random() < 0.5,
+        "inStock": True,
+        "ratings": {"aggregatedRating": {"rating": str(round(rng.uniform(3.6, 4.9), 1)), "ratingCount": f"{rng.randrange(20, 900)} ratings"}},
+        "variantsV2": {"variantGroups": [{"groupId": "1", "name": "Quantity", "variations": [
+            {"id": "11", "name": "Half", "price": 0}, {"id": "12", "name": "Full", "price": 12000}]}]},
+        "addons": [{"groupId": "2", "groupName": "Extras", "choices": [
+            {"id": str(rng.getrandbits(24)), "name": "Extra Gravy", "price": 3000},
+            {"id": str(rng.getrandbits(24)), "name": "Raita", "price": 4500}]}],
+        "imageId": _image(rng),
+        "analytics": _analytics(rng),
+    }
+
+
+def _product(rng: random.Random, i: int) -> dict:
+    name = rng.choice(_PRODUCTS)
+    return {
+        "productId": str(rng.getrandbits(40)),
+        "displayName": name,
+        "brand": name.split()[0],
+        "variations": [
+            {"id": str(rng.getrandbits(32)), "quantity": q, "price": {"mrp": p, "offerPrice": p - rng.randrange(0, 10)},
+             "images": [_image(rng), _image(rng)], "inventory": {"inStock": True, "maxAllowed": 5}}
+            for q, p in (("500 ml", rng.randrange(25, 60)), ("1 L", rng.randrange(55, 110)))
+        ],
+        "category": "Dairy, Bread & Eggs",
+        "analytics": _analytics(rng),
+    }
+
+
+def _address(rng: random.Random, i: int) -> dict:
+    return {
+        "id": f"addr_{i}",
+        "annotation": ["Home", "Office", "Other"][i % 3],
+        "address": f"{rng.randrange(1, 400)}, {rng.randrange(1, 20)}th Cross, {rng.choice(_AREAS)}",
+        "area": rng.choice(_AREAS),
+        "lat": round(rng.uniform(12.9, 13.1), 6),
+        "lng": round(rng.uniform(77.5, 77.7), 6),
+    }
+
+
+def _payload(tool: str, arguments: dict) -> dict:
+    """Deterministic payload for a tool call (same arguments, same result)."""
+    digest = hashlib.sha256(f"{tool}:{json.dumps(arguments, sort_keys=True, default=str)}".encode()).digest()
+    rng = random.Random(digest)
+    kind, n = TOOL_SPECS[tool]["payload"]
+    if kind == "addresses" or kind == "locations":
+        return {"statusCode": 0, "data": {"addresses": [_address(rng, i) for i in range(n)]}}
+    if kind == "restaurants":
+        return {"statusCode": 0, "data": {"restaurants": [_restaurant(rng, i) for i in range(n)]}}
+    if kind == "dishes":
+        return {"statusCode": 0, "data": {"dishes": [{"restaurant": _restaurant(rng, i), "dish": _dish(rng, i)} for i in range(n)]}}
+    if kind == "menu":
+        per_category = max(1, n // 8)
+        return {"statusCode": 0, "data": {
+            "restaurant": _restaurant(rng, 0),
+            "categories": [{"title": c, "items": [_dish(rng, i) for i in range(per_category)]} for c in _CUISINES[:8]],
+        }}
+    if kind == "products":
+        return {"statusCode": 0, "data": {"products": [_product(rng, i) for i in range(n)]}}
+    if kind == "details":
+        restaurant = _restaurant(rng, 0)
+        restaurant.update({"ambiance": "Rooftop seating with live music on weekends", "popularDishes": rng.sample(_DISHES, 5),
+                           "offers": [{"title": "Flat 20% off on total bill", "terms": "Valid on pre-booking"}]})
+        return {"statusCode": 0, "data": restaurant}
+    if kind == "slots":
+        return {"statusCode": 0, "data": {"slots": [
+            {"slotId": f"s{i}", "time": f"{18 + i // 4}:{(i % 4) * 15:02d}", "available": rng.random() > 0.2} for i in range(n)]}}
+    if kind == "coupons":
+        return {"statusCode": 0, "data": {"coupons": [
+            {"code": f"SWIGGY{rng.randrange(10, 99)}", "description": "Get 20% off up to ₹120 on orders above ₹249",
+             "discount": rng.randrange(50, 150)} for _ in range(n)]}}
+    if kind == "cart":
+        items = [{"itemId": str(rng.getrandbits(32)), "name": rng.choice(_DISHES), "quantity": rng.randrange(1, 3),
+                  "price": rng.randrange(9, 60) * 1000} for _ in range(n)]
+        return {"statusCode": 0, "data": {"cartId": f"cart_{rng.getrandbits(32):x}", "items": items,
+                                          "bill": {"itemTotal": sum(i["price"] * i["quantity"] for i in items), "deliveryFee": 3900}}}
+    if kind == "orders":
+        return {"statusCode": 0, "data": {"orders": [
+            {"orderId": str(rng.getrandbits(40)), "status": "DELIVERED", "total": rng.randrange(200, 900),
+             "restaurant": _restaurant(rng, i)["name"]} for i in range(n)]}}
+    if kind == "order":
+        return {"statusCode": 0, "data": {"orderId": str(rng.getrandbits(40)), "status": "PLACED", "paymentMethod": "COD",
+                                          "eta": f"{rng.randrange(25, 45)} mins"}}
+    if kind == "tracking":
+        return {"statusCode": 0, "data": {"status": "OUT_FOR_DELIVERY", "deliveryPartner": "Ravi", "etaMinutes": rng.randrange(5, 25)}}
+    if kind == "booking":
+        return {"statusCode": 0, "data": {"bookingId": str(rng.getrandbits(40)), "status": "CONFIRMED"}}
+    return {"statusCode": 0, "data": {"success": True}}
+
+
+class SimStats:
+    def __init__(self):
+        self.connections: set[tuple] = set()
+        self.requests = 0
+        self.tool_calls: dict[str, int] = {}
+        self.tool_errors = 0
+        self.http_errors = 0
+        self.stalls = 0
+        self.outage_requests = 0
+        self.tokens_issued = 0
+        self.refreshes = 0
+        self.unauthorized = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "tcp_connections": len(self.connections),
+            "requests": self.requests,
+            "tool_calls": dict(sorted(self.tool_calls.items())),
+            "tool_errors": self.tool_errors,
+            "http_errors": self.http_errors,
+            "stalls": self.stalls,
+            "outage_requests": self.outage_requests,
+            "tokens_issued": self.tokens_issued,
+            "refreshes": self.refreshes,
+            "unauthorized": self.unauthorized,
+        }
+
+
+class SwiggySimulator:
+    """All three Swiggy MCP services plus an OAuth server on one local port."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_scale: float = 1.0,
+        error_rate: float = 0.0,
+        stall_rate: float = 0.0,
+        http_error_rate: float = 0.0,
+        token_ttl: int = 3600,
+        seed: int = 7,
+        tls: bool = False,
+    ):
+        if tls and not HYPERCORN_AVAILABLE:
+            raise RuntimeError("tls=True needs hypercorn (pip install hypercorn)")
+        self.tls = tls
+        self.ca_file: str | None = None
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.http_error_rate = http_error_rate
+        self.token_ttl = token_ttl
+        # Service name -> "down" or "hang"; may be changed while running.
+        self.outages: dict[str, str] = {}
+        self.stats = SimStats()
+        self._rng = random.Random(seed)
+        self._access_tokens: dict[str, float] = {}
+        self._refresh_tokens: set[str] = set()
+        self._codes: set[str] = set()
+        self._managers = {
+            path: StreamableHTTPSessionManager(app=self._build_server(service))
+            for service, path in SERVICE_PATHS.items()
+        }
+        self._path_services = {path: service for service, path in SERVICE_PATHS.items()}
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self.host, self.port = self._sock.getsockname()[:2]
+        if tls:
+            self._sock.listen(2048)
+            self._tls_config = self._hypercorn_config()
+            self._stopping: asyncio.Event | None = None
+            self._started = threading.Event()
+        else:
+            config = uvicorn.Config(self._app, interface="asgi3", log_config=None, lifespan="on", backlog=2048)
+            self._server = uvicorn.Server(config)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"{'https' if self.tls else 'http'}://{self.host}:{self.port}"
+
+    def _hypercorn_config(self):
+        """HTTPS (h2 + http/1.1 via ALPN) with a certificate for self.host."""
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+        import ipaddress
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "swiggy-simulator")])
+        now = datetime.now(timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(minutes=5)).not_valid_after(now + timedelta(days=1))
+            .add_extension(x509.SubjectAlternativeName([
+                x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address(self.host)),
+            ]), critical=False)
+            .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+            .sign(key, hashes.SHA256())
+        )
+        directory = Path(tempfile.mkdtemp(prefix="swiggy-sim-tls-"))
+        (directory / "cert.pem").write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+        (directory / "key.pem").write_bytes(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+        ))
+        self.ca_file = str(directory / "cert.pem")
+
+        config = hypercorn.config.Config()
+        # hypercorn owns the listening socket from here on.
+        config.bind = [f"fd://{self._sock.detach()}"]
+        config.certfile, config.keyfile = self.ca_file, str(directory / "key.pem")
+        config.keep_alive_timeout = 60
+        config.loglevel = "WARNING"
+        return config
+
+    def _serve_tls(self):
+        async def serve():
+            self._stopping = asyncio.Event()
+            self._started.set()
+            await hypercorn.asyncio.serve(self._app, self._tls_config, shutdown_trigger=self._stopping.wait)
+
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(serve())
+
+    def endpoints(self) -> dict[str, str]:
+        return {service: self.base_url + path for service, path in SERVICE_PATHS.items()}
+
+    # ---- MCP ----
+
+    def _build_server(self, service: str) -> Server:
+        server = Server(service)
+        tools = [
+            types.Tool(
+                name=name,
+                description=f"Simulated Swiggy {name.replace('_', ' ')}",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        param: {"type": kind, **({"items": {"type": "object"}} if kind == "array" else {})}
+                        for param, kind in spec["params"].items()
+                    },
+                },
+            )
+            for name, spec in TOOL_SPECS.items()
+            if service in spec["services"]
+        ]
+
+        @server.list_tools()
+        async def list_tools() -> list[types.Tool]:
+            await asyncio.sleep(self._latency((60, 250)))
+            return tools
+
+        @server.call_tool(validate_input=False)
+        async def call_tool(name: str, arguments: dict) -> types.CallToolResult:
+            self.stats.tool_calls[name] = self.stats.tool_calls.get(name, 0) + 1
+            if self.outages.get(service) == "hang":
+                self.stats.outage_requests += 1
+                await asyncio.sleep(3600)
+            delay = self._latency(TOOL_SPECS[name]["latency_ms"])
+            if self._rng.random() < self.stall_rate:
+                self.stats.stalls += 1
+                delay *= 20
+            await asyncio.sleep(delay)
+            if self._rng.random() < self.error_rate:
+                self.stats.tool_errors += 1
+                return types.CallToolResult(
+                    content=[types.TextContent(type="text", text="Swiggy service is temporarily unavailable")],
+                    isError=True,
+                )
+            text = json.dumps(_payload(name, arguments), indent=2, ensure_ascii=False)
+            return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+        return server
+
+    def _latency(self, p50_p99_ms: tuple[float, float]) -> float:
+        p50, p99 = p50_p99_ms
+        sigma = (math.log(p99) - math.log(p50)) / 2.326
+        return self._rng.lognormvariate(math.log(p50), sigma) / 1000 * self.latency_scale
+
+    # ---- ASGI ----
+
+    async def _app(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        self.stats.requests += 1
+        if scope.get("client"):
+            self.stats.connections.add(tuple(scope["client"]))
+
+        path = scope["path"].rstrip("/") or "/"
+        manager = self._managers.get(path)
+        if manager is not None:
+            if not self._authorized(scope):
+                self.stats.unauthorized += 1
+                metadata = f"{self.base_url}/.well-known/oauth-protected-resource{path}"
+                await Response(status_code=401, headers={
+                    "WWW-Authenticate": f'Bearer error="invalid_token", resource_metadata="{metadata}"',
+                })(scope, receive, send)
+                return
+            if self.outages.get(self._path_services[path]) == "down":
+                self.stats.outage_requests += 1
+                await Response("Service Unavailable", status_code=503)(scope, receive, send)
+                return
+            if self._rng.random() < self.http_error_rate:
+                self.stats.http_errors += 1
+                await Response("Service Unavailable", status_code=503)(scope, receive, send)
+                return
+            await manager.handle_request(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+        if path.startswith("/.well-known/oauth-protected-resource"):
+            resource = self.base_url + (path.removeprefix("/.well-known/oauth-protected-resource") or "")
+            response = JSONResponse({"resource": resource, "authorization_servers": [self.base_url + "/"]})
+        elif path.startswith("/.well-known/oauth-authorization-server") or path.startswith("/.well-known/openid-configuration"):
+            response = JSONResponse(self._authorization_server_metadata())
+        elif path == "/register":
+            response = await self._register(request)
+        elif path == "/authorize":
+            response = self._authorize(request)
+        elif path == "/token":
+            response = await self._token(request)
+        elif path == "/sim/stats":
+            response = JSONResponse(self.stats.as_dict())
+        else:
+            response = Response("Not Found", status_code=404)
+        await response(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        async with AsyncExitStack() as stack:
+            for manager in self._managers.values():
+                await stack.enter_async_context(manager.run())
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    break
+        await send({"type": "lifespan.shutdown.complete"})
+
+    # ---- OAuth ----
+
+    def _authorized(self, scope) -> bool:
+        header = dict(scope["headers"]).get(b"authorization", b"").decode()
+        if not header.startswith("Bearer "):
+            return False
+        expires_at = self._access_tokens.get(header[7:])
+        return expires_at is not None and time.time() < expires_at
+
+    def _authorization_server_metadata(self) -> dict:
+        return {
+            "issuer": self.base_url + "/",
+            "authorization_endpoint": self.base_url + "/authorize",
+            "token_endpoint": self.base_url + "/token",
+            "registration_endpoint": self.base_url + "/register",
+            "response_types_supported": ["code"],
+            "grant_types_supported": ["authorization_code", "refresh_token"],
+            "code_challenge_methods_supported": ["S256"],
+            "token_endpoint_auth_methods_supported": ["none"],
+        }
+
+    async def _register(self, request: Request) -> JSONResponse:
+        metadata = await request.json()
+        return JSONResponse({
+            **metadata,
+            "client_id": "sim-" + secrets.token_hex(8),
+            "client_id_issued_at": int(time.time()),
+        }, status_code=201)
+
+    def _authorize(self, request: Request) -> Response:
+        """Auto-approve and redirect back with a code (no login page)."""
+        code = secrets.token_urlsafe(16)
+        self._codes.add(code)
+        params = {"code": code}
+        if request.query_params.get("state"):
+            params["state"] = request.query_params["state"]
+        return RedirectResponse(f"{request.query_params['redirect_uri']}?{urlencode(params)}", status_code=302)
+
+    async def _token(self, request: Request) -> JSONResponse:
+        form = await request.form()
+        grant = form.get("grant_type")
+        if grant == "authorization_code" and form.get("code") in self._codes:
+            self._codes.discard(form["code"])
+        elif grant == "refresh_token" and form.get("refresh_token") in self._refresh_tokens:
+            self._refresh_tokens.discard(form["refresh_token"])
+            self.stats.refreshes += 1
+        else:
+            return JSONResponse({"error": "invalid_grant"}, status_code=400)
+        return JSONResponse(self.issue_tokens())
+
+    def issue_tokens(self) -> dict:
+        access, refresh = secrets.token_urlsafe(24), secrets.token_urlsafe(24)
+        self._access_tokens[access] = time.time() + self.token_ttl
+        self._refresh_tokens.add(refresh)
+        self.stats.tokens_issued += 1
+        return {"access_token": access, "token_type": "Bearer", "expires_in": self.token_ttl, "refresh_token": refresh}
+
+    # ---- lifecycle ----
+
+    def start(self):
+        if self.tls:
+            self._thread = threading.Thread(target=self._serve_tls, daemon=True)
+            self._thread.start()
+            self._started.wait()
+            return self
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._sock]}, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        if self.tls:
+            if self._stopping is not None:
+                self._loop.call_soon_threadsafe(self._stopping.set)
+        else:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def seed_token_storage(base_url: str, path: Path, redirect_uri: str = "http://localhost:8765/callback",
+                       ca_file: str | None = None):
+    """Log in against a running simulator and write a FileTokenStorage file.
+
+    Runs the same register -> authorize -> token exchange as the real login,
+    without a browser, so load tests start with valid credentials.
+    """
+    verify = ssl.create_default_context(cafile=ca_file) if ca_file else True
+    with httpx.Client(base_url=base_url, verify=verify) as client:
+        client_info = client.post("/register", json={
+            "redirect_uris": [redirect_uri],
+            "token_endpoint_auth_method": "none",
+            "grant_types": ["authorization_code", "refresh_token"],
+            "response_types": ["code"],
+            "client_name": "Swiggy Voice Agent (load test)",
+        }).json()
+        redirect = client.get("/authorize", params={
+            "client_id": client_info["client_id"], "redirect_uri": redirect_uri, "response_type": "code",
+        })
+        code = parse_qs(urlparse(redirect.headers["location"]).query)["code"][0]
+        tokens = client.post("/token", data={
+            "grant_type": "authorization_code", "code": code, "client_id": client_info["client_id"],
+        }).json()
+    path.write_text(json.dumps({
+        "generation": 1,
+        "tokens": tokens,
+        "expires_at": time.time() + tokens["expires_in"],
+        "client_info": client_info,
+    }, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--http-error-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--tls", action="store_true", help="HTTPS + HTTP/2 (needs hypercorn)")
+    args = parser.parse_args()
+
+    sim = SwiggySimulator(
+        host=args.host, port=args.port, latency_scale=args.latency_scale, error_rate=args.error_rate,
+        stall_rate=args.stall_rate, http_error_rate=args.http_error_rate, token_ttl=args.token_ttl,
+        tls=args.tls,
+    )
+    print(f"Swiggy MCP simulator on {sim.base_url}", flush=True)
+    for service, url in sim.endpoints().items():
+        print(f"  {service}: {url}", flush=True)
+    if args.tls:
+        print(f"  trust it with SSL_CERT_FILE={sim.ca_file}", flush=True)
+        sim._serve_tls()
+    else:
+        sim._server.run(sockets=[sim._sock])
+
+
+if __name__ == "__main__":
+    main()
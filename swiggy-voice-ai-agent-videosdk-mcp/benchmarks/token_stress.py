@@ -0,0 +1,163 @@
+"""
+Multi-process token refresh stress test for FileTokenStorage.
+
+Starts the local Swiggy simulator with a short access-token lifetime and
+spawns --processes long-lived processes (like the phone worker's job
+processes) that share one token file. Every round waits for the access
+token to expire, then releases all processes at once to connect to an MCP
+endpoint, so each of them needs a refresh at the same moment. The simulator
+rotates refresh tokens: a duplicate refresh with an already-used refresh
+token fails and would force an interactive re-login.
+
+Meanwhile a reader thread parses the token file in a loop to catch torn
+writes.
+
+Expected: one refresh per round, every connect succeeds, no login and no
+torn reads.
+
+Run: python benchmarks/token_stress.py [--processes 16] [--rounds 5] [--ttl 2]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mcp import ClientSession  # noqa: E402
+from mcp.client.streamable_http import streamablehttp_client  # noqa: E402
+
+from swiggy_mcp import create_oauth_provider  # noqa: E402
+from swiggy_simulator import SwiggySimulator, seed_token_storage  # noqa: E402
+from token_store import FileTokenStorage  # noqa: E402
+
+
+async def _worker_rounds(token_file: Path, base_url: str, rounds: int, barrier, results):
+    auth = create_oauth_provider(server_url=base_url, storage=FileTokenStorage(token_file))
+    login_attempts = []
+
+    async def no_login(auth_url: str):
+        login_attempts.append(auth_url)
+        raise RuntimeError("interactive login required")
+
+    auth.context.redirect_handler = no_login
+
+    for round_index in range(rounds):
+        await asyncio.to_thread(barrier.wait)
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            async with streamablehttp_client(url=base_url + "/food", auth=auth) as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+        except Exception as e:
+            outcome = "login" if login_attempts else f"error: {type(e).__name__}"
+        login_attempts.clear()
+        results.put((round_index, os.getpid(), outcome, (time.perf_counter() - started) * 1000))
+
+
+def _worker(token_file: Path, base_url: str, rounds: int, barrier, results):
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(_worker_rounds(token_file, base_url, rounds, barrier, results))
+
+
+def _watch_for_torn_reads(path: Path, stop: threading.Event, counts: dict):
+    while not stop.is_set():
+        try:
+            json.loads(path.read_text())
+            counts["reads"] += 1
+        except json.JSONDecodeError:
+            counts["torn"] += 1
+        except OSError:
+            pass
+        time.sleep(0.0005)  # leave the GIL to the in-process simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--ttl", type=int, default=2, help="access token lifetime in seconds")
+    args = parser.parse_args()
+
+    sim = SwiggySimulator(port=0, latency_scale=0.05, token_ttl=args.ttl).start()
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(args.processes + 1)
+    results = ctx.Queue()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        token_file = Path(tmp) / "tokens.json"
+        seed_token_storage(sim.base_url, token_file)
+
+        workers = [
+            ctx.Process(target=_worker, args=(token_file, sim.base_url, args.rounds, barrier, results))
+            for _ in range(args.processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        counts = {"reads": 0, "torn": 0}
+        stop = threading.Event()
+        watcher = threading.Thread(target=_watch_for_torn_reads, args=(token_file, stop, counts), daemon=True)
+        watcher.start()
+
+        print(f"{args.processes} processes, {args.rounds} rounds, token TTL {args.ttl}s\n")
+        print(f"  {'round':<7}{'refreshes':>10}{'ok':>5}{'login':>7}{'errors':>8}{'p50 ms':>9}{'max ms':>9}")
+        totals = {"refreshes": 0, "ok": 0, "login": 0, "errors": 0}
+        try:
+            for round_index in range(args.rounds):
+                expires_at = json.loads(token_file.read_text()).get("expires_at") or time.time()
+                time.sleep(max(0.0, expires_at - time.time()) + 0.2)
+                refreshes_before = sim.stats.refreshes
+                barrier.wait(timeout=120)
+
+                outcomes, latencies = [], []
+                for _ in range(args.processes):
+                    try:
+                        _, _, outcome, ms = results.get(timeout=60)
+                    except queue.Empty:
+                        outcome, ms = "error: no result", 0.0
+                    outcomes.append(outcome)
+                    latencies.append(ms)
+                latencies.sort()
+
+                row = {
+                    "refreshes": sim.stats.refreshes - refreshes_before,
+                    "ok": outcomes.count("ok"),
+                    "login": outcomes.count("login"),
+                    "errors": sum(1 for o in outcomes if o.startswith("error")),
+                }
+                for key, value in row.items():
+                    totals[key] += value
+                print(f"  {round_index:<7}{row['refreshes']:>10}{row['ok']:>5}{row['login']:>7}{row['errors']:>8}"
+                      f"{latencies[len(latencies) // 2]:>9.0f}{latencies[-1]:>9.0f}")
+                for outcome in sorted({o for o in outcomes if o.startswith("error")}):
+                    print(f"         {outcome}")
+        finally:
+            stop.set()
+            watcher.join()
+            for worker in workers:
+                worker.join(timeout=10)
+                if worker.is_alive():
+                    worker.terminate()
+            final = json.loads(token_file.read_text())
+            sim.stop()
+
+    print(f"\n  refreshes: {totals['refreshes']} for {args.rounds} rounds (ideal {args.rounds})")
+    print(f"  connects:  {totals['ok']} ok, {totals['login']} needed a login, {totals['errors']} errors")
+    print(f"  token file: generation {final.get('generation')}, "
+          f"{counts['reads']} concurrent reads, {counts['torn']} torn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Offline voice-turn latency report from turn_tracing JSONL files.
+
+Reads every span written by the agents (default: the .swiggy_traces
+directory) and prints p50/p95/p99 per stage across all sessions, grouped by
+agent. Tool calls are reported per tool (tool.<name>).
+
+Run: python benchmarks/turn_report.py [PATH ...] [--agent agent_one]
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from turn_tracing import STAGES, TRACE_DIR  # noqa: E402
+
+STAGE_ORDER = ["turn", *STAGES]
+
+
+def load_spans(paths: list[Path]):
+    for path in paths:
+        files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+        for file in files:
+            with open(file) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _stage_key(name: str) -> tuple:
+    if name in STAGE_ORDER:
+        return (0, STAGE_ORDER.index(name), name)
+    return (1, 0, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", type=Path, default=[TRACE_DIR])
+    parser.add_argument("--agent", help="only report this agent (agent_one, agent_two, agent_phone)")
+    args = parser.parse_args()
+
+    durations: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+    sessions: dict[str, set] = defaultdict(set)
+    for span in load_spans(args.paths):
+        if args.agent and span.get("agent") != args.agent:
+            continue
+        durations[span["agent"]][span["name"]].append(span["duration_ms"])
+        sessions[span["agent"]].add(span["session_id"])
+
+    if not durations:
+        print("No turn spans found.")
+        return
+
+    for agent in sorted(durations):
+        stages = durations[agent]
+        print(f"\n{agent}: {len(sessions[agent])} sessions, {len(stages.get('turn', []))} turns")
+        print(f"  {'stage':<34}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name in sorted(stages, key=_stage_key):
+            values = sorted(stages[name])
+            print(
+                f"  {name:<34}{len(values):>7}"
+                f"{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}{percentile(values, 99):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
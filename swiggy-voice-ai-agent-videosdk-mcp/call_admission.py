@@ -0,0 +1,234 @@
+"""
+Admission control and a scaling signal for the phone worker.
+
+Every phone call runs in its own job process and holds a Gemini Live
+session plus Swiggy MCP traffic. CallAdmission caps how many calls are
+active on a host:
+
+  - a call takes one of MAX_ACTIVE_CALLS slots before the agent joins
+  - when all are taken it queues (the caller keeps ringing) for up to
+    ADMISSION_QUEUE_TIMEOUT seconds; the longest-waiting call gets the
+    next free slot
+  - if no slot frees up in time the call is rejected: the agent tells the
+    caller the line is busy and hangs up
+
+The worker accepts MAX_ACTIVE_CALLS + MAX_QUEUED_CALLS jobs; past that it
+reports itself unavailable and the dispatcher sends calls elsewhere.
+
+Slots are lock files under ADMISSION_DIR held with flock, so a job process
+that dies gives its slot back with it. Holders and waiters write their pid
+into their file, which lets the worker count active and queued calls
+without taking any lock. Without fcntl (Windows) every call is admitted.
+
+ScalingPolicy turns in-flight calls into the number of workers to run.
+The worker exports swiggy_calls_active, swiggy_calls_queued and
+swiggy_worker_desired_replicas for an external autoscaler to act on (e.g.
+a Kubernetes HPA on the metric); the framework cannot grow a running
+worker past max_processes.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from metrics import _pid_alive, get_metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+ADMISSION_DIR = Path(__file__).parent / ".swiggy_admission"
+MAX_ACTIVE_CALLS = 8
+MAX_QUEUED_CALLS = 2
+ADMISSION_QUEUE_TIMEOUT = 20.0
+ADMISSION_POLL_INTERVAL = 0.1
+
+# Scaling: keep each worker's active calls near TARGET_UTILIZATION of
+# MAX_ACTIVE_CALLS; scale down only after SCALE_DOWN_DELAY seconds of lower
+# demand so a lull between calls does not drain warm workers.
+TARGET_UTILIZATION = 0.7
+MIN_WORKERS = 1
+MAX_WORKERS = 20
+SCALE_DOWN_DELAY = 300.0
+SCALING_INTERVAL = 5.0
+
+
+class CallAdmission:
+    """Cross-process call slots for one host."""
+
+    def __init__(self, directory: Path = ADMISSION_DIR, max_active: int = MAX_ACTIVE_CALLS,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self._dir = directory
+        self.max_active = max_active
+        self.queue_timeout = queue_timeout
+        self._queue_dir = directory / "queue"
+
+    def _slot_path(self, index: int) -> Path:
+        return self._dir / f"slot-{index}.lock"
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold a call slot for the block. Yields how long the call queued
+        (seconds), or None if it was rejected."""
+        if not FCNTL_AVAILABLE:
+            yield 0.0
+            return
+        await asyncio.to_thread(self._queue_dir.mkdir, parents=True, exist_ok=True)
+        started = time.monotonic()
+        # Only skip the queue when nobody is waiting in it.
+        slot = None if await asyncio.to_thread(self._waiters) else await asyncio.to_thread(self._try_slot)
+        if slot is None:
+            slot = await self._wait_in_queue()
+        waited = time.monotonic() - started
+        if slot is None:
+            get_metrics().inc("swiggy_calls_admitted_total", {"outcome": "rejected"})
+            logger.warning(f"All {self.max_active} call slots busy for {waited:.0f}s; rejecting the call")
+            yield None
+            return
+        get_metrics().inc("swiggy_calls_admitted_total", {"outcome": "queued" if waited > 0.01 else "immediate"})
+        get_metrics().observe("swiggy_call_queue_seconds", {}, waited)
+        if waited > 0.01:
+            logger.info(f"Call admitted after queueing {waited:.1f}s")
+        try:
+            yield waited
+        finally:
+            await asyncio.to_thread(self._release, slot)
+
+    def _try_slot(self):
+        """Lock the first free slot file; returns the open file or None."""
+        for index in range(self.max_active):
+            f = open(self._slot_path(index), "a+")
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                continue
+            f.seek(0)
+            f.truncate()
+            f.write(str(os.getpid()))
+            f.flush()
+            return f
+        return None
+
+    def _release(self, slot):
+        slot.seek(0)
+        slot.truncate()
+        slot.flush()
+        fcntl.flock(slot.fileno(), fcntl.LOCK_UN)
+        slot.close()
+
+    async def _wait_in_queue(self):
+        ticket = self._queue_dir / f"{time.time_ns()}-{os.getpid()}"
+        await asyncio.to_thread(ticket.write_text, str(os.getpid()))
+        deadline = time.monotonic() + self.queue_timeout
+        try:
+            while time.monotonic() < deadline:
+                if (await asyncio.to_thread(self._waiters))[:1] == [ticket.name]:
+                    slot = await asyncio.to_thread(self._try_slot)
+                    if slot is not None:
+                        return slot
+                await asyncio.sleep(ADMISSION_POLL_INTERVAL)
+            return None
+        finally:
+            ticket.unlink(missing_ok=True)
+
+    def _waiters(self) -> list[str]:
+        """Queue tickets of live processes, oldest first; drops dead ones."""
+        waiters = []
+        for ticket in sorted(self._queue_dir.glob("*-*"), key=lambda p: int(p.name.split("-")[0])):
+            if _pid_alive(int(ticket.name.split("-")[1])):
+                waiters.append(ticket.name)
+            else:
+                ticket.unlink(missing_ok=True)
+        return waiters
+
+    def counts(self) -> tuple[int, int]:
+        """(active, queued) calls on this host."""
+        active = 0
+        for index in range(self.max_active):
+            try:
+                pid = self._slot_path(index).read_text().strip()
+            except OSError:
+                continue
+            active += bool(pid) and _pid_alive(int(pid))
+        queued = len(self._waiters()) if self._queue_dir.exists() else 0
+        return active, queued
+
+
+class ScalingPolicy:
+    """Desired worker count from in-flight calls, with a scale-down delay."""
+
+    def __init__(self, capacity: int = MAX_ACTIVE_CALLS, target: float = TARGET_UTILIZATION,
+                 min_workers: int = MIN_WORKERS, max_workers: int = MAX_WORKERS,
+                 scale_down_delay: float = SCALE_DOWN_DELAY):
+        self.capacity = capacity
+        self.target = target
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.scale_down_delay = scale_down_delay
+        self._desired = min_workers
+        self._lower_since: float | None = None
+
+    def desired(self, in_flight: int, now: float | None = None) -> int:
+        """`in_flight` is active + queued calls across the fleet."""
+        now = time.monotonic() if now is None else now
+        wanted = math.ceil(in_flight / (self.capacity * self.target)) if in_flight else 0
+        wanted = max(self.min_workers, min(self.max_workers, wanted))
+        if wanted >= self._desired:
+            self._desired, self._lower_since = wanted, None
+        elif self._lower_since is None:
+            self._lower_since = now
+        elif now - self._lower_since >= self.scale_down_delay:
+            self._desired, self._lower_since = wanted, None
+        return self._desired
+
+
+def start_scaling_signal(admission: "CallAdmission | None" = None, policy: ScalingPolicy | None = None,
+                         interval: float = SCALING_INTERVAL) -> threading.Thread:
+    """Export this host's call counts and the desired worker count as gauges.
+
+    Run in the worker's main process next to start_metrics_server(). The
+    desired count is the policy applied to this host's calls, which is the
+    fleet answer for a single worker. With several workers, sum
+    swiggy_calls_active + swiggy_calls_queued across them and apply
+    ScalingPolicy to the total (an HPA with a per-worker target of
+    capacity * TARGET_UTILIZATION is the same rule).
+    """
+    admission = admission or get_call_admission()
+    policy = policy or ScalingPolicy(capacity=admission.max_active)
+
+    def update_forever():
+        while True:
+            try:
+                active, queued = admission.counts()
+                desired = policy.desired(active + queued)
+                metrics = get_metrics()
+                metrics.gauge_set("swiggy_calls_active", {}, active)
+                metrics.gauge_set("swiggy_calls_queued", {}, queued)
+                metrics.gauge_set("swiggy_worker_desired_replicas", {}, desired)
+            except OSError as e:
+                logger.warning(f"Could not count active calls: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=update_forever, name="swiggy-scaling-signal", daemon=True)
+    thread.start()
+    return thread
+
+
+_admission: CallAdmission | None = None
+
+
+def get_call_admission() -> CallAdmission:
+    global _admission
+    if _admission is None:
+        _admission = CallAdmission()
+    return _admission
@@ -0,0 +1,210 @@
+"""
+Per-service circuit breakers for the Swiggy MCP endpoints.
+
+One breaker per service (food, instamart, dineout) watches the outcome of
+every tool call and connect over the last BREAKER_WINDOW seconds. A call
+counts once, after its retries, however many attempts it took.
+It opens when, with at least BREAKER_MIN_CALLS outcomes in the window,
+  - the share of failures (timeouts, transport errors, dropped sessions)
+    reaches BREAKER_ERROR_RATE, or
+  - the share of calls slower than BREAKER_SLOW_CALL reaches
+    BREAKER_SLOW_RATE,
+or right away after BREAKER_CONSECUTIVE_FAILURES failures in a row (a
+service that is down never reaches the minimum). Errors a tool reports
+itself (isError results) mean the service answered and count as successes.
+
+While open, calls to the service are rejected at once and SwiggyMCPServer
+drops its tools from the list it returns. After a cooldown the breaker goes
+half-open and a background probe decides: a cheap read-only call
+(reconnecting first if the session ended) that answers within
+BREAKER_SLOW_CALL closes it, anything else reopens it with the cooldown
+doubled up to the BREAKER_COOLDOWN cap. Calls never wait on a probe.
+Outcomes of calls that started before the last state change are ignored,
+so calls stuck in an outage cannot reopen a circuit that just closed.
+
+Breakers are process-wide (get_circuit_breakers()), so every conversation
+in a process shares what the others learned.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from metrics import get_metrics, service_label
+
+logger = logging.getLogger(__name__)
+
+BREAKER_WINDOW = 60.0
+BREAKER_MIN_CALLS = 5
+BREAKER_ERROR_RATE = 0.5
+BREAKER_SLOW_CALL = 4.0
+BREAKER_SLOW_RATE = 0.8
+BREAKER_CONSECUTIVE_FAILURES = 3
+BREAKER_COOLDOWN = (5.0, 120.0)  # first cooldown, cap (seconds)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Closed -> open -> half-open state machine for one service."""
+
+    def __init__(
+        self,
+        service: str,
+        window: float = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        slow_call: float = BREAKER_SLOW_CALL,
+        slow_rate: float = BREAKER_SLOW_RATE,
+        consecutive_failures: int = BREAKER_CONSECUTIVE_FAILURES,
+        cooldown: tuple[float, float] = BREAKER_COOLDOWN,
+    ):
+        self.service = service
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call = slow_call
+        self.slow_rate = slow_rate
+        self.consecutive_failures = consecutive_failures
+        self.cooldown_bounds = cooldown
+        self.state = CLOSED
+        self.reason = ""
+        self.opened_at = 0.0
+        self.cooldown = cooldown[0]
+        self._outcomes: deque = deque()  # (monotonic time, failed, slow)
+        self._failures_in_row = 0
+        self.generation = 0  # bumped on every state change
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def allow(self) -> bool:
+        """Whether a call may go to the service now."""
+        if self.state == CLOSED:
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self, seconds: float = 0.0, generation: int | None = None):
+        """Record an answered call; pass the `generation` read when it started."""
+        self._record(False, seconds >= self.slow_call, f"calls slower than {self.slow_call:.0f}s", generation)
+
+    def record_failure(self, reason: str, generation: int | None = None):
+        self._record(True, False, reason, generation)
+
+    def _record(self, failed: bool, slow: bool, reason: str, generation: int | None):
+        with self._lock:
+            if self.state != CLOSED or generation not in (None, self.generation):
+                return  # late result of a call started before the last state change
+            now = time.monotonic()
+            self._outcomes.append((now, failed, slow))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            self._failures_in_row = self._failures_in_row + 1 if failed else 0
+
+            calls = len(self._outcomes)
+            if self._failures_in_row >= self.consecutive_failures:
+                self._open(f"{self._failures_in_row} failures in a row, last: {reason}")
+            elif calls >= self.min_calls:
+                failures = sum(1 for _, f, _ in self._outcomes if f)
+                slow_calls = sum(1 for _, _, s in self._outcomes if s)
+                if failures / calls >= self.error_rate:
+                    self._open(f"{failures}/{calls} calls failed, last: {reason}")
+                elif slow_calls / calls >= self.slow_rate:
+                    self._open(f"{slow_calls}/{calls} {reason}")
+
+    def probe_in(self) -> float:
+        """Seconds until a probe may start (0 when one is due)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def begin_probe(self) -> bool:
+        """Move an open breaker whose cooldown has passed to half-open.
+
+        Returns True for exactly one caller, which must then call
+        probe_succeeded(), probe_failed() or abandon_probe().
+        """
+        with self._lock:
+            if self.state != OPEN or time.monotonic() < self.opened_at + self.cooldown:
+                return False
+            self._transition(HALF_OPEN)
+            self.stats["probes"] += 1
+            return True
+
+    def probe_succeeded(self):
+        with self._lock:
+            if self.state != HALF_OPEN:
+                return
+            self.cooldown = self.cooldown_bounds[0]
+            self._outcomes.clear()
+            self._failures_in_row = 0
+            self.reason = ""
+            self._transition(CLOSED)
+            logger.info(f"Circuit for {self.service} closed: probe succeeded")
+
+    def probe_failed(self, reason: str):
+        with self._lock:
+            if self.state != HALF_OPEN:
+                return
+            self.cooldown = min(self.cooldown_bounds[1], self.cooldown * 2)
+            self._open(f"probe failed: {reason}")
+
+    def abandon_probe(self):
+        """Return to open without counting the probe (e.g. it was cancelled)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+
+    def _open(self, reason: str):
+        self.reason = reason
+        self.opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        self._transition(OPEN)
+        logger.warning(f"Circuit for {self.service} open for {self.cooldown:.0f}s: {reason}")
+
+    def _transition(self, state: str):
+        self.state = state
+        self.generation += 1
+        get_metrics().gauge_set("swiggy_circuit_state", {"service": service_label(self.service)},
+                                _STATE_VALUES[state])
+
+    def __repr__(self):
+        return f"CircuitBreaker({self.service}, {self.state})"
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per service name, created on first use."""
+
+    def __init__(self, **settings):
+        self._settings = settings
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, service: str) -> CircuitBreaker:
+        breaker = self._breakers.get(service)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(service, CircuitBreaker(service, **self._settings))
+        return breaker
+
+    def states(self) -> dict[str, str]:
+        return {service: breaker.state for service, breaker in self._breakers.items()}
+
+
+_breakers: CircuitBreakers | None = None
+
+
+def get_circuit_breakers() -> CircuitBreakers:
+    """Process-wide breakers shared by every SwiggyMCPServer."""
+    global _breakers
+    if _breakers is None:
+        _breakers = CircuitBreakers()
+    return _breakers
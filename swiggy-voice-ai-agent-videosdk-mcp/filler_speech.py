@@ -0,0 +1,184 @@
+"""
+Filler speech while Swiggy tool calls are slow.
+
+A caller on the phone hears nothing while the model waits on a tool. Once
+tool calls have been running for FILLER_THRESHOLD seconds, FillerSpeech
+speaks a short line through session.say ("Let me check that for you"),
+and one "still working" line after FILLER_FOLLOWUP_AFTER seconds.
+
+  - Calls that overlap (call_tools_parallel, parallel function calls) form
+    one busy period with at most those two lines.
+  - If the results arrive before the threshold, nothing is said.
+  - No line is started while the agent is already speaking (e.g. the model
+    said "let me look that up" itself before calling the tool).
+  - A line that has started is finished before the result is handed back
+    (waiting at most FILLER_SETTLE seconds), so the reply never talks over
+    it. An interrupted tool call cuts the line off instead.
+  - Lines vary and never repeat back to back, and are kept out of the
+    chat history where the framework allows it.
+
+Fillers are counted in swiggy_filler_speech_total and the time of each
+covered busy period in swiggy_filler_covered_seconds; stats has the same
+per conversation.
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+
+from metrics import get_metrics
+from turn_tracing import get_turn_tracer
+
+logger = logging.getLogger(__name__)
+
+FILLER_THRESHOLD = 1.0
+FILLER_FOLLOWUP_AFTER = 6.0
+FILLER_SETTLE = 3.0
+
+FILLER_LINES = (
+    "Let me check that for you.",
+    "One moment, I'm looking that up.",
+    "Give me a second.",
+    "Just checking with Swiggy.",
+    "Hang on, pulling that up.",
+)
+FOLLOWUP_LINES = (
+    "Still working on it, thanks for waiting.",
+    "Swiggy's taking a moment, almost there.",
+    "Bear with me, still checking.",
+)
+
+
+class FillerSpeech:
+    """Watchdog around tool execution that speaks filler lines via `say`.
+
+    `say` is the agent session's say(); `is_speaking` reports whether agent
+    audio is playing (defaults to the turn tracer's playback marks).
+    """
+
+    def __init__(
+        self,
+        say,
+        threshold: float = FILLER_THRESHOLD,
+        followup_after: float | None = FILLER_FOLLOWUP_AFTER,
+        lines: tuple[str, ...] = FILLER_LINES,
+        followup_lines: tuple[str, ...] = FOLLOWUP_LINES,
+        is_speaking=None,
+    ):
+        self._say = say
+        self._say_kwargs = _transient_say_kwargs(say)
+        self.threshold = threshold
+        self.followup_after = followup_after
+        self.lines = lines
+        self.followup_lines = followup_lines
+        self._is_speaking = is_speaking or get_turn_tracer().agent_speaking
+        self._busy = 0
+        self._period_started = 0.0
+        self._watchdog: asyncio.Task | None = None
+        self._speech: asyncio.Task | None = None
+        self._spoke = False
+        self._last_line: str | None = None
+        self.stats = {"busy_periods": 0, "fillers": 0, "skipped_speaking": 0, "covered_seconds": 0.0}
+
+    @asynccontextmanager
+    async def covering(self, label: str):
+        """Wrap one tool call; fillers play if the busy period runs long."""
+        self._enter(label)
+        interrupted = False
+        try:
+            yield
+        except asyncio.CancelledError:
+            interrupted = True
+            raise
+        finally:
+            speech = self._leave(label, interrupted)
+            if speech is not None:
+                await self._settle(speech)
+
+    def _enter(self, label: str):
+        self._busy += 1
+        if self._busy == 1:
+            self._period_started = time.perf_counter()
+            self._spoke = False
+            self.stats["busy_periods"] += 1
+            self._watchdog = asyncio.ensure_future(self._watch(label))
+
+    def _leave(self, label: str, interrupted: bool) -> asyncio.Task | None:
+        """End one call; at the end of the busy period, stop the watchdog and
+        return a filler still being spoken (None if there is none)."""
+        self._busy -= 1
+        if self._busy:
+            return None
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        speech, self._speech = self._speech, None
+        if self._spoke:
+            covered = time.perf_counter() - self._period_started
+            self.stats["covered_seconds"] += covered
+            get_metrics().observe("swiggy_filler_covered_seconds", {}, covered)
+            logger.info(f"Filler covered {covered:.1f}s of '{label}'")
+        if speech is None or speech.done():
+            return None
+        if interrupted:
+            speech.cancel()
+            return None
+        return speech
+
+    async def _watch(self, label: str):
+        await asyncio.sleep(self.threshold)
+        await self._filler(self.lines, label)
+        if self.followup_after is not None:
+            await asyncio.sleep(max(0.0, self._period_started + self.followup_after - time.perf_counter()))
+            await self._filler(self.followup_lines, label)
+
+    async def _filler(self, lines: tuple[str, ...], label: str):
+        if self._is_speaking():
+            self.stats["skipped_speaking"] += 1
+            return
+        line = random.choice([line for line in lines if line != self._last_line] or lines)
+        self._last_line = line
+        self._spoke = True
+        self.stats["fillers"] += 1
+        get_metrics().inc("swiggy_filler_speech_total", {})
+        logger.info(f"Filler after {time.perf_counter() - self._period_started:.1f}s of '{label}': {line!r}")
+        # The watchdog may be cancelled while the line plays; the line itself
+        # is finished or cut off by _leave().
+        self._speech = asyncio.ensure_future(self._speak(line))
+        await asyncio.shield(self._speech)
+
+    async def _speak(self, line: str):
+        handle = None
+        try:
+            handle = await self._say(line, **self._say_kwargs)
+            if inspect.isawaitable(handle):
+                await handle  # UtteranceHandle: done when playback ends
+        except asyncio.CancelledError:
+            if handle is not None and hasattr(handle, "interrupt"):
+                try:
+                    handle.interrupt()
+                except Exception as e:
+                    logger.debug(f"Could not interrupt filler: {e}")
+            raise
+        except Exception as e:
+            logger.warning(f"Filler speech failed: {e}")
+
+    async def _settle(self, speech: asyncio.Task):
+        try:
+            await asyncio.wait_for(asyncio.shield(speech), FILLER_SETTLE)
+        except asyncio.TimeoutError:
+            logger.info(f"Filler still playing after {FILLER_SETTLE:.0f}s; returning the result")
+        except Exception:
+            pass
+
+
+def _transient_say_kwargs(say) -> dict:
+    """Keep fillers out of the chat history when say() supports it."""
+    try:
+        parameters = inspect.signature(say).parameters
+    except (TypeError, ValueError):
+        return {}
+    return {"add_to_chat_context": False} if "add_to_chat_context" in parameters else {}
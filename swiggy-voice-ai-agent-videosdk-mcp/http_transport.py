@@ -0,0 +1,308 @@
+"""
+Shared, pooled HTTP transport for all Swiggy MCP endpoints.
+
+All three endpoints live on mcp.swiggy.com, but streamablehttp_client builds
+its own httpx client (and so its own connection pool) per session. Instead
+every session gets a throwaway AsyncClient on top of one SharedTransport per
+event loop, so TCP+TLS connections are reused across services and concurrent
+calls. With the optional `h2` package installed the transport speaks HTTP/2
+and multiplexes every request and SSE stream over a handful of connections.
+
+Over HTTP/1.1 each session's SSE stream (the long-lived GET) holds a
+connection of its own, so max_connections must stay above the number of
+concurrent sessions. Those streams get a pool of their own: httpcore's pool
+bookkeeping grows with the square of its size, and its keep-alive limit
+counts busy connections too, so streams sharing the request pool slowed
+every request and got idle connections closed. Reuse on HTTP/1.1 also
+depends on reading each response to its end. The MCP client closes a
+POST's SSE response as soon as the JSON-RPC result arrives, before the
+server's end-of-stream chunk, and httpcore drops a connection with unread
+body bytes, so SharedTransport drains such a response for up to
+DRAIN_TIMEOUT / DRAIN_MAX_BYTES on close.
+
+Sharing is per event loop, not per process: sessions opened on a phone
+call's own loop share a pool with that call only, not with other calls
+(pooled sessions all run on the session pool's loop). A loop's transport is
+shut down as soon as the last client on it closes, e.g. at
+SwiggyMCPServer.disconnect(), so a finished call leaves no sockets behind;
+its counters stay in transport_stats().
+
+Usage:
+  configure_transport(max_connections=50, keepalive_expiry=60)
+  streamablehttp_client(url, httpx_client_factory=shared_http_client_factory)
+  transport_stats()  # open connections, reuse ratio, queueing time
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+
+import anyio
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HTTP_MAX_CONNECTIONS = 100
+# httpcore (1.0.x) closes every idle connection once the pool holds more
+# than this many connections in total, busy ones included; below
+# max_connections, a burst of concurrent requests dropped every connection.
+HTTP_MAX_KEEPALIVE_CONNECTIONS = HTTP_MAX_CONNECTIONS
+HTTP_KEEPALIVE_EXPIRY = 30.0
+
+# How long / how much of an HTTP/1.1 response body closed early is read to
+# keep its connection reusable.
+DRAIN_TIMEOUT = 0.25
+DRAIN_MAX_BYTES = 64 * 1024
+
+_settings = {
+    "max_connections": HTTP_MAX_CONNECTIONS,
+    "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+    "http2": HTTP2_AVAILABLE,
+}
+
+
+class TransportStats:
+    """Counters for one SharedTransport."""
+
+    def __init__(self):
+        self.requests = 0
+        self.http2_requests = 0
+        self.new_connections = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+        self.drained = 0
+
+    def add(self, other: "TransportStats"):
+        self.requests += other.requests
+        self.http2_requests += other.http2_requests
+        self.new_connections += other.new_connections
+        self.queue_time_total += other.queue_time_total
+        self.queue_time_max = max(self.queue_time_max, other.queue_time_max)
+        self.drained += other.drained
+
+    def as_dict(self) -> dict:
+        reused = self.requests - self.new_connections
+        return {
+            "requests": self.requests,
+            "http2_requests": self.http2_requests,
+            "new_connections": self.new_connections,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "queue_ms_avg": round(self.queue_time_total / self.requests * 1000, 2) if self.requests else 0.0,
+            "queue_ms_max": round(self.queue_time_max * 1000, 2),
+            "drained": self.drained,
+        }
+
+
+class _DrainOnClose(httpx.AsyncByteStream):
+    """Response body that is read to its end when closed early, so an
+    HTTP/1.1 connection can be reused instead of being dropped."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, stats: TransportStats):
+        self._stream = stream
+        self._stats = stats
+        self._chunks = None
+        self._finished = False
+
+    async def __aiter__(self):
+        self._chunks = self._stream.__aiter__()
+        async for chunk in self._chunks:
+            yield chunk
+        self._finished = True
+
+    async def aclose(self):
+        if self._chunks is not None and not self._finished:
+            drained = 0
+            with anyio.move_on_after(DRAIN_TIMEOUT):
+                async for chunk in self._chunks:
+                    drained += len(chunk)
+                    if drained > DRAIN_MAX_BYTES:
+                        break
+                else:
+                    self._stats.drained += 1
+        await self._stream.aclose()
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Connection pools shared by every MCP client on one event loop: one
+    for requests, one for SSE streams (GETs), which are never reused.
+
+    Each client gets a _ClientTransport handle on it; the pools are torn
+    down by shutdown(), which runs once the last handle is closed.
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool):
+        self.clients = 0
+        self._transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+        self._streams = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=limits.max_connections, max_keepalive_connections=0),
+            http2=http2,
+        )
+        self.stats = TransportStats()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        marks: dict[str, float] = {}
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict):
+            marks.setdefault(event_name, time.perf_counter())
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        if request.method == "GET":
+            response = await self._streams.handle_async_request(request)
+            self._record(started, marks, response)
+            return response
+        response = await self._transport.handle_async_request(request)
+        self._record(started, marks, response)
+        if response.extensions.get("http_version") != b"HTTP/2":
+            # An HTTP/2 stream closed early is reset without touching its connection.
+            response.stream = _DrainOnClose(response.stream, self.stats)
+        return response
+
+    def _record(self, started: float, marks: dict, response: httpx.Response):
+        stats = self.stats
+        stats.requests += 1
+        if response.extensions.get("http_version") == b"HTTP/2":
+            stats.http2_requests += 1
+
+        setup = 0.0
+        if "connection.connect_tcp.started" in marks:
+            stats.new_connections += 1
+            setup_end = marks.get("connection.start_tls.complete") or marks.get(
+                "connection.connect_tcp.complete", marks["connection.connect_tcp.started"]
+            )
+            setup = setup_end - marks["connection.connect_tcp.started"]
+
+        sent = marks.get("http11.send_request_headers.started") or marks.get(
+            "http2.send_request_headers.started"
+        )
+        if sent is not None:
+            queued = max(0.0, sent - started - setup)
+            stats.queue_time_total += queued
+            stats.queue_time_max = max(stats.queue_time_max, queued)
+
+    def open_connections(self) -> int:
+        return len(self._transport._pool.connections) + len(self._streams._pool.connections)
+
+    async def aclose(self):
+        pass
+
+    async def shutdown(self):
+        await asyncio.gather(self._transport.aclose(), self._streams.aclose())
+
+
+class _ClientTransport(httpx.AsyncBaseTransport):
+    """One client's handle on its loop's SharedTransport. Closing it (the
+    client does on exit) releases the client's hold on the shared pools."""
+
+    def __init__(self, shared: SharedTransport):
+        self._shared = shared
+        self._closed = False
+        shared.clients += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._shared.handle_async_request(request)
+
+    async def aclose(self):
+        if self._closed:
+            return
+        self._closed = True
+        await _release(self._shared)
+
+
+_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SharedTransport]" = (
+    weakref.WeakKeyDictionary()
+)
+# Counters of transports already shut down.
+_retired_stats = TransportStats()
+
+
+async def _release(transport: SharedTransport):
+    """Shut the transport down once no client uses it. It is unregistered
+    first, so a client created meanwhile gets a fresh one."""
+    transport.clients -= 1
+    if transport.clients > 0:
+        return
+    loop = asyncio.get_running_loop()
+    if _transports.get(loop) is transport:
+        del _transports[loop]
+    _retired_stats.add(transport.stats)
+    await transport.shutdown()
+
+
+def configure_transport(
+    max_connections: int | None = None,
+    max_keepalive_connections: int | None = None,
+    keepalive_expiry: float | None = None,
+    http2: bool | None = None,
+):
+    """Override pool settings. Applies to transports created afterwards."""
+    overrides = {
+        "max_connections": max_connections,
+        "max_keepalive_connections": max_keepalive_connections,
+        "keepalive_expiry": keepalive_expiry,
+        "http2": http2,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            _settings[key] = value
+    if _settings["http2"] and not HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        _settings["http2"] = False
+
+
+def get_shared_transport() -> SharedTransport:
+    """The shared transport for the running event loop.
+
+    httpcore connections are bound to the loop that opened them, so each loop
+    (the pool loop, or a call's own loop in the phone worker) gets its own.
+    """
+    loop = asyncio.get_running_loop()
+    transport = _transports.get(loop)
+    if transport is None:
+        limits = httpx.Limits(
+            max_connections=_settings["max_connections"],
+            max_keepalive_connections=_settings["max_keepalive_connections"],
+            keepalive_expiry=_settings["keepalive_expiry"],
+        )
+        transport = SharedTransport(limits, http2=_settings["http2"])
+        _transports[loop] = transport
+    return transport
+
+
+def shared_http_client_factory(
+    headers: dict[str, str] | None = None,
+    timeout: httpx.Timeout | None = None,
+    auth: httpx.Auth | None = None,
+) -> httpx.AsyncClient:
+    """McpHttpClientFactory that builds clients on the shared transport."""
+    if timeout is None:
+        timeout = httpx.Timeout(30.0, read=300.0)
+    return httpx.AsyncClient(
+        transport=_ClientTransport(get_shared_transport()),
+        headers=headers,
+        timeout=timeout,
+        auth=auth,
+    )
+
+
+def transport_stats() -> dict:
+    """Pool stats summed over every shared transport in this process, shut
+    down ones included; open_connections counts the live ones."""
+    totals = TransportStats()
+    totals.add(_retired_stats)
+    open_connections = 0
+    for transport in list(_transports.values()):
+        totals.add(transport.stats)
+        open_connections += transport.open_connections()
+    return {"open_connections": open_connections, "http2": _settings["http2"], **totals.as_dict()}
@@ -0,0 +1,181 @@
+"""
+Intent-scoped tools and instructions for the cascading agent.
+
+Most conversations stay with one Swiggy service, yet every LLM turn would
+carry the workflows and tool schemas of all three. IntentRouter matches the
+user's transcript against keyword lists seeded from the STEP 0 intents in
+instructions.py, and IntentScope narrows the agent to the detected service:
+the system prompt becomes scoped_instructions(service) and the tool list
+that service's tools (shared ones like get_addresses included).
+
+  - No scope until an intent is heard: the first turns see everything.
+  - A turn without a clear intent ("yes", "the second one") keeps the
+    current scope; a turn naming another service switches to it.
+  - While scoped the model also gets switch_service, so a switch the
+    keywords missed costs one tool call instead of a dead end.
+
+SHARED_INSTRUCTIONS stays the first part of every prompt, so a provider's
+prompt cache keeps hitting on it across scopes.
+"""
+
+import logging
+import re
+
+from videosdk.agents import ChatRole
+from videosdk.agents.utils import create_generic_mcp_adapter, get_tool_info
+
+from instructions import SERVICE_NAMES, scoped_instructions
+from metrics import get_metrics, service_label
+
+logger = logging.getLogger(__name__)
+
+# Service -> phrases that signal it. A phrase scores its word count, so
+# "book a table" outweighs a dish name in "book a table for biryani".
+INTENT_KEYWORDS = {
+    "swiggy-food": (
+        "order food", "food delivery", "deliver food", "hungry", "craving", "lunch", "dinner",
+        "breakfast", "snack", "biryani", "pizza", "burger", "dosa", "idli", "paneer", "thali",
+        "shawarma", "momos", "rolls", "dessert", "restaurant menu", "track my food",
+    ),
+    "swiggy-instamart": (
+        "instamart", "groceries", "grocery", "milk", "eggs", "bread", "cooking", "ingredients",
+        "household items", "vegetables", "fruits", "atta", "cooking oil",
+        "amul", "maggi", "detergent", "shampoo", "toothpaste",
+    ),
+    "swiggy-dineout": (
+        "dineout", "book a table", "table for", "reserve a table", "reservation", "eat out",
+        "dine in", "dine-in", "date night", "party booking", "my booking", "table booking",
+    ),
+}
+
+SWITCH_SERVICE_TOOL = {
+    "name": "switch_service",
+    "description": (
+        "Load the tools and workflow of another Swiggy service. Call this when "
+        "the user wants a service other than the active one."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "service": {
+                "type": "string",
+                "enum": [service_label(service) for service in SERVICE_NAMES],
+                "description": "food (delivery), instamart (groceries) or dineout (table booking)",
+            },
+        },
+        "required": ["service"],
+    },
+}
+
+
+class IntentRouter:
+    """Keyword intent detection over a transcript; no model call."""
+
+    def __init__(self, keywords: dict[str, tuple[str, ...]] = INTENT_KEYWORDS):
+        self._patterns = {
+            service: re.compile(r"\b(" + "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)) + r")\b")
+            for service, phrases in keywords.items()
+        }
+
+    def scores(self, text: str) -> dict[str, int]:
+        text = text.lower()
+        return {
+            service: sum(len(match.split()) for match in pattern.findall(text))
+            for service, pattern in self._patterns.items()
+        }
+
+    def detect(self, text: str) -> str | None:
+        """The one service the text points to, or None if none or a tie."""
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] == 0 or (len(ranked) > 1 and ranked[1][1] == ranked[0][1]):
+            return None
+        return ranked[0][0]
+
+
+class IntentScope:
+    """Keeps an agent's system prompt and tools scoped to one Swiggy service.
+
+    `server` is the agent's SwiggyMCPServer. Each scope is rebuilt from the
+    tools it currently publishes, so services the breaker hides or restores
+    and catalog changes are picked up; service_tool_names() says which tools
+    belong to which service. Tools of no service (get_more_results, the
+    agent's own tools) are always kept.
+    """
+
+    def __init__(self, agent, server, router: IntentRouter | None = None):
+        self.agent = agent
+        self.server = server
+        self.router = router or IntentRouter()
+        self.service: str | None = None
+        self._published: frozenset[str] = frozenset()
+        self.switch_tool = create_generic_mcp_adapter(
+            tool_name=SWITCH_SERVICE_TOOL["name"],
+            tool_description=SWITCH_SERVICE_TOOL["description"],
+            input_schema=SWITCH_SERVICE_TOOL["input_schema"],
+            client_call_function=self._switch_service,
+        )
+
+    def route(self, transcript: str) -> str | None:
+        """Scope to the service `transcript` asks for, if any; returns the
+        active service. Call before the LLM sees the turn."""
+        service = self.router.detect(transcript)
+        if service is not None and service != self.service:
+            self.apply(service, trigger="intent")
+        elif self.service is not None and self._published != self._published_names():
+            # Tools were hidden, restored or re-listed since the scope was set.
+            self.apply(self.service, trigger="refresh")
+        return self.service
+
+    def apply(self, service: str, trigger: str = "intent") -> bool:
+        tools = self._tools_for(service)
+        if tools is None:
+            return False
+        previous, self.service = self.service, service
+        self.agent.update_tools(tools)
+        self._set_system_prompt(scoped_instructions(service))
+        get_metrics().inc("swiggy_intent_scope_switches_total",
+                          {"service": service_label(service), "trigger": trigger})
+        logger.info(f"Scoped to {service} ({trigger}; was {previous}): {len(tools)} tools")
+        return True
+
+    def _published_names(self) -> frozenset[str]:
+        published = self.server.exposed_tools() or []
+        return frozenset(get_tool_info(tool).name for tool in published)
+
+    def _tools_for(self, service: str) -> list | None:
+        """The agent's tools for `service`, or None when the Swiggy tools are
+        not registered yet (or the service has none or is hidden by an open
+        circuit), so nothing is hidden."""
+        names_by_service = self.server.service_tool_names()
+        published = self.server.exposed_tools()
+        if published is None or not names_by_service.get(service):
+            return None
+        self._published = frozenset(get_tool_info(tool).name for tool in published)
+        swiggy_tools = self._published.union(*self.server.service_tool_names(include_hidden=True).values())
+        own_tools = [
+            tool for tool in self.agent.tools
+            if tool is not self.switch_tool and get_tool_info(tool).name not in swiggy_tools
+        ]
+        service_tools = set().union(*names_by_service.values())
+        keep = names_by_service[service]
+        return [self.switch_tool] + own_tools + [
+            tool for tool in published
+            if get_tool_info(tool).name in keep or get_tool_info(tool).name not in service_tools
+        ]
+
+    def _set_system_prompt(self, text: str):
+        """Replace the system message in place, so it keeps its position."""
+        for item in self.agent.chat_context.items:
+            if getattr(item, "role", None) == ChatRole.SYSTEM:
+                item.content = [text]
+                return
+        self.agent.chat_context.add_message(role=ChatRole.SYSTEM, content=text)
+
+    async def _switch_service(self, parameters):
+        service = f"swiggy-{parameters.get('service', '')}"
+        if service not in SERVICE_NAMES:
+            return {"error": f"Unknown service '{parameters.get('service')}'. Use food, instamart or dineout."}
+        if service != self.service and not self.apply(service, trigger="tool"):
+            return {"error": f"Swiggy {service_label(service).title()} is not available right now."}
+        return {"active_service": service_label(service),
+                "note": f"The {SERVICE_NAMES[service]} tools are now available."}
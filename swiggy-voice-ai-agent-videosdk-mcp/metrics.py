@@ -0,0 +1,445 @@
+"""
+Per-tool latency and error metrics with a Prometheus-style endpoint.
+
+Every Swiggy MCP tool call records, labelled by service (food, instamart,
+dineout) and tool name:
+  - swiggy_tool_call_seconds        latency histogram (plus status label)
+  - swiggy_tool_calls_total         calls by status: ok, error, timeout, cancelled
+  - swiggy_tool_request_bytes       argument payload size
+  - swiggy_tool_response_bytes      result payload size
+  - swiggy_tool_calls_in_flight     gauge
+Each attempt of a call counts separately. tool_deadlines adds
+swiggy_tool_retries_total, swiggy_tool_hedges_total and
+swiggy_tool_deadline_exceeded_total and swiggy_tool_calls_rejected_total
+(open circuit); circuit_breaker sets swiggy_circuit_state per service;
+intent_router counts swiggy_intent_scope_switches_total. Reads that joined
+an identical call already in flight count in swiggy_tool_calls_coalesced_total
+instead of making a request. filler_speech counts swiggy_filler_speech_total
+and swiggy_filler_covered_seconds.
+Connection setup is covered by swiggy_mcp_connect_seconds (transport +
+initialize), swiggy_mcp_list_tools_seconds and swiggy_oauth_refresh_seconds.
+Token health: swiggy_oauth_refreshes_total (by trigger: background or
+request, and outcome) and swiggy_oauth_token_expires_in_seconds (per pid).
+worker_warmup times each warm-up step in swiggy_worker_warmup_seconds;
+call_admission counts swiggy_calls_admitted_total, swiggy_call_queue_seconds
+and the swiggy_calls_active / swiggy_calls_queued /
+swiggy_worker_desired_replicas gauges.
+
+The phone worker runs calls in separate job processes. Each process keeps
+its own in-memory registry and a background thread flushes snapshots to
+METRICS_DIR/<pid>-<start time>.json, so a process that reuses a pid gets a
+file of its own. The worker's main process serves /metrics and merges every
+snapshot on scrape. When a process has exited, its counters and histograms
+are folded into METRICS_DIR/retired.json and its file is deleted; its gauges
+are dropped.
+
+Usage:
+  start_metrics_server(host="localhost", port=9464)   # worker main process
+  start_metrics_flusher()                             # each job process
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = Path(__file__).parent / ".swiggy_metrics"
+RETIRED_FILE = "retired.json"
+METRICS_FLUSH_INTERVAL = 5.0
+METRICS_PORT = 9464
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Metric name -> (type, help, histogram buckets)
+METRICS = {
+    "swiggy_tool_call_seconds": ("histogram", "Swiggy MCP tool call latency", LATENCY_BUCKETS),
+    "swiggy_tool_calls_total": ("counter", "Swiggy MCP tool calls by status", None),
+    "swiggy_tool_request_bytes": ("histogram", "Tool call argument size", SIZE_BUCKETS),
+    "swiggy_tool_response_bytes": ("histogram", "Tool call result size", SIZE_BUCKETS),
+    "swiggy_tool_calls_in_flight": ("gauge", "Tool calls currently running", None),
+    "swiggy_tool_retries_total": ("counter", "Read tool calls retried after a timeout or transport error", None),
+    "swiggy_tool_hedges_total": ("counter", "Duplicate requests sent for slow read tool calls", None),
+    "swiggy_tool_deadline_exceeded_total": ("counter", "Tool calls not run because the turn budget was spent", None),
+    "swiggy_tool_calls_rejected_total": ("counter", "Tool calls rejected by an open circuit breaker", None),
+    "swiggy_tool_calls_coalesced_total": ("counter", "Read tool calls that joined an identical call in flight", None),
+    "swiggy_circuit_state": ("gauge", "Service circuit breaker: 0 closed, 1 half-open, 2 open", None),
+    "swiggy_intent_scope_switches_total": ("counter", "Agent scope changes by service and trigger", None),
+    "swiggy_filler_speech_total": ("counter", "Filler lines spoken while tool calls were slow", None),
+    "swiggy_filler_covered_seconds": ("histogram", "Tool wait covered by filler speech", LATENCY_BUCKETS),
+    "swiggy_prompt_audio_total": ("counter", "Fixed lines spoken, by source: pre-synthesized cache or live TTS", None),
+    "swiggy_mcp_connect_seconds": ("histogram", "Endpoint connect + initialize time", LATENCY_BUCKETS),
+    "swiggy_mcp_list_tools_seconds": ("histogram", "list_tools round-trip time", LATENCY_BUCKETS),
+    "swiggy_oauth_refresh_seconds": ("histogram", "OAuth token refresh time", LATENCY_BUCKETS),
+    "swiggy_oauth_refreshes_total": ("counter", "OAuth token refreshes by trigger and outcome", None),
+    "swiggy_oauth_token_expires_in_seconds": ("gauge", "Seconds until the access token expires", None),
+    "swiggy_worker_warmup_seconds": ("histogram", "Worker and job process warm-up time by step", LATENCY_BUCKETS),
+    "swiggy_calls_admitted_total": ("counter", "Phone calls by admission outcome: immediate, queued, rejected", None),
+    "swiggy_call_queue_seconds": ("histogram", "Time a call waited for a free call slot", LATENCY_BUCKETS),
+    "swiggy_calls_active": ("gauge", "Calls holding a call slot on this host", None),
+    "swiggy_calls_queued": ("gauge", "Calls waiting for a call slot on this host", None),
+    "swiggy_worker_desired_replicas": ("gauge", "Workers the scaling policy wants for the current load", None),
+}
+
+
+def service_label(service: str) -> str:
+    """'swiggy-food' -> 'food'."""
+    return service.removeprefix("swiggy-")
+
+
+def payload_size(payload) -> int:
+    if isinstance(payload, str):
+        return len(payload.encode())
+    return len(json.dumps(payload, default=str))
+
+
+def failure_status(exc: BaseException) -> str:
+    """Status label for a failed operation: cancelled, timeout or error."""
+    if isinstance(exc, asyncio.CancelledError):
+        return "cancelled"
+    if isinstance(exc, TimeoutError) or "timed out" in str(exc).lower():
+        return "timeout"
+    return "error"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = {}
+        self._gauges: dict[tuple, float] = {}
+        self._histograms: dict[tuple, list] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name: str, labels: dict, value: float = 1.0):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def gauge_add(self, name: str, labels: dict, delta: float):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + delta
+
+    def gauge_set(self, name: str, labels: dict, value: float):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, labels: dict, value: float):
+        """Record one histogram sample; state is [bucket counts..., sum, count]."""
+        buckets = METRICS[name][2]
+        key = self._key(name, labels)
+        with self._lock:
+            state = self._histograms.get(key)
+            if state is None:
+                state = self._histograms[key] = [0] * len(buckets) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self) -> dict:
+        pid, started = _process_identity()
+        with self._lock:
+            return {
+                "pid": pid,
+                "started": started,
+                "counters": [[n, dict(l), v] for (n, l), v in self._counters.items()],
+                "gauges": [[n, dict(l), v] for (n, l), v in self._gauges.items()],
+                "histograms": [[n, dict(l), list(s)] for (n, l), s in self._histograms.items()],
+            }
+
+
+_registry: MetricsRegistry | None = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide metrics registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+@contextmanager
+def timed(name: str, labels: dict):
+    """Observe the block's duration in histogram `name`, with a status label."""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = failure_status(e)
+        raise
+    finally:
+        get_metrics().observe(name, {**labels, "status": status}, time.perf_counter() - started)
+
+
+@contextmanager
+def track_tool_call(service: str, tool_name: str, parameters: dict | None):
+    """Latency, status, payload size and in-flight tracking for one tool call.
+
+    The block may set `call["response"]` to have the result size recorded.
+    """
+    metrics = get_metrics()
+    labels = {"service": service_label(service), "tool": tool_name}
+    metrics.observe("swiggy_tool_request_bytes", labels, payload_size(parameters or {}))
+    metrics.gauge_add("swiggy_tool_calls_in_flight", labels, 1)
+    call = {}
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield call
+    except BaseException as e:
+        status = failure_status(e)
+        raise
+    finally:
+        metrics.gauge_add("swiggy_tool_calls_in_flight", labels, -1)
+        metrics.observe("swiggy_tool_call_seconds", {**labels, "status": status}, time.perf_counter() - started)
+        metrics.inc("swiggy_tool_calls_total", {**labels, "status": status})
+        if "response" in call:
+            metrics.observe("swiggy_tool_response_bytes", labels, payload_size(call["response"]))
+
+
+# =============================================================
+#  Cross-process export
+# =============================================================
+
+def _process_start(pid: int) -> str | None:
+    """Start time of `pid` in clock ticks since boot, from /proc (Linux)."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    # Fields after the parenthesized command name start at field 3; starttime is field 22.
+    return stat.rsplit(")", 1)[1].split()[19]
+
+
+_identity: tuple[int, str] | None = None
+
+
+def _process_identity() -> tuple[int, str]:
+    """(pid, start time) of this process; recomputed after a fork."""
+    global _identity
+    pid = os.getpid()
+    if _identity is None or _identity[0] != pid:
+        _identity = (pid, _process_start(pid) or str(time.time_ns()))
+    return _identity
+
+
+def _write_json(path: Path, data: dict):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def _write_snapshot(directory: Path):
+    snapshot = get_metrics().snapshot()
+    _write_json(directory / f"{snapshot['pid']}-{snapshot['started']}.json", snapshot)
+
+
+_flusher: threading.Thread | None = None
+
+
+def start_metrics_flusher(directory: Path = METRICS_DIR, interval: float = METRICS_FLUSH_INTERVAL):
+    """Periodically publish this process's metrics for the worker's endpoint."""
+    global _flusher
+    if _flusher is not None:
+        return
+    directory.mkdir(exist_ok=True)
+
+    def flush_forever():
+        while True:
+            time.sleep(interval)
+            try:
+                _write_snapshot(directory)
+            except OSError as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+    _flusher = threading.Thread(target=flush_forever, name="swiggy-metrics-flush", daemon=True)
+    _flusher.start()
+
+
+def flush_metrics(directory: Path = METRICS_DIR):
+    """Write this process's snapshot now (e.g. when a call ends)."""
+    if _flusher is None:
+        return
+    try:
+        _write_snapshot(directory)
+    except OSError as e:
+        logger.warning(f"Could not write metrics snapshot: {e}")
+
+
+def _pid_alive(pid: int, started: str | None = None) -> bool:
+    """Whether `pid` is running and, when its start time is known, is still
+    the process that started then rather than a later one reusing the pid."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    current = _process_start(pid)
+    return started is None or current is None or current == started
+
+
+def _read_snapshot(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _merge(snapshots: list[dict]) -> dict:
+    """Counters and histograms of `snapshots` summed into one snapshot."""
+    counters: dict[tuple, float] = {}
+    histograms: dict[tuple, list] = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(sorted(labels.items())))
+            counters[key] = counters.get(key, 0.0) + value
+        for name, labels, state in snapshot["histograms"]:
+            key = (name, tuple(sorted(labels.items())))
+            merged = histograms.get(key)
+            histograms[key] = list(state) if merged is None else [a + b for a, b in zip(merged, state)]
+    return {
+        "pid": None,
+        "counters": [[n, dict(l), v] for (n, l), v in counters.items()],
+        "gauges": [],
+        "histograms": [[n, dict(l), s] for (n, l), s in histograms.items()],
+    }
+
+
+_retire_lock = threading.Lock()
+
+
+def collect(directory: Path = METRICS_DIR) -> list[dict]:
+    """This process's snapshot, every live process's published one, and the
+    retired totals of exited processes.
+
+    Snapshots of exited processes are folded into RETIRED_FILE and deleted.
+    """
+    own = get_metrics().snapshot()
+    snapshots = [own]
+    retired_path = directory / RETIRED_FILE
+    with _retire_lock:
+        retired = _read_snapshot(retired_path)
+        exited: list[tuple[Path, dict]] = []
+        for path in directory.glob("*.json"):
+            if path.name == RETIRED_FILE:
+                continue
+            snapshot = _read_snapshot(path)
+            if snapshot is None or (snapshot.get("pid"), snapshot.get("started")) == (own["pid"], own["started"]):
+                continue
+            if _pid_alive(snapshot["pid"], snapshot.get("started")):
+                snapshots.append(snapshot)
+            else:
+                exited.append((path, snapshot))
+        if exited:
+            folded = _merge(([retired] if retired else []) + [snapshot for _, snapshot in exited])
+            try:
+                _write_json(retired_path, folded)
+            except OSError as e:
+                # Keep the files; a later scrape folds them.
+                logger.warning(f"Could not write retired metrics: {e}")
+                snapshots.extend({**snapshot, "gauges": []} for _, snapshot in exited)
+            else:
+                retired = folded
+                for path, _ in exited:
+                    path.unlink(missing_ok=True)
+    if retired:
+        snapshots.append(retired)
+    return snapshots
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for k, v in sorted(labels.items()):
+        value = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{k}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render(snapshots: list[dict]) -> str:
+    """Merge snapshots and format them in the Prometheus text format."""
+    scalars: dict[tuple, float] = {}
+    histograms: dict[tuple, list] = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"] + snapshot["gauges"]:
+            key = (name, tuple(sorted(labels.items())))
+            scalars[key] = scalars.get(key, 0.0) + value
+        for name, labels, state in snapshot["histograms"]:
+            key = (name, tuple(sorted(labels.items())))
+            merged = histograms.get(key)
+            histograms[key] = state if merged is None else [a + b for a, b in zip(merged, state)]
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind != "histogram":
+            for (metric, labels), value in sorted(scalars.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(dict(labels))} {value:g}")
+            continue
+        for (metric, labels), state in sorted(histograms.items()):
+            if metric != name:
+                continue
+            labels = dict(labels)
+            cumulative = 0
+            for bound, count in zip(buckets, state):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': f'{bound:g}'})} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {state[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {state[-2]:g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {state[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    directory: Path = METRICS_DIR
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render(collect(self.directory)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(host: str = "localhost", port: int = METRICS_PORT,
+                         directory: Path = METRICS_DIR) -> ThreadingHTTPServer:
+    """Serve merged metrics of this worker and its job processes on /metrics."""
+    directory.mkdir(exist_ok=True)
+    for stale in directory.glob("*.json"):
+        stale.unlink(missing_ok=True)
+
+    handler = type("MetricsHandler", (_MetricsHandler,), {"directory": directory})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="swiggy-metrics-http", daemon=True).start()
+    logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,203 @@
+"""
+Pre-synthesized audio for the agents' fixed lines.
+
+GREETING, GOODBYE and the filler lines never change, yet every session
+would send them to the TTS provider again, and the greeting's round-trip
+sits between the caller joining and hearing anything. PromptAudioCache
+keeps their PCM on disk, content-addressed by a hash of the text, the TTS
+provider and its voice settings (model, voice, language, speed, sample
+rate, ...), so:
+
+  - a new voice or TTS setting is a different key; stale audio is never played
+  - every worker process shares one cache directory; files are written to
+    a temp file and renamed into place, like the tool catalog
+  - warm() fills the missing lines at worker startup, PromptVoice.say()
+    then plays cached lines as raw PCM via session.say(audio_data=...)
+
+A line that is not cached, or a framework whose say() takes no audio_data
+(videosdk-agents before 1.0, the realtime pipelines), falls back to live
+TTS. Cached plays are counted in swiggy_prompt_audio_total{source}.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from filler_speech import FILLER_LINES, FOLLOWUP_LINES
+from instructions import GOODBYE, GREETING
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+AUDIO_CACHE_DIR = Path(__file__).parent / ".swiggy_audio"
+
+# Every line the agents speak word for word.
+PROMPT_LINES = (GREETING, GOODBYE) + FILLER_LINES + FOLLOWUP_LINES
+
+# TTS attributes that change how a line sounds. Whichever a provider has
+# (public or underscore-prefixed) go into the cache key.
+VOICE_SETTING_ATTRS = (
+    "model", "model_id", "voice", "voice_id", "language", "speed", "emotion",
+    "pitch", "style", "output_format", "sample_rate", "num_channels",
+)
+
+# Bump whenever the key layout or the stored audio format changes.
+AUDIO_FORMAT_VERSION = 1
+
+# Lines synthesized at once while warming.
+WARM_CONCURRENCY = 4
+
+
+def voice_settings(tts) -> dict:
+    """The settings of `tts` that affect its output, for the cache key."""
+    settings = {"provider": f"{type(tts).__module__}.{type(tts).__name__}"}
+    for name in VOICE_SETTING_ATTRS:
+        for attr in (name, f"_{name}"):
+            try:
+                value = getattr(tts, attr)
+            except Exception:
+                continue
+            if isinstance(value, (str, int, float, bool)) or value is None:
+                settings[name] = value
+                break
+    return settings
+
+
+class PromptAudioCache:
+    """Content-addressed PCM files, one per (text, voice settings).
+
+    Reads are memoized per process; disk I/O runs in a thread so the event
+    loop never blocks on it.
+    """
+
+    def __init__(self, directory: Path = AUDIO_CACHE_DIR):
+        self._dir = directory
+        self._memo: dict[str, bytes] = {}
+        self.stats = {"hits": 0, "misses": 0, "synthesized": 0}
+
+    @staticmethod
+    def key(text: str, settings: dict) -> str:
+        blob = json.dumps({"v": AUDIO_FORMAT_VERSION, "text": text, "voice": settings}, sort_keys=True)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}.pcm"
+
+    async def get(self, text: str, settings: dict) -> bytes | None:
+        key = self.key(text, settings)
+        audio = self._memo.get(key)
+        if audio is None:
+            audio = await asyncio.to_thread(self._read, key)
+            if audio is not None:
+                self._memo[key] = audio
+        self.stats["hits" if audio is not None else "misses"] += 1
+        return audio
+
+    async def put(self, text: str, settings: dict, audio: bytes) -> None:
+        key = self.key(text, settings)
+        self._memo[key] = audio
+        try:
+            await asyncio.to_thread(self._write, key, audio)
+        except OSError as e:
+            logger.warning(f"Could not write prompt audio: {e}")
+
+    async def warm(self, tts, lines: tuple[str, ...] = PROMPT_LINES) -> int:
+        """Synthesize the lines not cached yet for `tts`; returns how many.
+
+        Failures are logged and skipped: those lines stay on live TTS.
+        """
+        if not hasattr(tts, "stream_synthesize"):
+            logger.info(f"{type(tts).__name__} cannot synthesize off the audio track; prompt audio not warmed")
+            return 0
+        settings = voice_settings(tts)
+        missing = [line for line in dict.fromkeys(lines)
+                   if await asyncio.to_thread(self._read, self.key(line, settings)) is None]
+        if not missing:
+            return 0
+        slots = asyncio.Semaphore(WARM_CONCURRENCY)
+
+        async def synthesize(line: str) -> bool:
+            async with slots:
+                try:
+                    audio = await _synthesize(tts, line)
+                except Exception as e:
+                    logger.warning(f"Could not pre-synthesize {line!r}: {e}")
+                    return False
+            if not audio:
+                return False
+            await self.put(line, settings, audio)
+            return True
+
+        done = sum(await asyncio.gather(*(synthesize(line) for line in missing)))
+        self.stats["synthesized"] += done
+        logger.info(f"Pre-synthesized {done}/{len(missing)} prompt lines for {settings['provider']}")
+        return done
+
+    def _read(self, key: str) -> bytes | None:
+        try:
+            return self._path(key).read_bytes() or None
+        except OSError:
+            return None
+
+    def _write(self, key: str, audio: bytes):
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self._dir, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+async def _synthesize(tts, text: str) -> bytes:
+    async def text_stream():
+        yield text
+
+    chunks = [chunk async for chunk in tts.stream_synthesize(text_stream()) if chunk]
+    return b"".join(chunks)
+
+
+class PromptVoice:
+    """session.say() that plays cached audio for fixed lines.
+
+    `tts` is the pipeline's TTS instance (its settings pick the cache key);
+    None means every line goes to live say().
+    """
+
+    def __init__(self, say, tts=None, cache: "PromptAudioCache | None" = None):
+        self._say = say
+        self._settings = voice_settings(tts) if tts is not None else None
+        self._cache = cache or get_prompt_audio()
+        try:
+            self._accepts = set(inspect.signature(say).parameters)
+        except (TypeError, ValueError):
+            self._accepts = set()
+        self._enabled = self._settings is not None and "audio_data" in self._accepts
+
+    async def say(self, message: str, add_to_chat_context: bool = True):
+        kwargs = {}
+        if not add_to_chat_context and "add_to_chat_context" in self._accepts:
+            kwargs["add_to_chat_context"] = False
+        audio = await self._cache.get(message, self._settings) if self._enabled else None
+        get_metrics().inc("swiggy_prompt_audio_total", {"source": "cache" if audio else "tts"})
+        if audio:
+            kwargs["audio_data"] = audio
+        return await self._say(message, **kwargs)
+
+
+_prompt_audio: PromptAudioCache | None = None
+
+
+def get_prompt_audio() -> PromptAudioCache:
+    global _prompt_audio
+    if _prompt_audio is None:
+        _prompt_audio = PromptAudioCache()
+    return _prompt_audio
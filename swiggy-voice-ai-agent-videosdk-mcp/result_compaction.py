@@ -0,0 +1,245 @@
+"""
+Tool-result compaction — shrink Swiggy payloads before they reach the LLM.
+
+Menus and product searches can return hundreds of items with images and
+analytics fields, while the instructions only ever have the model mention the
+top 2-3 options. Every extra input token delays the first audio of the reply
+in both the cascading and realtime pipelines.
+
+For each JSON text result the compactor:
+  - drops keys that only matter to a UI (DROP_KEYS) and image URL values
+  - keeps only allowlisted fields in the items of the result's top-level
+    lists, when a tool has `fields`
+  - truncates those top-level lists of objects to the tool's `top_n`;
+    lists nested in their items (variants, addons) are kept whole
+  - re-serializes without whitespace
+
+Truncated items are kept in a per-session side store, one entry per result
+holding the tails of all its lists, so a result never evicts its own pages.
+The list is replaced by its head plus a
+`{"more_results": {"result_id": ..., "remaining": N}}` marker, and the model
+pages through the rest with the `get_more_results` tool (see
+RESULT_PAGING_TOOL).
+"""
+
+import itertools
+import json
+import logging
+import re
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Tool name -> {"top_n": int, "fields": tuple[str, ...] | None}. `fields`
+# keeps only those keys of each top-level list item; "a.b" keeps only `b`
+# inside `a` (a dict, or each dict of a list). Every ID a later call takes
+# (restaurantId, addressId, item and variant ids) must stay listed. The
+# payload shapes belong to Swiggy's servers, so an allowlist matching none of
+# an item's keys leaves the item whole.
+_RESTAURANT_FIELDS = (
+    "id", "name", "cuisines", "avgRating", "sla.deliveryTime", "costForTwo", "areaName",
+    "locality", "isOpen", "aggregatedDiscountInfoV3.header",
+)
+_DISH_FIELDS = ("id", "name", "price", "isVeg", "inStock", "variantsV2", "addons")
+
+COMPACTION_RULES = {
+    "search_restaurants": {"top_n": 5, "fields": _RESTAURANT_FIELDS},
+    "search_menu": {"top_n": 8, "fields": (
+        "restaurant.id", "restaurant.name", "restaurant.avgRating", "restaurant.sla.deliveryTime",
+        *(f"dish.{field}" for field in _DISH_FIELDS),
+    )},
+    "get_restaurant_menu": {"top_n": 15, "fields": ("title", *(f"items.{field}" for field in _DISH_FIELDS))},
+    "search_products": {"top_n": 5, "fields": (
+        "productId", "displayName", "brand", "category",
+        "variations.id", "variations.quantity", "variations.price", "variations.inventory.inStock",
+    )},
+    "search_restaurants_dineout": {"top_n": 5, "fields": _RESTAURANT_FIELDS},
+    "get_available_slots": {"top_n": 10},
+    "get_addresses": {"fields": ("id", "annotation", "address", "area", "lat", "lng")},
+    "get_saved_locations": {"fields": ("id", "annotation", "address", "area", "lat", "lng")},
+}
+
+# Applied to every tool's result, so nothing here may be something the model
+# needs later: order and tracking identifiers answer "where is my order".
+# Besides UI-only keys this drops Swiggy's internal request, experiment and
+# layout IDs, which no tool takes as an argument.
+DROP_KEYS = {
+    "image", "images", "imageUrl", "image_url", "imageId", "imageIds",
+    "cloudinaryImageId", "thumbnail", "thumbnailUrl", "icon", "iconUrl",
+    "logo", "logoUrl", "banner", "bannerUrl", "analytics", "__typename",
+    "requestId", "traceId", "spanId", "sessionId", "deviceId", "correlationId",
+    "experimentId", "abExperiments", "widgetId", "layoutId", "collectionId",
+    "cloudinaryId", "seoData", "parentWidgetId",
+}
+
+_IMAGE_URL = re.compile(r"^https?://\S+\.(?:png|jpe?g|webp|gif|svg)(?:\?\S*)?$", re.IGNORECASE)
+
+# Results whose truncated tails are kept for paging, per session.
+RESULT_PAGE_STORE_SIZE = 32
+
+RESULT_PAGING_TOOL = {
+    "name": "get_more_results",
+    "description": (
+        "Get the next items of a truncated tool result. Call with the result_id "
+        "from a more_results marker when the user wants more options."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "result_id": {
+                "type": "string",
+                "description": "result_id from the more_results marker",
+            },
+        },
+        "required": ["result_id"],
+    },
+}
+
+
+def estimate_tokens(n_bytes: int) -> int:
+    """Rough token count for JSON/English text (~4 bytes per token)."""
+    return (n_bytes + 3) // 4
+
+
+class _ResultPages:
+    """Truncated list tails of one result: one side-store entry."""
+
+    def __init__(self, result_id: str):
+        self.result_id = result_id
+        self.lists: dict[str, tuple[list, dict]] = {}
+        self._ids = itertools.count(1)
+
+    def add(self, items: list, rule: dict, list_id: str | None = None) -> str:
+        list_id = list_id or f"{self.result_id}.{next(self._ids)}"
+        self.lists[list_id] = (items, rule)
+        return list_id
+
+
+class ResultCompactor:
+    """Per-session compaction stage plus side store for truncated items."""
+
+    def __init__(self, rules: dict | None = None, store_size: int = RESULT_PAGE_STORE_SIZE):
+        self.rules = dict(COMPACTION_RULES if rules is None else rules)
+        self.store_size = store_size
+        self._pages: OrderedDict[str, _ResultPages] = OrderedDict()
+        self._ids = itertools.count(1)
+        self.stats = {"results": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def compact(self, tool_name: str, result):
+        """Compact a processed tool result ({"output": ..., "type": ...})."""
+        if not isinstance(result, dict):
+            return result
+        rule = self.rules.get(tool_name, {})
+        output = result.get("output")
+        if result.get("type") == "text" and isinstance(output, str):
+            return {**result, "output": self._compact_text(tool_name, output, rule)}
+        if result.get("type") == "multi_content" and isinstance(output, list):
+            items = [
+                {**item, "content": self._compact_text(tool_name, item["content"], rule)}
+                if item.get("type") == "text" and isinstance(item.get("content"), str) else item
+                for item in output
+            ]
+            return {**result, "output": items}
+        return result
+
+    def next_page(self, result_id: str) -> dict:
+        """The next page of a truncated list, with a marker if more remain."""
+        pages = self._pages.get(result_id.rpartition(".")[0])
+        entry = pages.lists.pop(result_id, None) if pages is not None else None
+        if entry is None:
+            return {"output": f"No more results stored for '{result_id}'", "type": "text"}
+        items, rule = entry
+        page = self._walk_list(items, rule, pages, result_id)
+        if pages.lists:
+            self._pages.move_to_end(pages.result_id)
+        else:
+            del self._pages[pages.result_id]
+        return {"output": json.dumps(page, separators=(",", ":"), ensure_ascii=False), "type": "text"}
+
+    def _compact_text(self, tool_name: str, text: str, rule: dict) -> str:
+        try:
+            payload = json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return text
+        pages = _ResultPages(f"r{next(self._ids)}")
+        compacted = json.dumps(self._walk(payload, rule, pages), separators=(",", ":"), ensure_ascii=False)
+        if pages.lists:
+            self._store(pages)
+
+        before, after = len(text.encode()), len(compacted.encode())
+        self.stats["results"] += 1
+        self.stats["bytes_in"] += before
+        self.stats["bytes_out"] += after
+        logger.info(
+            f"Compacted '{tool_name}': {before}B -> {after}B "
+            f"(~{estimate_tokens(before)} -> ~{estimate_tokens(after)} tokens)"
+        )
+        return compacted
+
+    def _walk(self, node, rule: dict, pages: _ResultPages | None = None):
+        if isinstance(node, dict):
+            return {
+                key: self._walk(value, rule, pages)
+                for key, value in node.items()
+                if key not in DROP_KEYS and not (isinstance(value, str) and _IMAGE_URL.match(value))
+            }
+        if isinstance(node, list):
+            return self._walk_list(node, rule, pages)
+        return node
+
+    def _walk_list(self, items: list, rule: dict, pages: _ResultPages | None = None,
+                   list_id: str | None = None) -> list:
+        """Compact a list. With `pages` (a top-level list of the result), a
+        list of objects is truncated to the rule's top_n and its items cut to
+        the rule's fields; the tail is stored raw in `pages` and only
+        compacted if the model pages into it. Lists nested inside the items
+        are walked without `pages`, so they are kept whole."""
+        objects = bool(items) and all(isinstance(item, dict) for item in items)
+        if pages is None or not objects:
+            return [self._walk(item, rule) for item in items]
+
+        top_n = rule.get("top_n")
+        rest = []
+        if top_n and len(items) > top_n:
+            items, rest = items[:top_n], items[top_n:]
+        walked = [self._keep_fields(self._walk(item, rule), rule.get("fields")) for item in items]
+        if rest:
+            walked.append({"more_results": {"result_id": pages.add(rest, rule, list_id), "remaining": len(rest)}})
+        return walked
+
+    @classmethod
+    def _keep_fields(cls, item: dict, fields) -> dict:
+        if not fields:
+            return item
+        nested: dict[str, list[str]] = {}
+        for field in fields:
+            key, _, rest = field.partition(".")
+            nested.setdefault(key, [])
+            if rest:
+                nested[key].append(rest)
+        kept = {}
+        for key, value in item.items():
+            if key not in nested:
+                continue
+            inner = nested[key]
+            if inner and isinstance(value, dict):
+                value = cls._keep_fields(value, inner)
+            elif inner and isinstance(value, list):
+                value = [cls._keep_fields(v, inner) if isinstance(v, dict) else v for v in value]
+            kept[key] = value
+        # An allowlist that matches nothing is a stale rule, not an empty item.
+        return kept or item
+
+    def _store(self, pages: _ResultPages):
+        self._pages[pages.result_id] = pages
+        while len(self._pages) > self.store_size:
+            self._pages.popitem(last=False)
+
+    def summary(self) -> dict:
+        bytes_in, bytes_out = self.stats["bytes_in"], self.stats["bytes_out"]
+        return {
+            **self.stats,
+            "tokens_in": estimate_tokens(bytes_in),
+            "tokens_out": estimate_tokens(bytes_out),
+            "saved_pct": round(100 * (1 - bytes_out / bytes_in), 1) if bytes_in else 0.0,
+        }
@@ -157,7 +157,7 @@ read -rp "  Choose [1/2/3] (default: 1): " agent_choice
 
 case "$agent_choice" in
     2)
-        AGENT_FILE="swiggy_agent_two.py"
+        AGENT_MODE="realtime"
         AGENT_NAME="Agent Two"
         ;;
     3)
@@ -166,14 +166,17 @@ case "$agent_choice" in
         echo ""
         echo -e "    source venv/bin/activate"
         echo ""
+        echo -e "    ${PURPLE}# One-time setup per mode (model downloads, cached audio)${RESET}"
+        echo -e "    python swiggy_agent.py setup --mode cascading"
+        echo ""
         echo -e "    ${PURPLE}# Agent One — Deepgram + Gemini + Cartesia${RESET}"
-        echo -e "    python swiggy_agent_one.py"
+        echo -e "    python swiggy_agent.py --mode cascading"
         echo ""
         echo -e "    ${PURPLE}# Agent Two — Gemini native audio (VideoSDK + Google keys)${RESET}"
-        echo -e "    python swiggy_agent_two.py"
+        echo -e "    python swiggy_agent.py --mode realtime"
         echo ""
         echo -e "    ${PURPLE}# Phone/WhatsApp — SIP telephony${RESET}"
-        echo -e "    python swiggy_agent_phone.py"
+        echo -e "    python swiggy_agent.py --mode telephony"
         echo ""
         echo -e "  A dynamic ${BOLD}VideoSDK Playground${RESET} link will be printed once the agent starts."
         echo ""
@@ -182,11 +185,15 @@ case "$agent_choice" in
         exit 0
         ;;
     *)
-        AGENT_FILE="swiggy_agent_one.py"
+        AGENT_MODE="cascading"
         AGENT_NAME="Agent One"
         ;;
 esac
 
+echo ""
+echo -e "  Preparing ${BOLD}${AGENT_MODE}${RESET} mode ${DIM}(model downloads; skipped if already done)${RESET}"
+python swiggy_agent.py setup --mode "$AGENT_MODE"
+
 echo ""
 echo -e "  Starting ${BOLD}${PURPLE}${AGENT_NAME}${RESET} ..."
 echo -e "  ${DIM}Swiggy MCP connection may take 1-2 minutes on first participant join${RESET}"
@@ -197,4 +204,4 @@ echo ""
 echo -e "  ${DIM}Press Ctrl+C to stop the agent${RESET}"
 echo ""
 
-python "$AGENT_FILE"
+python swiggy_agent.py --mode "$AGENT_MODE"
@@ -0,0 +1,126 @@
+"""
+Compiled, memoized tool-schema sanitizer.
+
+Google's LLM rejects list-typed `type` fields and non-string enum values, so
+every MCP input schema is normalized before it is handed to the framework.
+The three Swiggy services repeat the same address, cart and item shapes
+across dozens of tools, and each catalog miss used to rebuild them all.
+
+SchemaCompiler produces the same output as the original recursive sanitizer
+but:
+  - memoizes whole schemas by a content hash of their JSON form
+  - interns identical sub-schemas, so repeated shapes are built once and
+    shared between tools
+  - visits each node exactly once (the old version walked `properties`
+    twice)
+
+Compiled schemas may be shared between tools and must be treated as
+read-only.
+"""
+
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_MAX_NODES = 20_000
+
+
+def _value_key(value):
+    """Hashable, type-tagged key for a non-dict schema value.
+
+    The type tag keeps 1, 1.0 and True apart (they hash and compare equal).
+    """
+    if isinstance(value, (list, tuple)):
+        return ("json", json.dumps(value, default=str))
+    try:
+        hash(value)
+    except TypeError:
+        return ("json", json.dumps(value, default=str))
+    return (type(value).__name__, value)
+
+
+class SchemaCompiler:
+    """Content-addressed cache of sanitized schemas and sub-schemas."""
+
+    def __init__(self, max_nodes: int = SCHEMA_CACHE_MAX_NODES):
+        self.max_nodes = max_nodes
+        self._compiled: dict[str, dict] = {}
+        self._nodes: dict[tuple, tuple[int, dict]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared_nodes = 0
+
+    def compile(self, schema: dict) -> dict:
+        """Sanitized form of `schema`; identical input returns the same object."""
+        if not isinstance(schema, dict):
+            return schema
+        digest = hashlib.blake2b(
+            json.dumps(schema, separators=(",", ":"), default=str).encode(), digest_size=16
+        ).hexdigest()
+        compiled = self._compiled.get(digest)
+        if compiled is not None:
+            self.hits += 1
+            return compiled
+
+        self.misses += 1
+        if len(self._nodes) > self.max_nodes:
+            self.clear()
+        compiled = self._compile_node(schema)[1]
+        self._compiled[digest] = compiled
+        return compiled
+
+    def _compile_node(self, node: dict) -> tuple[int, dict]:
+        cleaned = {}
+        parts = []
+        for k, v in node.items():
+            if isinstance(v, dict):
+                node_id, v = self._compile_node(v)
+                part = ("node", node_id)
+            else:
+                if isinstance(v, list) and k == "type":
+                    v = v[0] if len(v) == 1 else "string"
+                elif isinstance(v, list) and k == "enum":
+                    v = [str(x) for x in v]
+                part = _value_key(v)
+            cleaned[k] = v
+            parts.append((k, part))
+
+        key = tuple(parts)
+        interned = self._nodes.get(key)
+        if interned is not None:
+            self.shared_nodes += 1
+            return interned
+        interned = (len(self._nodes), cleaned)
+        self._nodes[key] = interned
+        return interned
+
+    def clear(self):
+        self._compiled.clear()
+        self._nodes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "schemas": len(self._compiled),
+            "nodes": len(self._nodes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_nodes": self.shared_nodes,
+        }
+
+
+_compiler: SchemaCompiler | None = None
+
+
+def get_schema_compiler() -> SchemaCompiler:
+    """Process-wide schema compiler shared by every session in this worker."""
+    global _compiler
+    if _compiler is None:
+        _compiler = SchemaCompiler()
+    return _compiler
+
+
+def compile_schema(schema: dict) -> dict:
+    """Normalize schema types and enums for Google LLM compatibility."""
+    return get_schema_compiler().compile(schema)
@@ -0,0 +1,309 @@
+"""
+Warm pool of pre-initialized Swiggy MCP session sets.
+
+The phone worker runs every call with asyncio.run(), so each call gets a fresh
+event loop and anything connected on it dies at hangup. The pool therefore
+owns its sessions on a dedicated background event loop thread that outlives
+individual calls. A checked-out set ("lease") hands the call loop proxy
+sessions that forward call_tool/list_tools to the pool loop.
+
+Usage:
+  pool = get_session_pool()
+  servers = build_swiggy_mcp_servers(pool=pool)
+
+SwiggyMCPServer.connect() checks a lease out (falling back to a direct
+connect when the pool is empty) and disconnect() hands it back. Returned sets
+are pinged before they are reused; idle sets are health-checked periodically,
+closed after `max_idle_age` and replenished in the background.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+from swiggy_mcp import (
+    ENDPOINT_CONNECT_TIMEOUT,
+    SWIGGY_MCP_ENDPOINTS,
+    _describe_failure,
+    _ServiceConnection,
+    create_oauth_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+POOL_MIN_IDLE = 1
+POOL_MAX_SIZE = 2
+POOL_MAX_IDLE_AGE = 240.0
+POOL_HEALTH_CHECK_INTERVAL = 30.0
+POOL_PING_TIMEOUT = 5.0
+
+
+class _LoopBoundSession:
+    """Forwards ClientSession calls from a call's loop to the pool loop."""
+
+    def __init__(self, session, loop: asyncio.AbstractEventLoop):
+        self._session = session
+        self._loop = loop
+
+    def _run(self, coro):
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def call_tool(self, *args, **kwargs):
+        return await self._run(self._session.call_tool(*args, **kwargs))
+
+    async def list_tools(self, *args, **kwargs):
+        return await self._run(self._session.list_tools(*args, **kwargs))
+
+    async def send_ping(self):
+        return await self._run(self._session.send_ping())
+
+
+class _PooledConnection:
+    """Call-side view of a pooled _ServiceConnection."""
+
+    def __init__(self, conn: _ServiceConnection, loop: asyncio.AbstractEventLoop):
+        self._conn = conn
+        self.name = conn.name
+        self.url = conn.url
+        self.fingerprint = conn.fingerprint
+        self.session = _LoopBoundSession(conn.session, loop)
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self._conn.alive
+
+
+class PoolLease:
+    """One connected, initialized set of Swiggy MCP sessions."""
+
+    def __init__(self, connections: dict[str, _ServiceConnection], loop: asyncio.AbstractEventLoop):
+        self._owned = connections
+        self.connections = {
+            name: _PooledConnection(conn, loop) for name, conn in connections.items()
+        }
+        self.created_at = time.monotonic()
+        self.idle_since = self.created_at
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self.idle_since
+
+    async def ping(self) -> bool:
+        """Ping every session; runs on the pool loop."""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(conn.session.send_ping() for conn in self._owned.values())),
+                POOL_PING_TIMEOUT,
+            )
+            return True
+        except Exception as e:
+            logger.info(f"Pooled Swiggy session failed health check: {_describe_failure(e)}")
+            return False
+
+    async def close(self):
+        await asyncio.gather(*(conn.close() for conn in self._owned.values()))
+
+    def __repr__(self):
+        return f"PoolLease(services={list(self.connections)}, age={time.monotonic() - self.created_at:.0f}s)"
+
+
+class SessionPool:
+    """Per-process pool of warm Swiggy MCP session sets.
+
+    All pool state lives on the pool's own event loop; acquire() and release()
+    are safe to await from any other loop.
+    """
+
+    def __init__(
+        self,
+        min_idle: int = POOL_MIN_IDLE,
+        max_size: int = POOL_MAX_SIZE,
+        max_idle_age: float = POOL_MAX_IDLE_AGE,
+        health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL,
+        endpoints: dict[str, str] | None = None,
+        auth=None,
+        connect_timeout: float = ENDPOINT_CONNECT_TIMEOUT,
+    ):
+        self.min_idle = min_idle
+        self.max_size = max_size
+        self.max_idle_age = max_idle_age
+        self.health_check_interval = health_check_interval
+        self.endpoints = dict(endpoints or SWIGGY_MCP_ENDPOINTS)
+        self.connect_timeout = connect_timeout
+        self._auth = auth
+
+        self._idle: deque[PoolLease] = deque()
+        self._leased = 0
+        self._opening = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._wake: asyncio.Event | None = None
+        self._start_lock = threading.Lock()
+        # Set while a warm set is idle, for threads waiting on a warm pool.
+        self._ready = threading.Event()
+        # The loop only holds weak references to tasks; keep background
+        # closes and health checks alive until they finish.
+        self._tasks: set[asyncio.Task] = set()
+
+    # ---- call-loop API ----
+
+    def start(self):
+        """Start the pool loop thread and begin filling the pool."""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._wake = asyncio.Event()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="swiggy-mcp-pool", daemon=True
+            )
+            self._thread.start()
+            asyncio.run_coroutine_threadsafe(self._maintain(), self._loop)
+
+    async def acquire(self) -> PoolLease | None:
+        """Check out a warm session set, or None if none is ready yet."""
+        self.start()
+        return await self._call(self._checkout())
+
+    async def release(self, lease: PoolLease):
+        """Return a session set; it is health-checked before reuse."""
+        await self._call(self._checkin(lease))
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block the calling thread until a warm set is idle (or `timeout`
+        passes); True if one is."""
+        return self._ready.wait(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "idle": len(self._idle),
+            "leased": self._leased,
+            "opening": self._opening,
+        }
+
+    def _call(self, coro):
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    # ---- pool-loop side ----
+
+    async def _checkout(self) -> PoolLease | None:
+        lease = None
+        while self._idle:
+            candidate = self._idle.popleft()
+            if candidate.idle_for() > self.max_idle_age:
+                self._spawn(candidate.close())
+                continue
+            lease = candidate
+            self._leased += 1
+            break
+        self._idle_changed()
+        self._wake.set()
+        return lease
+
+    async def _checkin(self, lease: PoolLease):
+        self._leased -= 1
+        self._spawn(self._verify_and_keep(lease))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _verify_and_keep(self, lease: PoolLease):
+        if len(self._idle) + self._leased >= self.max_size or not await lease.ping():
+            await lease.close()
+        else:
+            lease.idle_since = time.monotonic()
+            self._idle.append(lease)
+            self._idle_changed()
+        self._wake.set()
+
+    async def _maintain(self):
+        if self._auth is None:
+            self._auth = create_oauth_provider()
+        health_check = False
+        while True:
+            self._wake.clear()
+            try:
+                await self._evict_idle(ping=health_check)
+                await self._replenish()
+            except Exception as e:
+                logger.warning(f"Swiggy session pool maintenance failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.health_check_interval)
+                health_check = False
+            except asyncio.TimeoutError:
+                health_check = True
+
+    def _idle_changed(self):
+        if self._idle:
+            self._ready.set()
+        else:
+            self._ready.clear()
+
+    async def _evict_idle(self, ping: bool):
+        """Close idle sets past max_idle_age and, on health checks, any that
+        fail a ping."""
+        keep = deque()
+        while self._idle:
+            lease = self._idle.popleft()
+            if lease.idle_for() > self.max_idle_age or (ping and not await lease.ping()):
+                await lease.close()
+            else:
+                keep.append(lease)
+        self._idle.extend(keep)
+        self._idle_changed()
+
+    async def _replenish(self):
+        missing = min(
+            self.min_idle - len(self._idle) - self._opening,
+            self.max_size - len(self._idle) - self._leased - self._opening,
+        )
+        if missing <= 0:
+            return
+        self._opening += missing
+        try:
+            leases = await asyncio.gather(*(self._open_lease() for _ in range(missing)))
+        finally:
+            self._opening -= missing
+        for lease in leases:
+            if lease is not None:
+                self._idle.append(lease)
+        self._idle_changed()
+        logger.info(f"Swiggy session pool replenished: {self.stats()}")
+
+    async def _open_lease(self) -> PoolLease | None:
+        connections = {
+            name: _ServiceConnection(name, url, self._auth)
+            for name, url in self.endpoints.items()
+        }
+        results = await asyncio.gather(
+            *(conn.open(self.connect_timeout) for conn in connections.values()),
+            return_exceptions=True,
+        )
+        failed = {
+            name: _describe_failure(result)
+            for name, result in zip(connections, results)
+            if isinstance(result, BaseException)
+        }
+        if failed:
+            logger.warning(f"Could not warm a Swiggy session set: {failed}")
+            await asyncio.gather(*(conn.close() for conn in connections.values()))
+            return None
+        return PoolLease(connections, self._loop)
+
+
+_pool: SessionPool | None = None
+
+
+def get_session_pool() -> SessionPool:
+    """Process-wide session pool, created and started on first use."""
+    global _pool
+    if _pool is None:
+        _pool = SessionPool()
+        _pool.start()
+    return _pool
@@ -0,0 +1,516 @@
+"""
+Swiggy Voice Agent — powered by VideoSDK AI Agents. One entry point, three modes:
+
+  cascading  Deepgram STT + Google Gemini LLM + Cartesia TTS (Agent One).
+             Needs VideoSDK + Google + Deepgram + Cartesia API keys. Each
+             turn's transcript goes through the intent router first, and the
+             greeting, goodbye and filler lines play from pre-synthesized
+             audio (prompt_audio.py).
+  realtime   Gemini native audio (Agent Two): one model handles STT + LLM +
+             TTS. Only needs VideoSDK + Google API keys.
+  telephony  Gemini native audio on VideoSDK telephony for inbound/outbound
+             phone calls (SIP) and WhatsApp voice calls. Needs the SIP
+             gateways and routing rules set up in the VideoSDK Dashboard.
+
+The mode comes from --mode, else SWIGGY_AGENT_MODE, else cascading. Only
+that mode's plugins are imported (MODE_PLUGINS). Model downloads (the turn
+detector) are an explicit setup step, recorded in SETUP_FILE with the plugin
+versions so it only reruns after an upgrade:
+
+  python swiggy_agent.py setup --mode cascading
+  python swiggy_agent.py --mode cascading
+
+Browser modes print a VideoSDK Playground link once the agent starts.
+
+Telephony: callers enrolled with `python swiggy_mcp.py --caller <number>`
+order from their own Swiggy account. Other callers use the shared login
+while no caller is enrolled; once one is, they are told to enroll and the
+call ends. SHARED_LOGIN_ENV=1 / 0 always / never lets them use it.
+Per-tool metrics are served on http://localhost:9464/metrics. The worker
+warms up before it registers (worker_warmup.py), calls without a warm
+pooled session connect lazily from the tool catalog, and at most
+MAX_ACTIVE_CALLS calls run at once (call_admission.py); the next ones queue
+while ringing and are turned away with a busy message if no slot frees up.
+
+Tool calls slower than a second are covered by a short filler line
+(filler_speech.py) in every mode.
+
+Docs:
+  - Telephony: https://docs.videosdk.live/ai_agents/ai-phone-agent-quick-start
+  - WhatsApp:  https://docs.videosdk.live/ai_agents/whatsapp-voice-agent-quick-start
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import time
+from importlib import metadata
+from pathlib import Path
+
+from videosdk.agents import (
+    Agent,
+    AgentSession,
+    JobContext,
+    RoomOptions,
+    WorkerJob,
+    Options,
+)
+
+from instructions import SWIGGY_AGENT_INSTRUCTIONS, GREETING, GOODBYE, BUSY_MESSAGE, NOT_ENROLLED_MESSAGE
+from call_admission import MAX_ACTIVE_CALLS, MAX_QUEUED_CALLS, get_call_admission, start_scaling_signal
+from filler_speech import FillerSpeech
+from intent_router import IntentScope
+from metrics import flush_metrics, start_metrics_flusher, start_metrics_server
+from prompt_audio import PromptVoice, get_prompt_audio
+from session_pool import get_session_pool
+from swiggy_mcp import build_swiggy_mcp_servers
+from token_store import FileTokenStorage, get_caller_token_store, mask_caller_id, normalize_caller_id
+from turn_tracing import get_turn_tracer
+from worker_warmup import install_process_warmup, prewarm_worker, warm_job_process
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+logger = logging.getLogger(__name__)
+
+MODES = ("cascading", "realtime", "telephony")
+DEFAULT_MODE = "cascading"
+MODE_ENV = "SWIGGY_AGENT_MODE"
+
+# Plugin modules each mode imports, and the distributions that provide them
+# (their versions key the setup record).
+MODE_PLUGINS = {
+    "cascading": (
+        "videosdk.plugins.google",
+        "videosdk.plugins.deepgram",
+        "videosdk.plugins.cartesia",
+        "videosdk.plugins.silero",
+        "videosdk.plugins.turn_detector",
+    ),
+    "realtime": ("videosdk.plugins.google",),
+    "telephony": ("videosdk.plugins.google",),
+}
+
+# Span tree agent names, as written by the per-mode scripts before.
+TRACE_NAMES = {"cascading": "agent_one", "realtime": "agent_two", "telephony": "agent_phone"}
+
+SETUP_FILE = Path(__file__).parent / ".swiggy_setup.json"
+
+REALTIME_MODEL = "gemini-2.5-flash-native-audio-preview-09-2025"
+REALTIME_VOICE = "Leda"
+
+# How long to wait for the SIP/WhatsApp participant before treating the
+# caller as unidentified.
+CALLER_IDENTITY_TIMEOUT = 10.0
+
+# Whether unidentified or unenrolled callers may order from the shared
+# Swiggy login: 1 always, 0 never. Unset, they may until the first caller is
+# enrolled, so a single-account deployment keeps working unchanged; after
+# that they are asked to enroll and the call ends.
+SHARED_LOGIN_ENV = "SWIGGY_SHARED_LOGIN_FOR_UNENROLLED"
+
+# Job processes kept forked and warm, ready for the next call.
+IDLE_PROCESSES = 2
+
+# How long a turned-away caller stays connected to hear the busy (or
+# not-enrolled) message.
+BUSY_HANGUP_AFTER = 8.0
+
+
+def load_plugins(mode: str) -> list:
+    """Import the plugin modules `mode` needs."""
+    return [importlib.import_module(module) for module in MODE_PLUGINS[mode]]
+
+
+def _prepare_process(mode: str):
+    load_plugins(mode)
+    if mode == "telephony":
+        # Job processes are forked from the process that imports this module.
+        install_process_warmup()
+
+
+# main() exports the mode before starting the worker, so the framework's
+# forkserver, which re-imports this module, forks job processes with the
+# plugins already imported.
+if os.environ.get(MODE_ENV) in MODES:
+    _prepare_process(os.environ[MODE_ENV])
+
+
+# =============================================================
+#  Agents
+# =============================================================
+
+class SwiggyVoiceAgent(Agent):
+    """The Swiggy agent in any mode.
+
+    Cascading: scoped by the intent router, fixed lines played from prompt
+    audio (`prompt_tts` picks the cached voice). Realtime models take their tools
+    once at setup, so they keep the full set. Telephony: per-caller login or,
+    with `pool`, warm pooled sessions of the shared login; lazy connects.
+    """
+
+    def __init__(self, mode: str, caller_id: str | None = None, prompt_tts=None, pool=None):
+        if mode == "telephony":
+            servers = build_swiggy_mcp_servers(pool=pool, caller_id=caller_id, lazy=True)
+        else:
+            servers = build_swiggy_mcp_servers()
+        super().__init__(
+            instructions=SWIGGY_AGENT_INSTRUCTIONS,
+            mcp_servers=servers,
+        )
+        self.mode = mode
+        self.swiggy_mcp = servers[0]
+        self.scope = IntentScope(self, self.swiggy_mcp) if mode == "cascading" else None
+        self.prompt_tts = prompt_tts
+        self.voice: PromptVoice | None = None
+
+    def _say(self):
+        # Realtime models ignore pre-synthesized audio, so they speak live.
+        if self.mode != "cascading":
+            return self.session.say
+        if self.voice is None:
+            self.voice = PromptVoice(self.session.say, self.prompt_tts)
+        return self.voice.say
+
+    async def on_enter(self):
+        get_turn_tracer().start_session(agent=TRACE_NAMES[self.mode])
+        self.swiggy_mcp.filler = FillerSpeech(self._say())
+        self.swiggy_mcp.start_prefetch()
+        await self._say()(GREETING)
+
+    async def on_exit(self):
+        if self.mode == "telephony" and self.swiggy_mcp.filler is not None:
+            logger.info(f"Filler speech this call: {self.swiggy_mcp.filler.stats}")
+        await self._say()(GOODBYE)
+        get_turn_tracer().end_session()
+
+
+class BusyAgent(Agent):
+    """Answers a call that could not be admitted with a busy message."""
+
+    def __init__(self):
+        super().__init__(instructions="All lines are busy. Tell the caller to call back in a few minutes.")
+
+    async def on_enter(self):
+        await self.session.say(BUSY_MESSAGE)
+
+    async def on_exit(self):
+        pass
+
+
+class NotEnrolledAgent(Agent):
+    """Answers a caller with no Swiggy login of their own."""
+
+    def __init__(self):
+        super().__init__(instructions="You cannot place orders for this caller. Tell them to enroll their number.")
+
+    async def on_enter(self):
+        await self.session.say(NOT_ENROLLED_MESSAGE)
+
+    async def on_exit(self):
+        pass
+
+
+def _scoped_conversation_flow(agent: SwiggyVoiceAgent):
+    from videosdk.agents import ConversationFlow
+
+    class ScopedConversationFlow(ConversationFlow):
+        """Scopes the agent to the service the user asks for before the LLM runs."""
+
+        async def run(self, transcript: str):
+            self.agent.scope.route(transcript)
+            async for response in super().run(transcript):
+                yield response
+
+    return ScopedConversationFlow(agent)
+
+
+def _realtime_pipeline():
+    from videosdk.agents import RealTimePipeline
+    from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
+
+    model = GeminiRealtime(
+        model=REALTIME_MODEL,
+        config=GeminiLiveConfig(
+            voice=REALTIME_VOICE,
+            response_modalities=["AUDIO"],
+        ),
+    )
+    return RealTimePipeline(model=model)
+
+
+# =============================================================
+#  Entrypoints
+# =============================================================
+
+async def cascading_entrypoint(ctx: JobContext):
+    from videosdk.agents import CascadingPipeline
+    from videosdk.plugins.cartesia import CartesiaTTS
+    from videosdk.plugins.deepgram import DeepgramSTT
+    from videosdk.plugins.google import GoogleLLM
+    from videosdk.plugins.silero import SileroVAD
+    from videosdk.plugins.turn_detector import TurnDetector
+
+    tts = CartesiaTTS()
+    agent = SwiggyVoiceAgent("cascading", prompt_tts=tts)
+
+    pipeline = CascadingPipeline(
+        stt=DeepgramSTT(),
+        llm=GoogleLLM(),
+        tts=tts,
+        vad=SileroVAD(),
+        turn_detector=TurnDetector(),
+    )
+
+    session = AgentSession(
+        agent=agent,
+        pipeline=pipeline,
+        conversation_flow=_scoped_conversation_flow(agent),
+    )
+
+    await session.start(
+        wait_for_participant=True,
+        run_until_shutdown=True,
+    )
+
+
+async def realtime_entrypoint(ctx: JobContext):
+    session = AgentSession(
+        agent=SwiggyVoiceAgent("realtime"),
+        pipeline=_realtime_pipeline(),
+    )
+
+    await session.start(
+        wait_for_participant=True,
+        run_until_shutdown=True,
+    )
+
+
+async def _shared_login_allowed() -> bool:
+    setting = os.environ.get(SHARED_LOGIN_ENV)
+    if setting in ("0", "1"):
+        return setting == "1"
+    return await get_caller_token_store().count() == 0
+
+
+async def _shared_login_ready() -> bool:
+    """Whether an unidentified caller may use the shared login: it is
+    enabled and its tokens are stored (a headless worker must never start
+    the browser login)."""
+    if not await _shared_login_allowed():
+        return False
+    if await FileTokenStorage().get_tokens() is None:
+        logger.warning("Shared Swiggy login enabled but not stored; run `python swiggy_mcp.py`")
+        return False
+    return True
+
+
+async def _enrolled_caller(ctx: JobContext) -> str | None:
+    """The caller's number (the SIP participant's name) if they are enrolled."""
+    try:
+        participant_id = await asyncio.wait_for(ctx.wait_for_participant(), CALLER_IDENTITY_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("No caller joined in time; caller not identified")
+        return None
+    name = ctx.room.participants_data.get(participant_id, {}).get("name")
+    if not name:
+        logger.warning("Caller has no number; caller not identified")
+        return None
+    caller_id = normalize_caller_id(name)
+    if await get_caller_token_store().is_enrolled(caller_id):
+        return caller_id
+    logger.info(f"Caller {mask_caller_id(caller_id)} is not enrolled")
+    return None
+
+
+async def telephony_entrypoint(ctx: JobContext):
+    start_metrics_flusher()
+    warm_job_process(wait=0)
+    # The caller keeps ringing while the call waits for a slot.
+    async with get_call_admission().admit() as queued:
+        if queued is None:
+            await _turn_away(ctx)
+        else:
+            await _answer(ctx)
+
+
+async def _answer(ctx: JobContext):
+    pipeline = _realtime_pipeline()
+    session = None
+
+    try:
+        await ctx.connect()
+        # The Swiggy login depends on who is calling, so the agent (and its
+        # MCP servers) is built once the caller has joined.
+        caller_id = await _enrolled_caller(ctx)
+        pool = None
+        if caller_id is None:
+            if not await _shared_login_ready():
+                session = AgentSession(agent=NotEnrolledAgent(), pipeline=pipeline)
+                await session.start()
+                await asyncio.sleep(BUSY_HANGUP_AFTER)
+                return
+            logger.info("Using the shared Swiggy login for this caller")
+            # The pool holds shared-login sessions, so only these calls start it.
+            pool = get_session_pool()
+        agent = SwiggyVoiceAgent("telephony", caller_id=caller_id, pool=pool)
+        session = AgentSession(
+            agent=agent,
+            pipeline=pipeline,
+        )
+        await session.start()
+        await asyncio.Event().wait()
+    finally:
+        if session is not None:
+            await session.close()
+        await ctx.shutdown()
+        get_turn_tracer().end_session()
+        flush_metrics()
+
+
+async def _turn_away(ctx: JobContext):
+    session = None
+    try:
+        await ctx.connect()
+        session = AgentSession(agent=BusyAgent(), pipeline=_realtime_pipeline())
+        await session.start()
+        await asyncio.sleep(BUSY_HANGUP_AFTER)
+    finally:
+        if session is not None:
+            await session.close()
+        await ctx.shutdown()
+        flush_metrics()
+
+
+def playground_context() -> JobContext:
+    return JobContext(
+        room_options=RoomOptions(
+            name="Swiggy Voice Agent",
+            playground=True,
+        )
+    )
+
+
+def telephony_context() -> JobContext:
+    return JobContext(room_options=RoomOptions())
+
+
+# =============================================================
+#  Setup and startup
+# =============================================================
+
+def _plugin_versions(mode: str) -> dict[str, str | None]:
+    versions = {}
+    for module in MODE_PLUGINS[mode]:
+        dist = module.replace(".", "-").replace("_", "-")
+        try:
+            versions[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[dist] = None
+    return versions
+
+
+def _setup_record() -> dict:
+    try:
+        return json.loads(SETUP_FILE.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def is_set_up(mode: str) -> bool:
+    return _setup_record().get(mode, {}).get("plugins") == _plugin_versions(mode)
+
+
+def setup(mode: str, force: bool = False):
+    """Download the models `mode` needs and pre-synthesize its fixed lines.
+
+    Skipped when SETUP_FILE says it already ran with the installed plugin
+    versions (pass force=True to rerun).
+    """
+    if is_set_up(mode) and not force:
+        logger.info(f"Setup for {mode} already done for the installed plugins")
+        return
+    started = time.perf_counter()
+    if mode == "cascading":
+        from videosdk.plugins.turn_detector import pre_download_model
+
+        pre_download_model()
+        asyncio.run(warm_prompt_audio())
+    record = _setup_record()
+    record[mode] = {"plugins": _plugin_versions(mode), "completed_at": time.time()}
+    SETUP_FILE.write_text(json.dumps(record, indent=2))
+    logger.info(f"Setup for {mode} done in {time.perf_counter() - started:.1f}s")
+
+
+async def warm_prompt_audio():
+    """Pre-synthesize the fixed lines with the same TTS settings the
+    sessions use; lines that fail stay on live TTS."""
+    from videosdk.plugins.cartesia import CartesiaTTS
+
+    tts = CartesiaTTS()
+    try:
+        await get_prompt_audio().warm(tts)
+    finally:
+        await tts.aclose()
+
+
+def run(mode: str):
+    if not is_set_up(mode):
+        logger.warning(f"Setup has not run for {mode} with these plugins; running it now "
+                       f"(do it ahead with `python swiggy_agent.py setup --mode {mode}`)")
+        setup(mode)
+    elif mode == "cascading":
+        # Fills lines missing from the cache, e.g. after a voice change.
+        asyncio.run(warm_prompt_audio())
+
+    if mode == "cascading":
+        WorkerJob(entrypoint=cascading_entrypoint, jobctx=playground_context).start()
+        return
+    if mode == "realtime":
+        WorkerJob(entrypoint=realtime_entrypoint, jobctx=playground_context).start()
+        return
+
+    # Finish imports, login check and tool catalog before registering.
+    shared_login = asyncio.run(_shared_login_allowed())
+    asyncio.run(prewarm_worker(plugins=MODE_PLUGINS[mode], shared_login=shared_login))
+
+    # Prometheus-style metrics for every call handled by this worker
+    start_metrics_server(host="localhost", port=9464)
+    start_scaling_signal()
+
+    options = Options(
+        agent_id="SwiggyVoiceAgent",
+        register=True,
+        # Queued calls hold a job process too; past this the worker reports
+        # itself unavailable and calls go to another worker.
+        max_processes=MAX_ACTIVE_CALLS + MAX_QUEUED_CALLS,
+        load_threshold=1.0,
+        num_idle_processes=IDLE_PROCESSES,
+        host="localhost",
+        port=8081,
+    )
+    WorkerJob(entrypoint=telephony_entrypoint, jobctx=telephony_context, options=options).start()
+
+
+def main(mode: str | None = None):
+    parser = argparse.ArgumentParser(description="Run the Swiggy voice agent, or set up a mode.")
+    parser.add_argument("command", nargs="?", choices=("run", "setup"), default="run")
+    parser.add_argument("--mode", choices=MODES, default=mode or os.environ.get(MODE_ENV) or DEFAULT_MODE)
+    parser.add_argument("--force", action="store_true", help="rerun setup even if it is recorded as done")
+    args = parser.parse_args()
+
+    if args.command == "setup":
+        setup(args.mode, force=args.force)
+        return
+    os.environ[MODE_ENV] = args.mode
+    _prepare_process(args.mode)
+    run(args.mode)
+
+
+if __name__ == "__main__":
+    main()
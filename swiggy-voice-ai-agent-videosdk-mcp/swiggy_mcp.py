@@ -13,26 +13,45 @@ Usage:
 import asyncio
 import json
 import logging
+import os
+import random
+import time
 import webbrowser
-from contextlib import AsyncExitStack
-from pathlib import Path
+from contextlib import AsyncExitStack, nullcontext
 from datetime import timedelta
 from functools import partial
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import threading
 
+import httpx
 from mcp.client.auth import OAuthClientProvider, TokenStorage
 from mcp.client.streamable_http import streamablehttp_client
-from mcp.shared.auth import OAuthClientMetadata, OAuthClientInformationFull, OAuthToken
+from mcp.shared.auth import OAuthClientMetadata
 from mcp import ClientSession
 
 from videosdk.agents.mcp.mcp_server import MCPServiceProvider
 from videosdk.agents.utils import create_generic_mcp_adapter, ToolError
 
+from circuit_breaker import OPEN, CircuitBreakers, get_circuit_breakers
+from http_transport import shared_http_client_factory
+from metrics import get_metrics, service_label, timed, track_tool_call
+from result_compaction import RESULT_PAGING_TOOL, ResultCompactor
+from schema_compiler import compile_schema
+from tool_cache import MUTATING_TOOLS, ToolResultCache, canonical_arguments, get_tool_cache
+from tool_catalog import CatalogEntry, ToolCatalogCache, server_fingerprint
+from tool_deadlines import TURN_BUDGET, ToolExecutionPolicy, get_tool_policy, turn_deadline
+from token_store import (
+    TOKEN_FILE,
+    FileTokenStorage,
+    get_caller_token_store,
+    mask_caller_id,
+    normalize_caller_id,
+)
+from turn_tracing import get_turn_tracer
+
 logger = logging.getLogger(__name__)
 
-TOKEN_FILE = Path(__file__).parent / ".swiggy_tokens.json"
 CALLBACK_PORT = 8765
 CALLBACK_PATH = "/callback"
 REDIRECT_URI = f"http://localhost:{CALLBACK_PORT}{CALLBACK_PATH}"
@@ -42,51 +61,80 @@ SWIGGY_MCP_ENDPOINTS = {
     "swiggy-instamart": "https://mcp.swiggy.com/im",
     "swiggy-dineout": "https://mcp.swiggy.com/dineout",
 }
-
-
-# =============================================================
-#  Token Storage (persists to .swiggy_tokens.json)
-# =============================================================
-
-class FileTokenStorage(TokenStorage):
-    """Stores OAuth tokens and client info in a local JSON file."""
-
-    def __init__(self, path: Path = TOKEN_FILE):
-        self._path = path
-        self._data = self._load()
-
-    def _load(self) -> dict:
-        if self._path.exists():
-            try:
-                return json.loads(self._path.read_text())
-            except (json.JSONDecodeError, OSError):
-                return {}
-        return {}
-
-    def _save(self):
-        self._path.write_text(json.dumps(self._data, indent=2, default=str))
-
-    async def get_tokens(self) -> OAuthToken | None:
-        raw = self._data.get("tokens")
-        if raw:
-            return OAuthToken(**raw)
-        return None
-
-    async def set_tokens(self, tokens: OAuthToken) -> None:
-        self._data["tokens"] = tokens.model_dump()
-        self._save()
-        logger.info("Tokens saved successfully")
-
-    async def get_client_info(self) -> OAuthClientInformationFull | None:
-        raw = self._data.get("client_info")
-        if raw:
-            return OAuthClientInformationFull(**raw)
-        return None
-
-    async def set_client_info(self, client_info: OAuthClientInformationFull) -> None:
-        self._data["client_info"] = client_info.model_dump()
-        self._save()
-        logger.info("Client info saved")
+PRIMARY_SERVICE = "swiggy-food"
+
+# Reads the instructions make the model call as soon as intent appears;
+# started in the background while the greeting is spoken.
+PREFETCH_TOOLS = ("get_addresses", "get_saved_locations")
+
+# Per-endpoint budget for transport setup + initialize(). Generous because the
+# very first connect may include the interactive browser login.
+ENDPOINT_CONNECT_TIMEOUT = 180.0
+
+# Lazy mode: a service's session is opened on the first call to one of its
+# tools and closed again after this many idle seconds.
+SERVICE_IDLE_TIMEOUT = 120.0
+
+# Background token refresh: renew TOKEN_REFRESH_MARGIN seconds before expiry
+# (at most half the token lifetime), spread by up to TOKEN_REFRESH_JITTER
+# seconds so worker processes do not all wake at once. Failed attempts are
+# retried with exponential backoff between the two TOKEN_REFRESH_BACKOFF bounds.
+TOKEN_REFRESH_MARGIN = 300.0
+TOKEN_REFRESH_JITTER = 60.0
+TOKEN_REFRESH_BACKOFF = (5.0, 300.0)
+TOKEN_REFRESH_TIMEOUT = 15.0
+# Re-check interval when the token expiry is unknown; also how often the
+# swiggy_oauth_token_expires_in_seconds gauge is updated.
+TOKEN_REFRESH_POLL = 15.0
+
+# Half-open probe of a service whose circuit is open: one of these
+# argument-less reads (a ping if the service has none), reconnecting first
+# if its session has ended. It must answer within the breaker's slow-call
+# threshold; BREAKER_PROBE_TIMEOUT also bounds the reconnect.
+BREAKER_PROBE_TOOLS = ("get_addresses", "get_saved_locations")
+BREAKER_PROBE_TIMEOUT = 15.0
+
+# Tool calls a conversation may have in flight per service. A call holds its
+# slot across its retries and hedge, and waits for it before its first
+# attempt's timeout starts.
+SERVICE_CONCURRENCY = {"swiggy-food": 4, "swiggy-instamart": 6, "swiggy-dineout": 4}
+DEFAULT_SERVICE_CONCURRENCY = 4
+
+# Batch tool: the pipelines run a model turn's function calls one after
+# another, so independent reads (an ingredient list, several restaurants'
+# slots) are sent as one call and run concurrently here.
+MAX_PARALLEL_CALLS = 12
+PARALLEL_CALLS_TOOL = {
+    "name": "call_tools_parallel",
+    "description": (
+        "Run several independent read-only Swiggy tool calls at once; results come back "
+        "in the same order. Use it instead of calling tools one by one when one answer "
+        "needs many lookups, e.g. search_products for each ingredient of a recipe, or "
+        "get_restaurant_details / get_available_slots for several restaurants. Cart, "
+        "coupon, order and booking tools are not allowed."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "calls": {
+                "type": "array",
+                "description": f"Up to {MAX_PARALLEL_CALLS} tool calls",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "tool": {"type": "string", "description": "Tool name, e.g. search_products"},
+                        "arguments": {
+                            "type": "string",
+                            "description": 'The tool\'s arguments as a JSON object, e.g. {"addressId": "a1", "query": "milk"}',
+                        },
+                    },
+                    "required": ["tool", "arguments"],
+                },
+            },
+        },
+        "required": ["calls"],
+    },
+}
 
 
 # =============================================================
@@ -169,9 +217,266 @@ async def _callback_handler() -> tuple[str, str | None]:
 #  OAuth Provider Factory
 # =============================================================
 
-def create_oauth_provider(server_url: str = "https://mcp.swiggy.com") -> OAuthClientProvider:
-    """Create an OAuthClientProvider for Swiggy MCP."""
-    storage = FileTokenStorage()
+REENROLL_MESSAGE = (
+    "Swiggy needs this caller to log in again, which cannot be done during a call. "
+    "Tell the caller their Swiggy login for this number has expired and needs to be "
+    "re-enrolled before they can order by phone."
+)
+
+class _SharedOAuthProvider(OAuthClientProvider):
+    """OAuthClientProvider that can be shared by concurrent connections.
+
+    The stock provider holds its context lock for the whole request/response
+    cycle, which serializes every request sent through it. Here requests that
+    already have a valid token skip the lock; only token loading, refresh and
+    the full login flow (on 401/403) go through the locked path. Refresh
+    round-trips are recorded in swiggy_oauth_refresh_seconds.
+
+    Refreshes are single-flight across processes when the storage offers
+    refresh_lock()/reload() (FileTokenStorage): under the lock, tokens another
+    process already refreshed are adopted instead of refreshing again. A 401
+    also checks the storage first, before falling back to a full login.
+
+    TokenRefresher calls refresh_ahead() so that, normally, the token is
+    renewed before any request finds it expired.
+    """
+
+    _refresh_trigger = "request"
+
+    async def _initialize(self) -> None:
+        await super()._initialize()
+        # Stored tokens carry only a relative expires_in; use the absolute
+        # expiry the storage recorded so expired tokens get refreshed.
+        self.context.token_expiry_time = getattr(self.context.storage, "expires_at", None)
+
+    def _expires_within(self, seconds: float) -> bool:
+        expires_at = self.context.token_expiry_time
+        return expires_at is not None and expires_at - time.time() <= seconds
+
+    def _record_refresh(self, outcome: str, trigger: str):
+        get_metrics().inc("swiggy_oauth_refreshes_total", {"trigger": trigger, "outcome": outcome})
+
+    async def _adopt_stored_tokens(self, trigger: str = "request") -> bool:
+        """Switch to tokens another process wrote, if they differ and are valid."""
+        storage = self.context.storage
+        if not hasattr(storage, "reload"):
+            return False
+        await storage.reload()
+        tokens = await storage.get_tokens()
+        current = self.context.current_tokens
+        if tokens is None or (current is not None and tokens.access_token == current.access_token):
+            return False
+        expires_at = getattr(storage, "expires_at", None)
+        if expires_at is not None and time.time() > expires_at:
+            return False
+        self.context.current_tokens = tokens
+        self.context.token_expiry_time = expires_at
+        self.context.client_info = await storage.get_client_info() or self.context.client_info
+        self._record_refresh("adopted", trigger)
+        logger.info("Using tokens refreshed by another process")
+        return True
+
+    async def _refresh_token(self):
+        self._refresh_started = time.perf_counter()
+        self._refresh_trigger = "request"
+        return await super()._refresh_token()
+
+    def _observe_refresh(self, refreshed: bool):
+        started = getattr(self, "_refresh_started", None)
+        if started is not None:
+            get_metrics().observe(
+                "swiggy_oauth_refresh_seconds",
+                {"status": "ok" if refreshed else "error"},
+                time.perf_counter() - started,
+            )
+        self._record_refresh("refreshed" if refreshed else "failed", self._refresh_trigger)
+
+    async def _handle_refresh_response(self, response) -> bool:
+        refreshed = await super()._handle_refresh_response(response)
+        self._observe_refresh(refreshed)
+        return refreshed
+
+    async def refresh_ahead(self, window: float) -> str:
+        """Refresh the token now if it expires within `window` seconds.
+
+        Returns "fresh", "adopted", "refreshed" or "failed". Unlike a refresh
+        on the request path, a failed attempt (including a 200 whose body is
+        not a valid token) keeps the current token, which stays usable until
+        it actually expires.
+        """
+        async with self.context.lock:
+            if not self._initialized:
+                await self._initialize()
+            refresh_lock = getattr(self.context.storage, "refresh_lock", nullcontext)
+            async with refresh_lock():
+                adopted = await self._adopt_stored_tokens(trigger="background")
+                if not self._expires_within(window):
+                    return "adopted" if adopted else "fresh"
+                if not self.context.can_refresh_token():
+                    logger.warning("Token expires soon but cannot be refreshed (no refresh token)")
+                    return "failed"
+
+                # The parent's refresh handling clears the tokens on failure.
+                tokens, expiry = self.context.current_tokens, self.context.token_expiry_time
+                refreshed = False
+                try:
+                    refreshed = await self._send_refresh()
+                finally:
+                    if not refreshed:
+                        self.context.current_tokens, self.context.token_expiry_time = tokens, expiry
+                return "refreshed" if refreshed else "failed"
+
+    async def _send_refresh(self) -> bool:
+        request = await self._refresh_token()
+        self._refresh_trigger = "background"
+        try:
+            async with shared_http_client_factory(timeout=httpx.Timeout(TOKEN_REFRESH_TIMEOUT)) as client:
+                response = await client.send(request)
+        except httpx.HTTPError as e:
+            logger.warning(f"Background token refresh failed: {_describe_failure(e)}")
+            self._observe_refresh(False)
+            return False
+        if response.status_code != 200:
+            logger.warning(f"Background token refresh failed: HTTP {response.status_code}")
+            self._observe_refresh(False)
+            return False
+        return await self._handle_refresh_response(response)
+
+    async def _auth_flow(self, request):
+        # Driven by RedirectAwareAuth.async_auth_flow, which follows
+        # same-origin redirects on the refresh and login requests made here.
+        if not self._initialized:
+            async with self.context.lock:
+                if not self._initialized:
+                    await self._initialize()
+
+        if not self.context.is_token_valid() and self.context.can_refresh_token():
+            async with self.context.lock:
+                if not self.context.is_token_valid() and self.context.can_refresh_token():
+                    refresh_lock = getattr(self.context.storage, "refresh_lock", nullcontext)
+                    async with refresh_lock():
+                        if not await self._adopt_stored_tokens():
+                            refresh_response = yield await self._refresh_token()
+                            await self._handle_refresh_response(refresh_response)
+
+        if self.context.is_token_valid():
+            self._add_auth_header(request)
+            response = yield request
+            if response.status_code not in (401, 403):
+                return
+            async with self.context.lock:
+                adopted = await self._adopt_stored_tokens()
+            if adopted:
+                self._add_auth_header(request)
+                response = yield request
+                if response.status_code not in (401, 403):
+                    return
+
+        flow = super()._auth_flow(request)
+        try:
+            outgoing = await flow.__anext__()
+            while True:
+                response = yield outgoing
+                outgoing = await flow.asend(response)
+        except StopAsyncIteration:
+            return
+        finally:
+            await flow.aclose()
+
+
+class _CallerOAuthProvider(_SharedOAuthProvider):
+    """Provider for one phone caller's stored login.
+
+    Nobody can complete a browser login during a call, so when the stored
+    tokens can neither be used nor refreshed, the login flow fails with a
+    ToolError asking the caller to re-enroll (and login_expired is set)
+    instead of opening a browser and waiting on CALLBACK_PORT.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(redirect_handler=self._reenroll, callback_handler=self._reenroll, **kwargs)
+        self.login_expired = False
+
+    async def _reenroll(self, *args):
+        self.login_expired = True
+        logger.warning("Stored caller login can no longer be refreshed; the caller must re-enroll")
+        raise ToolError(REENROLL_MESSAGE)
+
+
+class TokenRefresher:
+    """Renews the OAuth token in the background, ahead of its expiry.
+
+    Runs for the lifetime of a SwiggyMCPServer. Processes sharing the token
+    file wake at jittered times; the first one refreshes and the rest adopt
+    its tokens, so tool calls never wait on the token endpoint.
+    """
+
+    def __init__(self, auth: _SharedOAuthProvider, margin: float = TOKEN_REFRESH_MARGIN,
+                 jitter: float = TOKEN_REFRESH_JITTER):
+        self.auth = auth
+        self.margin = margin
+        self.jitter = jitter
+        self._labels = {"pid": str(os.getpid())}
+
+    def _window(self) -> tuple[float, float]:
+        """(margin, jitter) scaled down for short-lived tokens."""
+        tokens = self.auth.context.current_tokens
+        lifetime = tokens.expires_in if tokens is not None and tokens.expires_in else None
+        margin = self.margin if lifetime is None else min(self.margin, lifetime / 2)
+        return margin, min(self.jitter, margin / 2)
+
+    def _until_refresh(self) -> float:
+        expires_at = self.auth.context.token_expiry_time
+        if expires_at is None:
+            return TOKEN_REFRESH_POLL
+        margin, jitter = self._window()
+        return max(0.0, expires_at - time.time() - margin - random.uniform(0, jitter))
+
+    async def _sleep(self, seconds: float):
+        """Sleep, updating the expires-in gauge every TOKEN_REFRESH_POLL seconds."""
+        wake_at = time.monotonic() + seconds
+        while True:
+            expires_at = self.auth.context.token_expiry_time
+            if expires_at is not None:
+                get_metrics().gauge_set(
+                    "swiggy_oauth_token_expires_in_seconds", self._labels, max(0.0, expires_at - time.time())
+                )
+            remaining = wake_at - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, TOKEN_REFRESH_POLL))
+
+    async def run(self):
+        failures = 0
+        while True:
+            margin, jitter = self._window()
+            try:
+                outcome = await self.auth.refresh_ahead(margin + jitter)
+            except Exception as e:
+                logger.warning(f"Background token refresh error: {e}")
+                outcome = "failed"
+            if outcome == "failed":
+                failures += 1
+                base, cap = TOKEN_REFRESH_BACKOFF
+                await self._sleep(min(cap, base * 2 ** (failures - 1)) * random.uniform(0.5, 1.0))
+                continue
+            if outcome == "refreshed":
+                logger.info("Refreshed Swiggy token ahead of expiry")
+            failures = 0
+            await self._sleep(self._until_refresh())
+
+
+def create_oauth_provider(
+    server_url: str = "https://mcp.swiggy.com",
+    storage: TokenStorage | None = None,
+    interactive: bool = True,
+) -> OAuthClientProvider:
+    """Create an OAuthClientProvider for Swiggy MCP.
+
+    With interactive=False (a phone caller's login) a needed browser login
+    fails with REENROLL_MESSAGE instead of being started.
+    """
+    storage = storage or FileTokenStorage()
 
     client_metadata = OAuthClientMetadata(
         redirect_uris=[REDIRECT_URI],
@@ -182,7 +487,11 @@ def create_oauth_provider(server_url: str = "https://mcp.swiggy.com") -> OAuthCl
         scope="mcp:tools mcp:resources mcp:prompts",
     )
 
-    return OAuthClientProvider(
+    if not interactive:
+        return _CallerOAuthProvider(
+            server_url=server_url, client_metadata=client_metadata, storage=storage, timeout=120.0,
+        )
+    return _SharedOAuthProvider(
         server_url=server_url,
         client_metadata=client_metadata,
         storage=storage,
@@ -193,43 +502,125 @@ def create_oauth_provider(server_url: str = "https://mcp.swiggy.com") -> OAuthCl
 
 
 # =============================================================
-#  Schema Sanitization (Google LLM compatibility)
+#  Tool Executor (routes calls to the correct session)
 # =============================================================
 
-def _sanitize_schema(schema: dict) -> dict:
-    """Recursively normalize schema types and enums for Google LLM compatibility.
-    Handles list-typed 'type' fields and unhashable enum values."""
-    if not isinstance(schema, dict):
-        return schema
-    cleaned = {}
-    for k, v in schema.items():
-        if isinstance(v, dict):
-            cleaned[k] = _sanitize_schema(v)
-        elif isinstance(v, list) and k == "type":
-            cleaned[k] = v[0] if len(v) == 1 else "string"
-        elif isinstance(v, list) and k == "enum":
-            cleaned[k] = [str(x) for x in v]
-        else:
-            cleaned[k] = v
-    if "properties" in cleaned and isinstance(cleaned["properties"], dict):
-        for prop_name, prop_val in cleaned["properties"].items():
-            cleaned["properties"][prop_name] = _sanitize_schema(prop_val)
-    return cleaned
+async def _route_tool_call(tool_executor, session, tool_name, parameters, service: str):
+    """One attempt at a tool call on the owning Swiggy MCP session.
+
+    Errors reported by the tool raise ToolError; timeouts and transport
+    failures propagate for ToolExecutionPolicy to retry or report.
+    """
+    with track_tool_call(service, tool_name, parameters) as call:
+        result = await session.call_tool(tool_name, parameters)
+        call["response"] = result = tool_executor._process_tool_result(tool_name, result)
+    return result
+
+
+async def _list_tools(service: str, session):
+    """list_tools() on one endpoint, timed in swiggy_mcp_list_tools_seconds."""
+    with timed("swiggy_mcp_list_tools_seconds", {"service": service_label(service)}):
+        return await session.list_tools()
 
 
 # =============================================================
-#  Tool Executor (routes calls to the correct session)
+#  Service Connections (one task per Swiggy endpoint)
 # =============================================================
 
-async def _route_tool_call(tool_executor, session, tool_name, parameters):
-    """Execute a tool call on the correct Swiggy MCP session."""
-    try:
-        result = await session.call_tool(tool_name, parameters)
-        return tool_executor._process_tool_result(tool_name, result)
-    except ToolError:
-        raise
-    except Exception as e:
-        raise ToolError(f"Tool execution failed for '{tool_name}': {str(e)}")
+def _open_stream(url: str, auth):
+    """Streamable HTTP transport for a single Swiggy MCP endpoint.
+
+    Every endpoint shares one pooled HTTP transport per event loop.
+    """
+    return streamablehttp_client(
+        url=url,
+        timeout=timedelta(seconds=30),
+        sse_read_timeout=timedelta(seconds=300),
+        httpx_client_factory=shared_http_client_factory,
+        auth=auth,
+    )
+
+
+def _describe_failure(exc: BaseException) -> str:
+    """Short reason for a failed connect, unwrapping single-error task groups."""
+    while len(getattr(exc, "exceptions", ())) == 1:
+        exc = exc.exceptions[0]
+    return "timed out" if isinstance(exc, asyncio.TimeoutError) else repr(exc)
+
+
+class _ServiceConnection:
+    """A single Swiggy MCP session owned by a dedicated task.
+
+    streamablehttp_client and ClientSession run anyio task groups, which must
+    be entered and exited from the same task. Each endpoint therefore lives in
+    its own task: it opens the transport and session, parks until close() is
+    called and then unwinds its AsyncExitStack where it was built.
+    """
+
+    def __init__(self, name: str, url: str, auth):
+        self.name = name
+        self.url = url
+        self.auth = auth
+        self.session: ClientSession | None = None
+        self.fingerprint: str | None = None
+        self._ready: asyncio.Future | None = None
+        self._closing = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        """False until opened, and once closing or the session has died."""
+        return (self.session is not None and self._task is not None
+                and not self._task.done() and not self._closing.is_set())
+
+    async def open(self, timeout: float) -> ClientSession:
+        """Start the owner task and wait for initialize() to complete."""
+        self._ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(), name=f"mcp-{self.name}")
+        try:
+            self.session = await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+        except BaseException:
+            await self.close()
+            raise
+        self.last_used = time.monotonic()
+        return self.session
+
+    async def _run(self):
+        try:
+            async with AsyncExitStack() as stack:
+                with timed("swiggy_mcp_connect_seconds", {"service": service_label(self.name)}):
+                    streams = await stack.enter_async_context(_open_stream(self.url, self.auth))
+                    session = await stack.enter_async_context(
+                        ClientSession(
+                            streams[0], streams[1],
+                            read_timeout_seconds=timedelta(seconds=300),
+                        )
+                    )
+                    self.fingerprint = server_fingerprint(await session.initialize())
+                self._ready.set_result(session)
+                await self._closing.wait()
+        except asyncio.CancelledError:
+            if not self._ready.done():
+                self._ready.cancel()
+            raise
+        except Exception as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            else:
+                logger.warning(f"{self.name} session ended: {e}")
+
+    async def close(self):
+        """Signal the owner task to tear down and wait for it to finish."""
+        if self._task is None:
+            return
+        self._closing.set()
+        if not self._ready.done():
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.session = None
 
 
 # =============================================================
@@ -246,110 +637,781 @@ class SwiggyMCPServer(MCPServiceProvider):
     add_server() flow works correctly — one provider, one call, no duplicates.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        endpoints: dict[str, str] | None = None,
+        auth=None,
+        connect_timeout: float = ENDPOINT_CONNECT_TIMEOUT,
+        catalog: ToolCatalogCache | None = None,
+        pool=None,
+        tool_cache: ToolResultCache | None = None,
+        cache_scope: str = "default",
+        compactor: ResultCompactor | None = None,
+        tool_policy: ToolExecutionPolicy | None = None,
+        turn_budget: float = TURN_BUDGET,
+        breakers: CircuitBreakers | None = None,
+        lazy: bool = False,
+        idle_timeout: float = SERVICE_IDLE_TIMEOUT,
+    ):
         super().__init__(connection_timeout=300.0)
-        self.auth = create_oauth_provider()
-        self._extra_sessions: dict[str, ClientSession] = {}
-        self._extra_stacks: list[AsyncExitStack] = []
+        self.endpoints = dict(endpoints or SWIGGY_MCP_ENDPOINTS)
+        self._auth = auth
+        self.connect_timeout = connect_timeout
+        self.catalog = catalog or ToolCatalogCache()
+        self.pool = pool
+        self.tool_cache = tool_cache or get_tool_cache()
+        self.cache_scope = cache_scope
+        self.compactor = compactor or ResultCompactor()
+        self.tool_policy = tool_policy or get_tool_policy()
+        self.turn_budget = turn_budget
+        self.breakers = breakers or get_circuit_breakers()
+        self.lazy = lazy
+        self.idle_timeout = idle_timeout
+        self._lease = None
+        self._connections: dict[str, _ServiceConnection] = {}
+        self._adapted_by_service: dict[str, dict] = {}
+        self._background: set[asyncio.Task] = set()
+        self._tool_services: dict[str, str] = {}
+        self._prefetched: dict[tuple, dict] = {}
+        # Identical idempotent calls in flight: (service, tool, arguments,
+        # cache generation) -> shared task.
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self.coalesced_calls = 0
+        self._service_slots: dict[str, asyncio.Semaphore] = {}
+        # filler_speech.FillerSpeech set by the agent once its session exists.
+        self.filler = None
+        self.prefetch_stats = {"issued": 0, "hits": 0, "joined_in_flight": 0, "saved_ms": 0.0}
+        self.failed_services: dict[str, str] = {}
+        self._hidden_services: set[str] = set()
+        self._reconnecting: dict[str, asyncio.Lock] = {}
+        # Connects started outside a call's attempt timeout: name -> task.
+        self._opening: dict[str, asyncio.Task] = {}
+        self._probes: dict[str, asyncio.Task] = {}
+        # Lazily opened services whose tools came from the catalog unchecked:
+        # name -> (catalog fingerprint, entry was stale).
+        self._unverified: dict[str, tuple[str | None, bool]] = {}
+
+    @property
+    def auth(self):
+        """OAuth provider, created on first use.
+
+        Pooled calls send no requests through it, but connect() still creates
+        it to run the token refresher, which keeps the stored tokens (and so
+        the pool's sessions) fresh.
+        """
+        if self._auth is None:
+            self._auth = create_oauth_provider()
+        return self._auth
 
     def get_stream_provider(self):
         """Primary connection uses the swiggy-food endpoint."""
-        return streamablehttp_client(
-            url=SWIGGY_MCP_ENDPOINTS["swiggy-food"],
-            timeout=timedelta(seconds=30),
-            sse_read_timeout=timedelta(seconds=300),
-            auth=self.auth,
-        )
+        return _open_stream(self.endpoints[PRIMARY_SERVICE], self.auth)
 
     async def connect(self):
-        """Connect to all 3 Swiggy MCP endpoints with shared OAuth."""
-        await super().connect()
-        logger.info("Connected to swiggy-food (primary)")
+        """Connect to all Swiggy MCP endpoints concurrently with shared OAuth.
+
+        With a session pool, a warm pre-initialized set is checked out instead
+        and no connection setup happens on the call. Otherwise each endpoint
+        gets its own timeout. Services that fail are logged and recorded in
+        `failed_services`; the rest stay usable. Services whose circuit is
+        open are not dialled at all and are probed in the background. Raises
+        only when no endpoint could be connected.
+
+        In lazy mode, services with a catalog entry are not dialled either:
+        their tools are listed from the catalog and the session is opened by
+        the first call to one of them (see _live_connection).
+        """
+        if self.pool is not None:
+            started = time.perf_counter()
+            self._lease = await self.pool.acquire()
+            if self._lease is not None:
+                self._connections = dict(self._lease.connections)
+                self._mark_connected()
+                self._start_token_refresher()
+                self._watch_breakers()
+                logger.info(
+                    f"Checked out warm Swiggy MCP sessions in "
+                    f"{(time.perf_counter() - started) * 1000:.1f}ms"
+                )
+                return
+            logger.info("Session pool empty; connecting directly")
+
+        self.failed_services.clear()
+        for name in self.endpoints:
+            breaker = self.breakers.get(name)
+            if breaker.is_open:
+                self.failed_services[name] = f"circuit open ({breaker.reason})"
+                logger.warning(f"Skipping {name}: circuit open ({breaker.reason})")
+        connections = {
+            name: _ServiceConnection(name, url, self.auth)
+            for name, url in self.endpoints.items()
+            if name not in self.failed_services
+        }
+        if self.lazy:
+            entries = await asyncio.gather(*(self.catalog.get(conn.url) for conn in connections.values()))
+            deferred = [name for name, entry in zip(list(connections), entries) if entry is not None]
+            for name in deferred:
+                self._connections[name] = connections.pop(name)
+            if deferred:
+                logger.info(f"Deferring connect to {deferred} until their first tool call")
+        try:
+            results = await asyncio.gather(
+                *(conn.open(self.connect_timeout) for conn in connections.values()),
+                return_exceptions=True,
+            )
+        except BaseException:
+            await asyncio.gather(*(conn.close() for conn in connections.values()))
+            raise
+
+        for (name, conn), result in zip(connections.items(), results):
+            if isinstance(result, BaseException):
+                reason = _describe_failure(result)
+                self.failed_services[name] = reason
+                self.breakers.get(name).record_failure(f"connect: {reason}")
+                logger.warning(f"Could not connect to {name} ({conn.url}): {reason}")
+            else:
+                self._connections[name] = conn
+                self.breakers.get(name).record_success()
+                logger.info(f"Connected to {name} ({conn.url})")
+
+        if not self._connections:
+            raise RuntimeError(
+                f"Could not connect to any Swiggy MCP endpoint: {self.failed_services}"
+            )
+        self._mark_connected()
+        self._start_token_refresher()
+        self._watch_breakers()
+        if self.lazy and self.idle_timeout:
+            self._spawn(self._close_idle_services())
+
+    def _start_token_refresher(self):
+        """Keep the shared token fresh while this server is connected.
+
+        With a session pool this also covers the pool's sessions: their
+        provider adopts the refreshed tokens from storage.
+        """
+        if isinstance(self.auth, _SharedOAuthProvider):
+            self._spawn(TokenRefresher(self.auth).run())
+
+    def _mark_connected(self):
+        primary = self._connections.get(PRIMARY_SERVICE) or next(iter(self._connections.values()))
+        self.connection_mgr.session = primary.session
+        self.connection_mgr.is_connected = True
+
+    async def _call_tool(self, svc_name: str, tool_name: str, parameters, deadline: float | None = None):
+        """Entry point for every Swiggy tool call made by the model.
+
+        Without an explicit perf_counter() `deadline`, the call gets what is
+        left of the turn budget, counted from the end of the user's speech.
+        With a `filler` set, slow calls are covered by filler speech.
+        """
+        tracer = get_turn_tracer()
+        if deadline is None:
+            deadline = turn_deadline(tracer.turn_anchor(), self.turn_budget)
+        filler = self.filler.covering(tool_name) if self.filler is not None else nullcontext()
+        async with filler:
+            with tracer.span(f"tool.{tool_name}", service=service_label(svc_name)):
+                result = await self._fetch_result(svc_name, tool_name, parameters, deadline)
+                return self.compactor.compact(tool_name, result)
+
+    async def _more_results(self, parameters):
+        return self.compactor.next_page(str(parameters.get("result_id", "")))
+
+    async def _parallel_calls(self, parameters):
+        """PARALLEL_CALLS_TOOL: run independent reads concurrently under one
+        turn deadline, returning one result or error per call, in order."""
+        calls = parameters.get("calls") or []
+        if not isinstance(calls, list) or not calls:
+            raise ToolError("'call_tools_parallel' needs a non-empty list of calls.")
+        if len(calls) > MAX_PARALLEL_CALLS:
+            raise ToolError(f"'call_tools_parallel' takes at most {MAX_PARALLEL_CALLS} calls; split the rest.")
+        deadline = turn_deadline(get_turn_tracer().turn_anchor(), self.turn_budget)
+        outcomes = await asyncio.gather(*(self._one_of_parallel(call, deadline) for call in calls))
+        return {"results": outcomes}
+
+    async def _one_of_parallel(self, call, deadline: float) -> dict:
+        tool_name = str(call.get("tool", "")) if isinstance(call, dict) else ""
+        try:
+            arguments = call.get("arguments") or {}
+            if isinstance(arguments, str):
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            if not isinstance(arguments, dict):
+                raise ValueError("arguments must be a JSON object")
+        except (AttributeError, ValueError) as e:
+            return {"tool": tool_name, "error": f"Invalid arguments: {e}"}
+        svc_name = self._tool_services.get(tool_name)
+        if svc_name is None:
+            return {"tool": tool_name, "error": f"Unknown or unavailable tool '{tool_name}'."}
+        if tool_name in MUTATING_TOOLS:
+            return {"tool": tool_name, "error": f"'{tool_name}' changes state; call it on its own."}
+        try:
+            return {"tool": tool_name, "result": await self._call_tool(svc_name, tool_name, arguments, deadline)}
+        except ToolError as e:
+            return {"tool": tool_name, "error": str(e)}
+        except Exception as e:
+            # One failed call must not discard the others' results.
+            logger.exception(f"Parallel call '{tool_name}' failed")
+            return {"tool": tool_name, "error": f"'{tool_name}' failed ({_describe_failure(e)}). "
+                                                f"Tell the user it did not work and offer to try again."}
+
+    def _slot(self, svc_name: str) -> asyncio.Semaphore:
+        slots = self._service_slots.get(svc_name)
+        if slots is None:
+            limit = SERVICE_CONCURRENCY.get(svc_name, DEFAULT_SERVICE_CONCURRENCY)
+            slots = self._service_slots[svc_name] = asyncio.Semaphore(limit)
+        return slots
+
+    async def _fetch_result(self, svc_name: str, tool_name: str, parameters, deadline: float | None = None):
+        """Run one tool call through the result cache, then the network.
+
+        A matching session-start prefetch answers first. Idempotent reads are
+        then answered from the shared cache when possible, or join an
+        identical call already in flight; mutating tools bypass both and
+        invalidate their service's entries.
+        """
+        if self._prefetched:
+            prefetched = await self._take_prefetched(tool_name, parameters)
+            if prefetched is not None:
+                return prefetched
+
+        if tool_name in MUTATING_TOOLS:
+            try:
+                return await self._route(svc_name, tool_name, parameters, deadline)
+            finally:
+                self.tool_cache.invalidate_service(svc_name)
+
+        if not self.tool_cache.is_cacheable(tool_name):
+            return await asyncio.shield(self._coalesced(svc_name, tool_name, parameters, deadline))
+
+        key = self.tool_cache.key(svc_name, tool_name, parameters, self.cache_scope)
+        cached = self.tool_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self.tool_cache.generation(svc_name)
+        result = await asyncio.shield(self._coalesced(svc_name, tool_name, parameters, deadline))
+        self.tool_cache.put(key, result, generation)
+        return result
+
+    def _coalesced(self, svc_name: str, tool_name: str, parameters, deadline: float | None = None) -> asyncio.Task:
+        """Task running an idempotent call, shared by identical calls made
+        while it is in flight (e.g. duplicate function calls in one turn, or
+        the model repeating a prefetch).
+
+        The task belongs to no caller: await it through asyncio.shield() so
+        an interrupted caller does not cancel it for the others. A mutating
+        call bumps the cache generation, so later reads never join a read
+        that started before it.
+        """
+        key = (svc_name, tool_name, canonical_arguments(parameters), self.tool_cache.generation(svc_name))
+        task = self._in_flight.get(key)
+        if task is not None and not task.done():
+            self.coalesced_calls += 1
+            get_metrics().inc("swiggy_tool_calls_coalesced_total",
+                              {"service": service_label(svc_name), "tool": tool_name})
+            return task
+        task = self._spawn(self._route(svc_name, tool_name, parameters, deadline))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._in_flight.pop(key) if self._in_flight.get(key) is done else None)
+        return task
+
+    async def _route(self, svc_name: str, tool_name: str, parameters, deadline: float | None = None):
+        """Send the call to its service under the timeout/retry/hedge policy
+        and the service's circuit breaker."""
+        if svc_name not in self._connections:
+            raise ToolError(f"Cannot execute tool '{tool_name}': {svc_name} is not connected")
+        if deadline is None:
+            deadline = turn_deadline(budget=self.turn_budget)
+        self._check_login()
+        breaker = self.breakers.get(svc_name)
+        slot = None
+        if not breaker.is_open:
+            await self._await_connection(svc_name, tool_name, deadline)
+            slot = await self._await_slot(svc_name, tool_name, deadline)
+        try:
+            return await self.tool_policy.run(
+                svc_name, tool_name, partial(self._attempt, svc_name, tool_name, parameters),
+                deadline, breaker,
+            )
+        finally:
+            if slot is not None:
+                slot.release()
+            if breaker.is_open:
+                self._watch_breakers()
+
+    async def _await_connection(self, svc_name: str, tool_name: str, deadline: float):
+        """Wait, within the turn's deadline, for the service's session to be
+        open before the call's attempts (and their per-tool timeouts) start.
+
+        A cold connect can take far longer than one attempt's timeout, so it
+        runs as a shared background task bounded by connect_timeout: a call
+        that runs out of time leaves it going for the next call, and the
+        breaker only records connects that fail, not ones still in progress.
+        """
+        conn = self._connections.get(svc_name)
+        if conn is not None and conn.alive:
+            return
+        opening = self._opening.get(svc_name)
+        if opening is None or opening.done():
+            opening = self._opening[svc_name] = self._spawn(self._live_connection(svc_name))
+        label = service_label(svc_name).title()
+        try:
+            await asyncio.wait_for(asyncio.shield(opening), max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            raise ToolError(f"'{tool_name}' was not run: Swiggy {label} is still connecting. Tell the "
+                            f"user it is taking a moment and offer to try again shortly.") from None
+        except Exception as e:
+            self._check_login(e)
+            reason = _describe_failure(e)
+            self.breakers.get(svc_name).record_failure(f"connect: {reason}")
+            raise ToolError(f"'{tool_name}' failed: could not reach Swiggy {label} ({reason}). "
+                            f"Tell the user the service is having trouble.") from e
+
+    async def _await_slot(self, svc_name: str, tool_name: str, deadline: float) -> asyncio.Semaphore:
+        """Take one of the service's concurrency slots, within the turn's
+        deadline, before the call's attempts start.
+
+        Time queued behind the limit is not the service being slow, so it
+        must not count against an attempt's timeout, the breaker or the
+        hedging latency window. The caller releases the slot.
+        """
+        slot = self._slot(svc_name)
+        try:
+            await asyncio.wait_for(slot.acquire(), max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            raise ToolError(f"'{tool_name}' was not run: this turn is out of time. Tell the user "
+                            f"Swiggy is slow right now and offer to try again.") from None
+        return slot
+
+    async def _attempt(self, svc_name: str, tool_name: str, parameters):
+        try:
+            conn = await self._live_connection(svc_name)
+            conn.in_flight += 1
+            try:
+                return await _route_tool_call(self.tool_executor, conn.session, tool_name, parameters, svc_name)
+            finally:
+                conn.in_flight -= 1
+                conn.last_used = time.monotonic()
+        except Exception as e:
+            self._check_login(e)
+            raise
+
+    def _check_login(self, cause: BaseException | None = None):
+        """Raise the re-enroll ToolError once a caller's login has expired.
+
+        A ToolError is what the tool policy treats as an answer, so the call
+        is neither retried nor counted against the service's breaker.
+        """
+        if getattr(self._auth, "login_expired", False):
+            raise ToolError(REENROLL_MESSAGE) from cause
+
+    async def _live_connection(self, svc_name: str):
+        """The service's connection, opened first if it is not open yet (lazy
+        mode, idle close) or its session has ended (e.g. after an HTTP error
+        on its stream). Concurrent callers share one connect."""
+        conn = self._connections.get(svc_name)
+        if conn is not None and conn.alive:
+            return conn
+        lock = self._reconnecting.setdefault(svc_name, asyncio.Lock())
+        async with lock:
+            conn = self._connections.get(svc_name)
+            if conn is not None and conn.alive:
+                return conn
+            fresh = _ServiceConnection(svc_name, self.endpoints[svc_name], self.auth)
+            await fresh.open(self.connect_timeout)
+            if isinstance(conn, _ServiceConnection):
+                await conn.close()
+            self._connections[svc_name] = fresh
+            logger.info(f"Opened {svc_name} session ({fresh.url})")
+            if svc_name in self._unverified:
+                listed, stale = self._unverified.pop(svc_name)
+                if stale or fresh.fingerprint != listed:
+                    self._spawn(self._revalidate_catalog([svc_name]))
+            return fresh
+
+    async def _close_idle_services(self):
+        """Lazy mode: close sessions with no call for idle_timeout seconds.
+        The next call to the service opens a new one."""
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 4))
+            for svc_name, conn in list(self._connections.items()):
+                if not isinstance(conn, _ServiceConnection) or not conn.alive or conn.in_flight:
+                    continue
+                idle = time.monotonic() - conn.last_used
+                if idle < self.idle_timeout:
+                    continue
+                async with self._reconnecting.setdefault(svc_name, asyncio.Lock()):
+                    if conn.in_flight:
+                        continue
+                    await conn.close()
+                logger.info(f"Closed {svc_name} session after {idle:.0f}s idle")
+
+    def _watch_breakers(self):
+        """Probe every service whose circuit is open and re-publish the tool
+        list without (or, once closed, with) its tools."""
+        for svc_name in self.endpoints:
+            probe = self._probes.get(svc_name)
+            if self.breakers.get(svc_name).is_open and (probe is None or probe.done()):
+                self._probes[svc_name] = self._spawn(self._probe_until_closed(svc_name))
+        self._sync_exposed_tools()
+
+    async def _probe_until_closed(self, svc_name: str):
+        breaker = self.breakers.get(svc_name)
+        while breaker.is_open:
+            delay = breaker.probe_in()
+            if delay or breaker.state != OPEN:
+                await asyncio.sleep(delay or 1.0)
+            if not breaker.begin_probe():
+                continue  # not due yet, or another server is probing
+            try:
+                conn = await asyncio.wait_for(self._probe(svc_name), BREAKER_PROBE_TIMEOUT)
+            except asyncio.CancelledError:
+                breaker.abandon_probe()
+                raise
+            except Exception as e:
+                breaker.probe_failed(_describe_failure(e))
+                continue
+            breaker.probe_succeeded()
+            if svc_name not in self._adapted_by_service and self.tool_registry.has_valid_cache():
+                await self._adopt_recovered_service(svc_name, conn)
+        self._sync_exposed_tools()
+
+    async def _probe(self, svc_name: str):
+        conn = await self._live_connection(svc_name)
+        tools = self._adapted_by_service.get(svc_name, {})
+        probe_tool = next((name for name in BREAKER_PROBE_TOOLS if name in tools), None)
+        request = conn.session.call_tool(probe_tool, {}) if probe_tool else conn.session.send_ping()
+        await asyncio.wait_for(request, self.breakers.get(svc_name).slow_call)
+        return conn
+
+    async def _adopt_recovered_service(self, svc_name: str, conn):
+        """Load the tools of a service that was down when the tools were listed."""
+        entry = await self.catalog.get(conn.url, conn.fingerprint)
+        if entry is not None:
+            tools, schemas = entry.mcp_tools(), dict(entry.schemas)
+        else:
+            tools, schemas = (await _list_tools(svc_name, conn.session)).tools, {}
+        self._adapted_by_service[svc_name] = self._adapt_service_tools(
+            svc_name, tools, schemas, {"sanitize": 0.0, "adapt": 0.0}
+        )
+        self.failed_services.pop(svc_name, None)
+        logger.info(f"{svc_name} recovered; adding its {len(tools)} tools")
+
+    def _sync_exposed_tools(self):
+        """Swap the registry's tool list if the set of open circuits changed."""
+        hidden = {svc_name for svc_name in self._connections if self.breakers.get(svc_name).is_open}
+        if hidden == self._hidden_services or not self.tool_registry.has_valid_cache():
+            self._hidden_services = hidden
+            return
+        self._hidden_services = hidden
+        self.tool_registry.update_cache(self._assemble_tools())
+        logger.info(f"Swiggy tools re-published; services hidden by open circuits: {sorted(hidden) or 'none'}")
+
+    def _adapt_tool(self, svc_name: str, tool, schema: dict):
+        """Wrap one MCP tool as a framework tool routed to its owning service."""
+        executor = partial(self._call_tool, svc_name, tool.name)
+        return create_generic_mcp_adapter(
+            tool_name=tool.name,
+            tool_description=tool.description,
+            input_schema=schema,
+            client_call_function=executor,
+        )
 
-        for name, url in SWIGGY_MCP_ENDPOINTS.items():
-            if name == "swiggy-food":
+    def _adapt_service_tools(self, svc_name: str, tools, schemas: dict, timings: dict) -> dict:
+        """Sanitize (unless cached) and adapt one service's tools.
+
+        `schemas` is filled in place so callers can persist it to the catalog.
+        Cross-service duplicates are kept here and resolved in _assemble_tools.
+        """
+        adapted = {}
+        for tool in tools:
+            started = time.perf_counter()
+            if tool.name not in schemas:
+                schemas[tool.name] = compile_schema(tool.inputSchema or {})
+            sanitized = time.perf_counter()
+            adapted[tool.name] = self._adapt_tool(svc_name, tool, schemas[tool.name])
+            timings["sanitize"] += sanitized - started
+            timings["adapt"] += time.perf_counter() - sanitized
+        return adapted
+
+    def _assemble_tools(self) -> list:
+        """Deduplicated tool list in endpoint order (first service wins),
+        leaving out services whose circuit is open."""
+        self._tool_services.clear()
+        framework_tools = []
+        for svc_name in self.endpoints:
+            if svc_name not in self._connections or svc_name in self._hidden_services:
                 continue
-            stack = AsyncExitStack()
-            self._extra_stacks.append(stack)
-            streams = await stack.enter_async_context(
-                streamablehttp_client(
-                    url=url,
-                    timeout=timedelta(seconds=30),
-                    sse_read_timeout=timedelta(seconds=300),
-                    auth=self.auth,
-                )
+            for tool_name, adapted in self._adapted_by_service.get(svc_name, {}).items():
+                if tool_name in self._tool_services:
+                    logger.info(f"Skipping duplicate '{tool_name}' from {svc_name}")
+                    continue
+                self._tool_services[tool_name] = svc_name
+                framework_tools.append(adapted)
+        framework_tools.append(
+            create_generic_mcp_adapter(
+                tool_name=RESULT_PAGING_TOOL["name"],
+                tool_description=RESULT_PAGING_TOOL["description"],
+                input_schema=RESULT_PAGING_TOOL["input_schema"],
+                client_call_function=self._more_results,
             )
-            session = await stack.enter_async_context(
-                ClientSession(
-                    streams[0], streams[1],
-                    read_timeout_seconds=timedelta(seconds=300),
-                )
+        )
+        framework_tools.append(
+            create_generic_mcp_adapter(
+                tool_name=PARALLEL_CALLS_TOOL["name"],
+                tool_description=PARALLEL_CALLS_TOOL["description"],
+                input_schema=PARALLEL_CALLS_TOOL["input_schema"],
+                client_call_function=self._parallel_calls,
             )
-            await session.initialize()
-            self._extra_sessions[name] = session
-            logger.info(f"Connected to {name} ({url})")
+        )
+        return framework_tools
+
+    def service_tool_names(self, include_hidden: bool = False) -> dict[str, set[str]]:
+        """Service name -> names of every tool it offers (duplicates included),
+        leaving out services hidden by an open circuit unless include_hidden."""
+        return {svc_name: set(adapted) for svc_name, adapted in self._adapted_by_service.items()
+                if include_hidden or svc_name not in self._hidden_services}
+
+    def exposed_tools(self) -> list | None:
+        """The tool list currently published to the agent (services with an
+        open circuit left out), or None before the tools are registered."""
+        if not self.tool_registry.has_valid_cache():
+            return None
+        return list(self.tool_registry.get_cached_tools())
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+        return task
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Background task failed: {task.exception()}")
+
+    def start_prefetch(self, tool_names=PREFETCH_TOOLS):
+        """Start argument-less reads in the background (e.g. during GREETING).
+
+        The model's first matching call is answered from the prefetched result,
+        or joins the request if it is still in flight. In lazy mode only
+        services whose session is already open are prefetched from, so a
+        prefetch never opens a service the caller may not use.
+        """
+        if not self.is_ready or not self._tool_services:
+            logger.info("Skipping prefetch: Swiggy tools not registered yet")
+            return
+        for tool_name in tool_names:
+            svc_name = self._tool_services.get(tool_name)
+            if svc_name is None:
+                continue
+            conn = self._connections.get(svc_name)
+            if self.lazy and not (conn is not None and conn.alive):
+                logger.info(f"Not prefetching '{tool_name}': {svc_name} is not connected yet")
+                continue
+            entry = {"started": time.perf_counter(), "finished": None}
+            entry["task"] = self._coalesced(svc_name, tool_name, {})
+            entry["task"].add_done_callback(
+                lambda _, entry=entry: entry.update(finished=time.perf_counter())
+            )
+            self._prefetched[(tool_name, canonical_arguments({}))] = entry
+            self.prefetch_stats["issued"] += 1
+        logger.info(f"Prefetching {[key[0] for key in self._prefetched]}")
+
+    async def _take_prefetched(self, tool_name: str, parameters):
+        """Result of a matching prefetch (awaiting it if still in flight), or
+        None if there is none or it failed. Each prefetch is used once."""
+        entry = self._prefetched.pop((tool_name, canonical_arguments(parameters)), None)
+        if entry is None:
+            return None
+        in_flight = entry["finished"] is None
+        # Time the model did not have to wait: the whole round-trip if it had
+        # already finished, otherwise the part that elapsed before this call.
+        saved = (time.perf_counter() if in_flight else entry["finished"]) - entry["started"]
+        try:
+            result = await asyncio.shield(entry["task"])
+        except Exception as e:
+            logger.info(f"Prefetch of '{tool_name}' failed ({e}); calling live")
+            return None
+        self.prefetch_stats["hits"] += 1
+        self.prefetch_stats["joined_in_flight"] += in_flight
+        self.prefetch_stats["saved_ms"] += saved * 1000
+        return result
 
     async def get_available_tools(self):
-        """Gather tools from all 3 endpoints, deduplicate and sanitize schemas."""
+        """Gather tools from all endpoints, deduplicate and sanitize schemas.
+
+        Each service's tools come from the shared on-disk catalog when it holds
+        an entry for the same server version; only misses wait on a live
+        list_tools(), and those run in parallel. Stale entries are served as-is
+        and revalidated in the background. Duplicates are resolved in endpoint
+        order (food, instamart, dineout), so the first service to define a tool
+        always wins regardless of response order.
+        """
         if not self.is_ready:
             raise RuntimeError("Not connected")
 
         if self.tool_registry.has_valid_cache():
             return self.tool_registry.get_cached_tools()
 
-        all_sessions = {"swiggy-food": self.connection_mgr.session}
-        all_sessions.update(self._extra_sessions)
-
-        seen_names: set[str] = set()
-        framework_tools = []
-
-        for svc_name, session in all_sessions.items():
-            mcp_tools = await session.list_tools()
-
-            for tool in mcp_tools.tools:
-                if tool.name in seen_names:
-                    logger.info(f"Skipping duplicate '{tool.name}' from {svc_name}")
-                    continue
-                seen_names.add(tool.name)
-
-                schema = _sanitize_schema(tool.inputSchema or {})
-                executor = partial(
-                    _route_tool_call, self.tool_executor, session, tool.name
-                )
+        timings = {"list": 0.0, "sanitize": 0.0, "adapt": 0.0}
+        cached_services: list[str] = []
+        stale_services: list[str] = []
+
+        async def _load(svc_name, conn):
+            entry = await self.catalog.get(conn.url, conn.fingerprint)
+            if entry is not None:
+                cached_services.append(svc_name)
+                if not conn.alive:
+                    # Not opened yet: check the version when it is.
+                    self._unverified[svc_name] = (entry.fingerprint, not self.catalog.is_fresh(entry))
+                elif not self.catalog.is_fresh(entry):
+                    stale_services.append(svc_name)
+                return svc_name, entry.mcp_tools(), dict(entry.schemas)
+            started = time.perf_counter()
+            try:
+                if not conn.alive:
+                    conn = await self._live_connection(svc_name)
+                listing = await _list_tools(svc_name, conn.session)
+            except Exception as e:
+                return svc_name, e, None
+            timings["list"] = max(timings["list"], time.perf_counter() - started)
+            return svc_name, listing.tools, None
+
+        self._adapted_by_service.clear()
+        for next_listing in asyncio.as_completed(
+            [_load(name, conn) for name, conn in self._connections.items()]
+        ):
+            svc_name, tools, schemas = await next_listing
+            if isinstance(tools, Exception):
+                logger.warning(f"Could not list tools from {svc_name}: {tools}")
+                continue
 
-                adapted = create_generic_mcp_adapter(
-                    tool_name=tool.name,
-                    tool_description=tool.description,
-                    input_schema=schema,
-                    client_call_function=executor,
-                )
-                framework_tools.append(adapted)
+            live = schemas is None
+            schemas = schemas or {}
+            self._adapted_by_service[svc_name] = self._adapt_service_tools(
+                svc_name, tools, schemas, timings
+            )
+            if live:
+                conn = self._connections[svc_name]
+                self._spawn(self.catalog.put(
+                    CatalogEntry.from_listing(conn.url, conn.fingerprint, tools, schemas)
+                ))
 
+        framework_tools = self._assemble_tools()
         self.tool_registry.update_cache(framework_tools)
         logger.info(
             f"Registered {len(framework_tools)} unique Swiggy tools "
-            f"across {len(all_sessions)} services"
+            f"across {len(self._adapted_by_service)} services "
+            f"({len(cached_services)} from catalog; "
+            f"list {timings['list'] * 1000:.0f}ms, "
+            f"sanitize {timings['sanitize'] * 1000:.1f}ms, "
+            f"adapt {timings['adapt'] * 1000:.1f}ms)"
         )
+        if stale_services:
+            self._spawn(self._revalidate_catalog(stale_services))
         return framework_tools
 
-    async def disconnect(self):
-        """Disconnect from all Swiggy endpoints."""
-        for stack in self._extra_stacks:
+    async def _revalidate_catalog(self, svc_names: list[str]):
+        """Re-list stale services, refresh the on-disk catalog and swap the new
+        tools into the registry if anything changed. Never blocks tool calls."""
+        changed = False
+        for svc_name in svc_names:
+            conn = self._connections.get(svc_name)
+            if conn is None or conn.session is None:
+                continue
             try:
-                await stack.aclose()
+                listing = await _list_tools(svc_name, conn.session)
             except Exception as e:
-                logger.warning(f"Error closing extra session: {e}")
-        self._extra_sessions.clear()
-        self._extra_stacks.clear()
+                logger.warning(f"Catalog revalidation failed for {svc_name}: {e}")
+                continue
+
+            cached = await self.catalog.get(conn.url, conn.fingerprint)
+            schemas = {}
+            fresh = CatalogEntry.from_listing(conn.url, conn.fingerprint, listing.tools, schemas)
+            if cached is None or not cached.same_tools(fresh):
+                timings = {"sanitize": 0.0, "adapt": 0.0}
+                self._adapted_by_service[svc_name] = self._adapt_service_tools(
+                    svc_name, listing.tools, schemas, timings
+                )
+                changed = True
+            else:
+                fresh.schemas = cached.schemas
+            await self.catalog.put(fresh)
+
+        if changed:
+            self.tool_registry.update_cache(self._assemble_tools())
+            logger.info(f"Tool catalog changed for {svc_names}; registry updated")
+
+    async def refresh_catalog(self) -> list[str]:
+        """List every open service's tools and write them to the catalog
+        before returning (worker pre-warm); returns the services written."""
+        written = []
+        for svc_name, conn in self._connections.items():
+            if conn.session is None:
+                continue
+            try:
+                listing = await _list_tools(svc_name, conn.session)
+            except Exception as e:
+                logger.warning(f"Could not list tools from {svc_name}: {e}")
+                continue
+            schemas = {}
+            self._adapt_service_tools(svc_name, listing.tools, schemas, {"sanitize": 0.0, "adapt": 0.0})
+            await self.catalog.put(CatalogEntry.from_listing(conn.url, conn.fingerprint, listing.tools, schemas))
+            written.append(svc_name)
+        return written
+
+    async def disconnect(self):
+        """Disconnect from all Swiggy endpoints."""
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        logger.info(f"Tool cache: {self.tool_cache.stats()}")
+        if self.prefetch_stats["issued"]:
+            stats = self.prefetch_stats
+            logger.info(
+                f"Prefetch: {stats['hits']}/{stats['issued']} used "
+                f"(hit rate {stats['hits'] / stats['issued']:.0%}, "
+                f"{stats['joined_in_flight']} joined in flight), "
+                f"{stats['saved_ms']:.0f}ms of tool latency saved"
+            )
+        if self.compactor.stats["results"]:
+            logger.info(f"Result compaction: {self.compactor.summary()}")
+        self._prefetched.clear()
+        if self._lease is not None:
+            await self.pool.release(self._lease)
+            self._lease = None
+        # Pooled connections go back with the lease; close the ones opened here.
+        await asyncio.gather(*(
+            conn.close() for conn in self._connections.values() if isinstance(conn, _ServiceConnection)
+        ))
+        self._connections.clear()
         await super().disconnect()
 
     def __repr__(self):
-        return f"SwiggyMCPServer(services={list(SWIGGY_MCP_ENDPOINTS.keys())})"
+        return f"SwiggyMCPServer(services={list(self.endpoints.keys())})"
 
 
-def build_swiggy_mcp_servers() -> list[SwiggyMCPServer]:
-    """Build a single unified MCP server for all Swiggy services."""
-    server = SwiggyMCPServer()
+def build_swiggy_mcp_servers(pool=None, caller_id: str | None = None,
+                             lazy: bool = False) -> list[SwiggyMCPServer]:
+    """Build a single unified MCP server for all Swiggy services.
+
+    Pass a session_pool.SessionPool to check out warm sessions per call.
+    With lazy=True, directly connected services open their session on first
+    use and close it when idle.
+    With a caller_id (phone number / WhatsApp ID) the server uses that
+    caller's own login from the CallerTokenStore and a per-caller tool cache
+    scope; the pool holds sessions of the shared login, so it is not used.
+    A caller's login never opens a browser: once it cannot be refreshed,
+    calls fail with REENROLL_MESSAGE.
+    """
+    if caller_id is not None:
+        caller_id = normalize_caller_id(caller_id)
+        storage = get_caller_token_store().for_caller(caller_id)
+        auth = create_oauth_provider(storage=storage, interactive=False)
+        server = SwiggyMCPServer(auth=auth, cache_scope=caller_id, lazy=lazy)
+        logger.info(f"Configured unified Swiggy MCP for caller {mask_caller_id(caller_id)}")
+        return [server]
+    server = SwiggyMCPServer(pool=pool, lazy=lazy)
     logger.info(f"Configured unified Swiggy MCP: {list(SWIGGY_MCP_ENDPOINTS.keys())}")
     return [server]
 
@@ -358,14 +1420,23 @@ def build_swiggy_mcp_servers() -> list[SwiggyMCPServer]:
 #  Standalone Login (run this to auth before using the agent)
 # =============================================================
 
-async def _test_login():
-    """Test OAuth by connecting to swiggy-food and listing tools."""
+async def _test_login(caller_id: str | None = None):
+    """Test OAuth by connecting to swiggy-food and listing tools.
+
+    With a caller_id, the login is stored for that phone caller instead of
+    the shared account.
+    """
     print("=" * 50)
     print("  SWIGGY MCP LOGIN")
     print("=" * 50)
 
     url = SWIGGY_MCP_ENDPOINTS["swiggy-food"]
-    auth = create_oauth_provider()
+    storage = None
+    if caller_id is not None:
+        caller_id = normalize_caller_id(caller_id)
+        storage = get_caller_token_store().for_caller(caller_id)
+        print(f"\nEnrolling phone caller {caller_id}")
+    auth = create_oauth_provider(storage=storage)
 
     print(f"\nConnecting to {url}...")
     async with streamablehttp_client(url=url, timeout=timedelta(seconds=30), sse_read_timeout=timedelta(seconds=60), auth=auth) as streams:
@@ -376,10 +1447,19 @@ async def _test_login():
             for t in tools.tools:
                 print(f"  - {t.name}: {(t.description or '')[:60]}")
 
+    if caller_id is not None:
+        print(f"\nTokens saved for caller {caller_id} in: {get_caller_token_store().path}")
+        print("Calls from this number will now use this Swiggy account.\n")
+        return
     print(f"\nTokens saved to: {TOKEN_FILE}")
     print("You can now run the agent — it will reuse this login.\n")
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Log in to Swiggy MCP.")
+    parser.add_argument("--caller", help="enroll this phone number / WhatsApp ID for the phone agent")
+    args = parser.parse_args()
     logging.basicConfig(level=logging.INFO)
-    asyncio.run(_test_login())
+    asyncio.run(_test_login(args.caller))
@@ -0,0 +1,465 @@
+"""
+OAuth token storage shared by every agent process.
+
+The phone worker runs up to max_processes job processes that all use the
+same Swiggy login. FileTokenStorage keeps it in one JSON file:
+  - writes take an exclusive file lock, re-read the file, bump a generation
+    counter and replace the file atomically (temp file + fsync + rename), so
+    readers never see a torn file and concurrent writers never drop fields
+  - the token expiry is stored as an absolute time, so a process that loads
+    the file knows when the access token runs out
+  - reload() notices another process's write by file mtime/size/inode
+  - refresh_lock() is a second, long-held lock around the refresh round-trip:
+    the first process refreshes, the others wait, reload and adopt the new
+    tokens instead of spending (and, with rotating refresh tokens,
+    invalidating) another refresh
+
+File I/O and lock waits run off the event loop. Without fcntl (Windows) the
+locks only serialize within one process.
+
+CallerTokenStore holds per-caller OAuth state for the phone agent (caller
+number / WhatsApp ID -> tokens and client info) in SQLite in WAL mode:
+primary-key lookups, an in-process LRU of hot callers, and the same
+generation/refresh-lock contract as FileTokenStorage via for_caller().
+"""
+
+import asyncio
+import errno
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from mcp.client.auth import TokenStorage
+from mcp.shared.auth import OAuthClientInformationFull, OAuthToken
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+TOKEN_FILE = Path(__file__).parent / ".swiggy_tokens.json"
+TOKEN_DB = Path(__file__).parent / ".swiggy_tokens.db"
+
+# Callers kept in memory per process by CallerTokenStore.
+TOKEN_CACHE_SIZE = 1024
+# Callers hash onto this many byte-range locks in one refresh lock file.
+_REFRESH_LOCK_SLOTS = 1 << 16
+
+# How long a process waits for another one's refresh before refreshing itself.
+TOKEN_REFRESH_LOCK_TIMEOUT = 30.0
+_LOCK_POLL_INTERVAL = 0.02
+
+_thread_locks: dict[Path, threading.Lock] = {}
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock on `path` across processes (blocking)."""
+    if not FCNTL_AVAILABLE:
+        with _thread_locks.setdefault(path, threading.Lock()):
+            yield
+        return
+    with open(path, "a+") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+async def _acquire_polling(try_acquire, timeout: float) -> bool:
+    """Call try_acquire() until it succeeds or `timeout` seconds pass."""
+    deadline = time.monotonic() + timeout
+    while not try_acquire():
+        if time.monotonic() >= deadline:
+            logger.warning("Timed out waiting for another process's token refresh")
+            return False
+        await asyncio.sleep(_LOCK_POLL_INTERVAL)
+    return True
+
+
+def _stat_key(path: Path) -> tuple | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class FileTokenStorage(TokenStorage):
+    """Stores OAuth tokens and client info in a JSON file shared across processes."""
+
+    def __init__(self, path: Path = TOKEN_FILE, refresh_lock_timeout: float = TOKEN_REFRESH_LOCK_TIMEOUT):
+        self._path = path
+        self._lock_path = path.with_name(path.name + ".lock")
+        self._refresh_lock_path = path.with_name(path.name + ".refresh.lock")
+        self.refresh_lock_timeout = refresh_lock_timeout
+        self._stat: tuple | None = None
+        self._data: dict = {}
+        self._read_if_changed()
+
+    @property
+    def generation(self) -> int:
+        """Number of writes the file has seen (0 for a new or pre-generation file)."""
+        return self._data.get("generation", 0)
+
+    @property
+    def expires_at(self) -> float | None:
+        """Absolute expiry of the stored access token, if known."""
+        return self._data.get("expires_at")
+
+    def _read_if_changed(self) -> bool:
+        stat = _stat_key(self._path)
+        if stat == self._stat:
+            return False
+        data = {}
+        if stat is not None:
+            try:
+                data = json.loads(self._path.read_text())
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Could not read token file {self._path}: {e}")
+                return False
+        self._stat, self._data = stat, data
+        return True
+
+    async def reload(self) -> bool:
+        """Pick up a write by another process; True if the file changed."""
+        return await asyncio.to_thread(self._read_if_changed)
+
+    def _write(self, fields: dict):
+        with _file_lock(self._lock_path):
+            self._read_if_changed()
+            data = {**self._data, **fields, "generation": self.generation + 1}
+            fd, tmp = tempfile.mkstemp(dir=self._path.parent, prefix=self._path.name, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f, indent=2, default=str)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self._path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._stat, self._data = _stat_key(self._path), data
+
+    async def get_tokens(self) -> OAuthToken | None:
+        await self.reload()
+        raw = self._data.get("tokens")
+        if raw:
+            return OAuthToken(**raw)
+        return None
+
+    async def set_tokens(self, tokens: OAuthToken) -> None:
+        expires_at = time.time() + tokens.expires_in if tokens.expires_in else None
+        await asyncio.to_thread(self._write, {"tokens": tokens.model_dump(), "expires_at": expires_at})
+        logger.info(f"Tokens saved successfully (generation {self.generation})")
+
+    async def get_client_info(self) -> OAuthClientInformationFull | None:
+        await self.reload()
+        raw = self._data.get("client_info")
+        if raw:
+            return OAuthClientInformationFull(**raw)
+        return None
+
+    async def set_client_info(self, client_info: OAuthClientInformationFull) -> None:
+        await asyncio.to_thread(self._write, {"client_info": client_info.model_dump(mode="json")})
+        logger.info("Client info saved")
+
+    @asynccontextmanager
+    async def refresh_lock(self):
+        """Hold the cross-process refresh lock for the duration of the block.
+
+        Gives up waiting after refresh_lock_timeout (a stuck holder must not
+        block every call), in which case the block runs unlocked.
+        """
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        f = await asyncio.to_thread(open, self._refresh_lock_path, "a+")
+
+        def try_lock() -> bool:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                return False
+
+        locked = False
+        try:
+            locked = await _acquire_polling(try_lock, self.refresh_lock_timeout)
+            yield
+        finally:
+            if locked:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            f.close()
+
+
+# =============================================================
+#  Per-caller token store (phone agent)
+# =============================================================
+
+def normalize_caller_id(caller: str) -> str:
+    """'+91 98765-43210' or 'whatsapp:+919876543210' -> '+919876543210'."""
+    caller = caller.strip().removeprefix("whatsapp:").removeprefix("sip:").split("@")[0]
+    digits = "".join(ch for ch in caller if ch.isdigit())
+    if not digits:
+        return caller
+    return ("+" if caller.startswith("+") else "") + digits
+
+
+def mask_caller_id(caller_id: str) -> str:
+    """Caller id safe for logs: '+919876543210' -> '+91******3210'."""
+    if len(caller_id) <= 7:
+        return "*" * len(caller_id)
+    return caller_id[:3] + "*" * (len(caller_id) - 7) + caller_id[-4:]
+
+
+_EMPTY_ROW = {"tokens": None, "expires_at": None, "client_info": None, "generation": 0}
+
+
+class CallerTokenStore:
+    """Per-caller OAuth tokens and client info in SQLite, shared by all processes.
+
+    One row per caller, keyed by normalized caller id (a primary-key B-tree
+    lookup regardless of how many callers are enrolled). WAL mode lets every
+    worker process read while one writes. Rows are loaded lazily and the most
+    recently used ones are kept in an in-process LRU; every SQLite call runs
+    in a worker thread.
+    """
+
+    def __init__(self, path: Path = TOKEN_DB, cache_size: int = TOKEN_CACHE_SIZE,
+                 refresh_lock_timeout: float = TOKEN_REFRESH_LOCK_TIMEOUT):
+        self.path = path
+        self.cache_size = cache_size
+        self.refresh_lock_timeout = refresh_lock_timeout
+        self._conn: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._refresh_lock_path = path.with_name(path.name + ".refresh.lock")
+        self._refresh_lock_file = None
+        self._slot_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.stats = {"hits": 0, "misses": 0}
+
+    # ---- SQLite (worker threads) ----
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS callers ("
+                " caller_id TEXT PRIMARY KEY,"
+                " tokens TEXT,"
+                " expires_at REAL,"
+                " client_info TEXT,"
+                " generation INTEGER NOT NULL DEFAULT 0,"
+                " updated_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _select(db: sqlite3.Connection, caller_id: str) -> dict | None:
+        row = db.execute(
+            "SELECT tokens, expires_at, client_info, generation FROM callers WHERE caller_id = ?",
+            (caller_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        tokens, expires_at, client_info, generation = row
+        return {
+            "tokens": json.loads(tokens) if tokens else None,
+            "expires_at": expires_at,
+            "client_info": json.loads(client_info) if client_info else None,
+            "generation": generation,
+        }
+
+    def _fetch(self, caller_id: str) -> dict | None:
+        with self._db_lock:
+            return self._select(self._db(), caller_id)
+
+    def _write(self, caller_id: str, fields: dict) -> dict:
+        with self._db_lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                current = self._select(db, caller_id) or _EMPTY_ROW
+                row = {**current, **fields, "generation": current["generation"] + 1}
+                db.execute(
+                    "INSERT INTO callers (caller_id, tokens, expires_at, client_info, generation, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(caller_id) DO UPDATE SET tokens = excluded.tokens,"
+                    " expires_at = excluded.expires_at, client_info = excluded.client_info,"
+                    " generation = excluded.generation, updated_at = excluded.updated_at",
+                    (
+                        caller_id,
+                        json.dumps(row["tokens"], default=str) if row["tokens"] else None,
+                        row["expires_at"],
+                        json.dumps(row["client_info"], default=str) if row["client_info"] else None,
+                        row["generation"],
+                        time.time(),
+                    ),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return row
+
+    def _delete(self, caller_id: str):
+        with self._db_lock:
+            self._db().execute("DELETE FROM callers WHERE caller_id = ?", (caller_id,))
+
+    def _count(self) -> int:
+        with self._db_lock:
+            return self._db().execute("SELECT COUNT(*) FROM callers").fetchone()[0]
+
+    # ---- async API (event loop) ----
+
+    def _remember(self, caller_id: str, row: dict | None):
+        if row is None:
+            self._cache.pop(caller_id, None)
+            return
+        self._cache[caller_id] = row
+        self._cache.move_to_end(caller_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def get(self, caller_id: str) -> dict | None:
+        """The caller's row, from the LRU when hot."""
+        row = self._cache.get(caller_id)
+        if row is not None:
+            self._cache.move_to_end(caller_id)
+            self.stats["hits"] += 1
+            return row
+        self.stats["misses"] += 1
+        return await self.reload(caller_id)
+
+    async def reload(self, caller_id: str) -> dict | None:
+        """Re-read the caller's row (e.g. after another process refreshed it)."""
+        row = await asyncio.to_thread(self._fetch, caller_id)
+        self._remember(caller_id, row)
+        return row
+
+    async def update(self, caller_id: str, **fields) -> dict:
+        row = await asyncio.to_thread(self._write, caller_id, fields)
+        self._remember(caller_id, row)
+        return row
+
+    async def is_enrolled(self, caller_id: str) -> bool:
+        row = await self.get(caller_id)
+        return bool(row and row["tokens"])
+
+    async def remove(self, caller_id: str):
+        await asyncio.to_thread(self._delete, caller_id)
+        self._remember(caller_id, None)
+
+    async def count(self) -> int:
+        return await asyncio.to_thread(self._count)
+
+    def for_caller(self, caller_id: str) -> "CallerTokenStorage":
+        return CallerTokenStorage(self, caller_id)
+
+    @asynccontextmanager
+    async def refresh_lock(self, caller_id: str):
+        """Cross-process refresh lock for one caller.
+
+        Callers hash onto byte-range locks in one file; a collision only
+        serializes two callers' refreshes. POSIX record locks belong to the
+        process, so an asyncio lock per slot serializes within it.
+        """
+        slot = int.from_bytes(hashlib.blake2b(caller_id.encode(), digest_size=4).digest(), "big") % _REFRESH_LOCK_SLOTS
+        local = self._slot_locks.get(slot)
+        if local is None:
+            local = self._slot_locks[slot] = asyncio.Lock()
+        async with local:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            if self._refresh_lock_file is None:
+                self._refresh_lock_file = await asyncio.to_thread(open, self._refresh_lock_path, "a+")
+            fd = self._refresh_lock_file.fileno()
+
+            def try_lock() -> bool:
+                try:
+                    fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, slot)
+                    return True
+                except OSError as e:
+                    if e.errno in (errno.EACCES, errno.EAGAIN):
+                        return False
+                    raise
+
+            locked = await _acquire_polling(try_lock, self.refresh_lock_timeout)
+            try:
+                yield
+            finally:
+                if locked:
+                    fcntl.lockf(fd, fcntl.LOCK_UN, 1, slot)
+
+
+class CallerTokenStorage(TokenStorage):
+    """TokenStorage for one caller's row in a CallerTokenStore."""
+
+    def __init__(self, store: CallerTokenStore, caller_id: str):
+        self.store = store
+        self.caller_id = caller_id
+        self._row: dict | None = None
+
+    @property
+    def generation(self) -> int:
+        return self._row["generation"] if self._row else 0
+
+    @property
+    def expires_at(self) -> float | None:
+        return self._row["expires_at"] if self._row else None
+
+    async def reload(self) -> bool:
+        generation = self.generation
+        self._row = await self.store.reload(self.caller_id)
+        return self.generation != generation
+
+    async def get_tokens(self) -> OAuthToken | None:
+        self._row = await self.store.get(self.caller_id)
+        raw = self._row["tokens"] if self._row else None
+        return OAuthToken(**raw) if raw else None
+
+    async def set_tokens(self, tokens: OAuthToken) -> None:
+        expires_at = time.time() + tokens.expires_in if tokens.expires_in else None
+        self._row = await self.store.update(self.caller_id, tokens=tokens.model_dump(), expires_at=expires_at)
+        logger.info(f"Tokens saved for caller {mask_caller_id(self.caller_id)}")
+
+    async def get_client_info(self) -> OAuthClientInformationFull | None:
+        self._row = await self.store.get(self.caller_id)
+        raw = self._row["client_info"] if self._row else None
+        return OAuthClientInformationFull(**raw) if raw else None
+
+    async def set_client_info(self, client_info: OAuthClientInformationFull) -> None:
+        self._row = await self.store.update(self.caller_id, client_info=client_info.model_dump(mode="json"))
+
+    def refresh_lock(self):
+        return self.store.refresh_lock(self.caller_id)
+
+
+_caller_store: CallerTokenStore | None = None
+
+
+def get_caller_token_store() -> CallerTokenStore:
+    """Process-wide per-caller token store."""
+    global _caller_store
+    if _caller_store is None:
+        _caller_store = CallerTokenStore()
+    return _caller_store
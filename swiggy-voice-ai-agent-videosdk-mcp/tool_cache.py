@@ -0,0 +1,164 @@
+"""
+Read-through cache for idempotent Swiggy tool results.
+
+Search, menu, details and slot lookups repeat a lot within one conversation
+and across callers in the same area. Results of the tools in CACHEABLE_TOOLS
+are cached per (service, tool, canonical arguments) with a per-tool TTL and
+an LRU bound on entry count and approximate size. Tools in
+PERSONALIZED_TOOLS also key on the caller's scope so one user's results are
+never served to another.
+
+Mutating tools are never cached. Any mutating call drops every cached entry
+of its service, since carts, orders and bookings can change what the reads
+return (menus with cart state, slot availability after a booking, ...). Each
+invalidation bumps the service's generation, and a read that started before
+it is not stored, so an in-flight read cannot reinsert pre-mutation data.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Tool name -> TTL in seconds.
+CACHEABLE_TOOLS = {
+    "search_restaurants": 120.0,
+    "search_menu": 120.0,
+    "get_restaurant_menu": 300.0,
+    "search_products": 120.0,
+    "search_restaurants_dineout": 120.0,
+    "get_restaurant_details": 600.0,
+    "get_available_slots": 30.0,
+}
+
+PERSONALIZED_TOOLS = {"get_restaurant_menu", "search_menu"}
+
+MUTATING_TOOLS = {
+    "update_food_cart",
+    "flush_food_cart",
+    "apply_food_coupon",
+    "place_food_order",
+    "update_cart",
+    "clear_cart",
+    "checkout",
+    "create_cart",
+    "book_table",
+}
+
+TOOL_CACHE_MAX_ENTRIES = 512
+TOOL_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+
+def canonical_arguments(parameters: dict | None) -> str:
+    """Stable string form of tool arguments (key order does not matter)."""
+    return json.dumps(parameters or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """TTL + LRU cache of processed tool results, safe to share across threads."""
+
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+                 max_bytes: int = TOOL_CACHE_MAX_BYTES, ttls: dict[str, float] | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(CACHEABLE_TOOLS if ttls is None else ttls)
+        self._entries: OrderedDict[tuple, tuple[float, int, object]] = OrderedDict()
+        self._bytes = 0
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return tool_name in self.ttls and tool_name not in MUTATING_TOOLS
+
+    def key(self, service: str, tool_name: str, parameters: dict | None, scope: str) -> tuple:
+        user = scope if tool_name in PERSONALIZED_TOOLS else ""
+        return (service, tool_name, canonical_arguments(parameters), user)
+
+    def get(self, key: tuple):
+        """Cached result for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, result = entry
+            if time.monotonic() >= expires_at:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def generation(self, service: str) -> int:
+        """Current invalidation generation of a service; pass it to put()."""
+        return self._generations.get(service, 0)
+
+    def put(self, key: tuple, result, generation: int):
+        """Store a result read at `generation`, unless the service has been
+        invalidated since."""
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttls[key[1]]
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (expires_at, size, result)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate_service(self, service: str):
+        """Drop every cached entry of one service (after a mutating call)."""
+        with self._lock:
+            self._generations[service] = self._generations.get(service, 0) + 1
+            stale = [key for key in self._entries if key[0] == service]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+        if stale:
+            logger.info(f"Tool cache: dropped {len(stale)} {service} entries after mutation")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: tuple):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_cache: ToolResultCache | None = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Process-wide tool result cache shared by every call in this worker."""
+    global _cache
+    if _cache is None:
+        _cache = ToolResultCache()
+    return _cache
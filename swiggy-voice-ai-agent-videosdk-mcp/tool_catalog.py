@@ -0,0 +1,158 @@
+"""
+Persistent Swiggy tool catalog — shared on-disk cache of list_tools() results.
+
+Every SwiggyMCPServer (one per call in the phone worker) would otherwise
+re-list tools from all endpoints and re-sanitize every schema. The catalog
+keeps, per endpoint:
+  - the raw MCP tool definitions
+  - the sanitized input schemas
+  - a fingerprint of the server's name/version/capabilities from initialize()
+
+A fingerprint change is a miss. Entries older than the TTL are still served
+but flagged stale so the caller can revalidate in the background. Writes go
+to a temp file that is renamed into place, so readers in other worker
+processes never see a torn file.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from mcp.types import Tool
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = Path(__file__).parent / ".swiggy_tool_catalog.json"
+CATALOG_TTL_SECONDS = 6 * 60 * 60
+
+# Bump whenever the entry layout or the sanitizer output changes.
+CATALOG_FORMAT_VERSION = 1
+
+
+def server_fingerprint(init_result) -> str | None:
+    """Hash of the server identity and capabilities returned by initialize()."""
+    if init_result is None:
+        return None
+    identity = {
+        "name": init_result.serverInfo.name,
+        "version": init_result.serverInfo.version,
+        "protocol": str(init_result.protocolVersion),
+        "capabilities": init_result.capabilities.model_dump(mode="json", exclude_none=True),
+    }
+    blob = json.dumps(identity, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+class CatalogEntry:
+    """Cached tool listing for one endpoint."""
+
+    def __init__(self, url: str, fingerprint: str | None, tools: list[dict],
+                 schemas: dict[str, dict], fetched_at: float | None = None):
+        self.url = url
+        self.fingerprint = fingerprint
+        self.tools = tools
+        self.schemas = schemas
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    @classmethod
+    def from_listing(cls, url: str, fingerprint: str | None, tools: list[Tool],
+                     schemas: dict[str, dict]) -> "CatalogEntry":
+        raw = [tool.model_dump(mode="json", exclude_none=True) for tool in tools]
+        return cls(url, fingerprint, raw, schemas)
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def mcp_tools(self) -> list[Tool]:
+        return [Tool.model_validate(raw) for raw in self.tools]
+
+    def same_tools(self, other: "CatalogEntry") -> bool:
+        return self.tools == other.tools
+
+    def to_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "fetched_at": self.fetched_at,
+            "tools": self.tools,
+            "schemas": self.schemas,
+        }
+
+
+class ToolCatalogCache:
+    """JSON-file catalog shared by all worker processes.
+
+    File I/O runs in a thread so the event loop never blocks on disk. The
+    parsed file is memoized by mtime, so repeated lookups in one process only
+    re-read after another process has written.
+    """
+
+    def __init__(self, path: Path = CATALOG_FILE, ttl: float = CATALOG_TTL_SECONDS):
+        self._path = path
+        self.ttl = ttl
+        self._memo: tuple[float, dict] | None = None
+        self._write_lock = asyncio.Lock()
+
+    async def get(self, url: str, fingerprint: str | None = None) -> CatalogEntry | None:
+        """Cached entry for `url`, or None on miss or fingerprint mismatch.
+
+        Pass fingerprint=None to accept whatever version is cached (used before
+        a session exists to fingerprint).
+        """
+        entries = await asyncio.to_thread(self._read)
+        raw = entries.get(url)
+        if raw is None:
+            return None
+        if fingerprint is not None and raw.get("fingerprint") != fingerprint:
+            logger.info(f"Tool catalog for {url} is from a different server version")
+            return None
+        return CatalogEntry(url, raw.get("fingerprint"), raw["tools"],
+                            raw["schemas"], raw["fetched_at"])
+
+    def is_fresh(self, entry: CatalogEntry) -> bool:
+        return entry.age() < self.ttl
+
+    async def put(self, entry: CatalogEntry) -> None:
+        """Store one endpoint's entry, replacing the catalog file atomically."""
+        async with self._write_lock:
+            try:
+                await asyncio.to_thread(self._write_entry, entry)
+            except OSError as e:
+                logger.warning(f"Could not write tool catalog: {e}")
+
+    def _read(self) -> dict:
+        try:
+            mtime = self._path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+        if self._memo and self._memo[0] == mtime:
+            return self._memo[1]
+        try:
+            data = json.loads(self._path.read_text())
+        except (json.JSONDecodeError, OSError):
+            return {}
+        if data.get("version") != CATALOG_FORMAT_VERSION:
+            return {}
+        entries = data.get("endpoints", {})
+        self._memo = (mtime, entries)
+        return entries
+
+    def _write_entry(self, entry: CatalogEntry):
+        # Other processes may write between our read and rename; the last
+        # writer wins and a dropped entry is simply refetched on its next miss.
+        entries = dict(self._read())
+        entries[entry.url] = entry.to_dict()
+        data = {"version": CATALOG_FORMAT_VERSION, "endpoints": entries}
+
+        fd, tmp = tempfile.mkstemp(dir=self._path.parent, prefix=self._path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self._path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,278 @@
+"""
+Deadline-aware execution of Swiggy tool calls: timeouts, retries and hedging.
+
+A caller on the phone waits in silence while a tool runs, so every call gets
+a deadline instead of the MCP session's 300s read timeout:
+
+  - Turn budget: a turn may spend TURN_BUDGET seconds from the end of the
+    user's speech (taken from the turn tracer) on tool calls. All calls of
+    the turn share it; a call that would start with less than
+    MIN_ATTEMPT_TIME left fails straight away.
+  - Per-tool timeout: each attempt is bounded by TOOL_TIMEOUTS (or
+    DEFAULT_TOOL_TIMEOUT / MUTATING_TOOL_TIMEOUT) and by the turn budget.
+  - Retries: idempotent reads that time out, hit a transport error or
+    find their session dropped are retried up to READ_RETRIES times with
+    jittered exponential backoff.
+    Errors reported by the tool itself (isError results) are not retried.
+  - Hedging (optional): a read still running after its tool's recent p95
+    latency (attempts that timed out count at their timeout) gets a
+    duplicate request; the first result wins and the other is cancelled.
+
+Mutating tools (tool_cache.MUTATING_TOOLS: carts, coupons, orders, bookings)
+are never retried or hedged, so an order is placed at most once. Every
+failure surfaces as a ToolError worded for the model to say to the caller.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+
+import anyio
+import httpx
+from videosdk.agents.utils import ToolError
+
+from metrics import get_metrics, service_label
+from tool_cache import MUTATING_TOOLS
+
+logger = logging.getLogger(__name__)
+
+# Seconds from the end of the user's speech that one turn may spend on tools.
+TURN_BUDGET = 15.0
+# Do not start an attempt with less time than this left in the budget.
+MIN_ATTEMPT_TIME = 0.5
+
+DEFAULT_TOOL_TIMEOUT = 5.0
+MUTATING_TOOL_TIMEOUT = 15.0
+TOOL_TIMEOUTS = {
+    "get_restaurant_menu": 8.0,
+    "search_restaurants": 6.0,
+    "search_menu": 6.0,
+    "search_restaurants_dineout": 6.0,
+    "place_food_order": 20.0,
+    "checkout": 20.0,
+    "book_table": 20.0,
+}
+
+READ_RETRIES = 2
+RETRY_BACKOFF = (0.1, 1.0)  # first delay, cap (seconds); full jitter
+
+# Hedge a read after this percentile of its recent latencies, once
+# HEDGE_MIN_SAMPLES successful calls have been seen.
+HEDGE_READS = False
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+LATENCY_WINDOW = 200
+
+# Failures worth another attempt at an idempotent read. A session that has
+# ended is reconnected by the next attempt.
+RETRYABLE_ERRORS = (asyncio.TimeoutError, httpx.TransportError, ConnectionError,
+                    anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+def is_idempotent(tool_name: str) -> bool:
+    return tool_name not in MUTATING_TOOLS
+
+
+def turn_deadline(anchor: float | None = None, budget: float = TURN_BUDGET) -> float:
+    """perf_counter() deadline for tool calls of the turn that began at `anchor`."""
+    return (time.perf_counter() if anchor is None else anchor) + budget
+
+
+class LatencyTracker:
+    """Rolling window of call latencies per tool.
+
+    Attempts that time out are recorded at the time they were given, a lower
+    bound on their latency, so a slow tail still raises the percentiles.
+    Attempts that fail otherwise are not recorded.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: dict[str, deque] = {}
+
+    def record(self, tool_name: str, seconds: float):
+        samples = self._samples.get(tool_name)
+        if samples is None:
+            samples = self._samples[tool_name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, tool_name: str, pct: float, min_samples: int = HEDGE_MIN_SAMPLES) -> float | None:
+        samples = self._samples.get(tool_name)
+        if samples is None or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class ToolExecutionPolicy:
+    """Runs one tool call against a deadline with the retry/hedge rules above.
+
+    `attempt` is a zero-argument coroutine function making one network call;
+    it raises ToolError for errors reported by the tool.
+    """
+
+    def __init__(
+        self,
+        timeouts: dict[str, float] | None = None,
+        retries: int = READ_RETRIES,
+        hedging: bool = HEDGE_READS,
+    ):
+        self.timeouts = dict(TOOL_TIMEOUTS if timeouts is None else timeouts)
+        self.retries = retries
+        self.hedging = hedging
+        self.latency = LatencyTracker()
+        self.stats = {"retries": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "budget_exhausted": 0,
+                      "rejected": 0}
+
+    def timeout_for(self, tool_name: str) -> float:
+        default = DEFAULT_TOOL_TIMEOUT if is_idempotent(tool_name) else MUTATING_TOOL_TIMEOUT
+        return self.timeouts.get(tool_name, default)
+
+    async def run(self, service: str, tool_name: str, attempt, deadline: float, breaker=None):
+        """Call `attempt` until it succeeds, the retries run out or the
+        deadline is near. With a circuit_breaker.CircuitBreaker, the call is
+        rejected while it is open and its outcome is recorded once, after
+        its retries: one slow read must not count as several failures."""
+        idempotent = is_idempotent(tool_name)
+        labels = {"service": service_label(service), "tool": tool_name}
+        generation = breaker.generation if breaker is not None else None
+        last_error: BaseException | None = None
+        for attempt_index in range(1 + (self.retries if idempotent else 0)):
+            if breaker is not None and not breaker.allow():
+                if attempt_index == 0:
+                    raise self._rejected(service, tool_name, labels)
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining < MIN_ATTEMPT_TIME:
+                break
+            timeout = min(self.timeout_for(tool_name), remaining)
+            started = time.perf_counter()
+            try:
+                if idempotent and self.hedging:
+                    result = await self._hedged(tool_name, attempt, timeout, labels)
+                else:
+                    result = await self._timed(tool_name, attempt, timeout)
+            except ToolError:
+                # The service answered; the tool itself reported the error.
+                if breaker is not None:
+                    breaker.record_success(time.perf_counter() - started, generation)
+                raise
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["timeouts"] += 1
+                if not idempotent:
+                    break
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record_failure(_describe(e), generation)
+                raise ToolError(f"'{tool_name}' failed: could not reach Swiggy ({_describe(e)}). "
+                                f"Tell the user the service is having trouble.") from e
+            else:
+                if breaker is not None:
+                    breaker.record_success(time.perf_counter() - started, generation)
+                return result
+
+            backoff = random.uniform(0, min(RETRY_BACKOFF[1], RETRY_BACKOFF[0] * 2 ** attempt_index))
+            if deadline - time.perf_counter() - backoff < MIN_ATTEMPT_TIME:
+                break
+            self.stats["retries"] += 1
+            get_metrics().inc("swiggy_tool_retries_total", labels)
+            logger.info(f"Retrying '{tool_name}' after {_describe(last_error)} (attempt {attempt_index + 2})")
+            await asyncio.sleep(backoff)
+
+        if breaker is not None and last_error is not None:
+            breaker.record_failure(_describe(last_error), generation)
+        raise self._failure(tool_name, idempotent, last_error, labels)
+
+    async def _timed(self, tool_name: str, attempt, timeout: float):
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(attempt(), timeout)
+        except asyncio.TimeoutError:
+            self.latency.record(tool_name, timeout)
+            raise
+        self.latency.record(tool_name, time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, tool_name: str, attempt, timeout: float, labels: dict):
+        """Primary request plus, if it is still running after the tool's p95
+        latency, one duplicate. First success wins; the other is cancelled."""
+        delay = self.latency.percentile(tool_name, HEDGE_PERCENTILE)
+        if delay is None or max(delay, HEDGE_MIN_DELAY) >= timeout:
+            return await self._timed(tool_name, attempt, timeout)
+
+        started = time.perf_counter()
+        ends_at = started + timeout
+        primary = asyncio.ensure_future(attempt())
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=max(delay, HEDGE_MIN_DELAY))
+            if not done:
+                self.stats["hedges"] += 1
+                get_metrics().inc("swiggy_tool_hedges_total", labels)
+                pending.add(asyncio.ensure_future(attempt()))
+            error = None
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        self.stats["hedge_wins"] += task is not primary
+                        self.latency.record(tool_name, time.perf_counter() - started)
+                        return task.result()
+                    error = error or task.exception()
+                if not pending:
+                    break
+                remaining = ends_at - time.perf_counter()
+                done = set()
+                if remaining > 0:
+                    done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.latency.record(tool_name, timeout)
+                    raise asyncio.TimeoutError()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _rejected(self, service: str, tool_name: str, labels: dict) -> ToolError:
+        self.stats["rejected"] += 1
+        get_metrics().inc("swiggy_tool_calls_rejected_total", labels)
+        return ToolError(f"Swiggy {service_label(service).title()} is unavailable right now, so "
+                         f"'{tool_name}' was not run. Tell the user and offer to try again in a "
+                         f"minute or help with something else.")
+
+    def _failure(self, tool_name: str, idempotent: bool, error: BaseException | None, labels: dict) -> ToolError:
+        if error is None:
+            self.stats["budget_exhausted"] += 1
+            get_metrics().inc("swiggy_tool_deadline_exceeded_total", labels)
+            return ToolError(f"'{tool_name}' was not run: this turn is out of time. Tell the user "
+                             f"Swiggy is slow right now and offer to try again.")
+        if not idempotent:
+            return ToolError(f"'{tool_name}' did not complete ({_describe(error)}). It may or may not "
+                             f"have gone through. Do not call it again; ask the user to check the "
+                             f"Swiggy app before retrying.")
+        return ToolError(f"'{tool_name}' failed ({_describe(error)}). Tell the user Swiggy is "
+                         f"responding slowly and offer to try again.")
+
+
+def _describe(error: BaseException | None) -> str:
+    if isinstance(error, asyncio.TimeoutError):
+        return "timed out"
+    if error is None:
+        return "no time left"
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+_policy: ToolExecutionPolicy | None = None
+
+
+def get_tool_policy() -> ToolExecutionPolicy:
+    """Process-wide policy, so latency percentiles are shared across calls."""
+    global _policy
+    if _policy is None:
+        _policy = ToolExecutionPolicy()
+    return _policy
@@ -0,0 +1,349 @@
+"""
+Per-turn voice latency tracing for the cascading and realtime agents.
+
+The VideoSDK framework reports every pipeline stage to its metrics
+collectors (on_user_speech_end, on_eou_complete, on_stt_complete,
+on_llm_first_token, on_tts_first_byte, on_agent_speech_start, ... and the
+realtime set_user_speech_end / set_agent_speech_start). TurnTracer wraps
+those collector methods to timestamp each stage, and SwiggyMCPServer adds a
+span for every tool call.
+
+A turn runs from the user starting to speak until the next user turn (or
+the end of the session). For each turn one span tree is written:
+
+  turn
+  ├── turn_detector      eou start -> turn-detector decision
+  ├── stt_final          end of user speech -> STT final transcript
+  ├── llm_first_token    LLM request -> first token
+  ├── llm                LLM request -> last completion
+  ├── tool.<name>        each MCP tool call
+  ├── tts_first_byte     TTS request -> first audio byte
+  ├── playback_start     end of user speech -> agent audio starts
+  └── playback           agent audio start -> end
+
+Stages whose marks never fire (e.g. STT and TTS in the realtime pipeline)
+are omitted. Spans go to TRACE_DIR/turns-<pid>.jsonl, one JSON object per
+line, and to an OTLP collector as well when OTEL_EXPORTER_OTLP_ENDPOINT is
+set and the OpenTelemetry SDK is installed.
+
+Report: python benchmarks/turn_report.py [.swiggy_traces]
+"""
+
+import inspect
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    OTLP_AVAILABLE = True
+except ImportError:
+    OTLP_AVAILABLE = False
+
+TRACE_DIR = Path(__file__).parent / ".swiggy_traces"
+
+# Framework metrics-collector method -> mark name. Covers the 0.0.x
+# Cascading/RealtimeMetricsCollector and the unified 1.x MetricsCollector.
+COLLECTOR_CLASSES = ("CascadingMetricsCollector", "RealtimeMetricsCollector", "MetricsCollector")
+COLLECTOR_HOOKS = {
+    "on_user_speech_start": "user_speech_start",
+    "set_user_speech_start": "user_speech_start",
+    "on_user_speech_end": "user_speech_end",
+    "set_user_speech_end": "user_speech_end",
+    "on_eou_start": "eou_start",
+    "on_eou_complete": "eou_decision",
+    "on_stt_start": "stt_start",
+    "on_stt_complete": "stt_final",
+    "on_llm_start": "llm_start",
+    "on_llm_first_token": "llm_first_token",
+    "on_llm_complete": "llm_complete",
+    "on_tts_start": "tts_start",
+    "on_tts_first_byte": "tts_first_byte",
+    "on_agent_speech_start": "playback_start",
+    "set_agent_speech_start": "playback_start",
+    "on_agent_speech_end": "playback_end",
+    "set_agent_speech_end": "playback_end",
+    "on_interrupted": "interrupted",
+    "set_interrupted": "interrupted",
+}
+
+# Stage span -> (start mark, end mark, which end mark occurrence)
+STAGES = {
+    "turn_detector": ("eou_start", "eou_decision", "first"),
+    "stt_final": ("user_speech_end", "stt_final", "first"),
+    "llm_first_token": ("llm_start", "llm_first_token", "first"),
+    "llm": ("llm_start", "llm_complete", "last"),
+    "tts_first_byte": ("tts_start", "tts_first_byte", "first"),
+    "playback_start": ("user_speech_end", "playback_start", "first"),
+    "playback": ("playback_start", "playback_end", "last"),
+}
+
+# Marks after which the caller is waiting on the agent (TurnTracer.turn_anchor).
+TURN_ANCHOR_MARKS = ("user_speech_end", "stt_final", "eou_decision")
+
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+
+def _span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class _Turn:
+    def __init__(self, index: int):
+        self.index = index
+        self.trace_id = uuid.uuid4().hex
+        self.span_id = _span_id()
+        self.started = time.perf_counter()
+        self.marks: dict[str, list[float]] = {}
+        self.spans: list[tuple[str, float, float, dict]] = []
+
+    def mark(self, name: str, at: float):
+        self.marks.setdefault(name, []).append(at)
+
+    def stage(self, start_mark: str, end_mark: str, which: str) -> tuple[float, float] | None:
+        if start_mark not in self.marks or end_mark not in self.marks:
+            return None
+        start = self.marks[start_mark][0]
+        ends = [t for t in self.marks[end_mark] if t >= start]
+        if not ends:
+            return None
+        return start, ends[0] if which == "first" else ends[-1]
+
+    def ended(self) -> float:
+        times = [t for marks in self.marks.values() for t in marks]
+        times.extend(end for _, _, end, _ in self.spans)
+        return max(times, default=self.started)
+
+
+class _OTLPExporter:
+    """Replays finished turn span trees to an OTLP/HTTP collector.
+
+    Spans are batched in the background and flushed at process exit.
+    """
+
+    def __init__(self, endpoint: str):
+        provider = TracerProvider(resource=Resource.create({"service.name": "swiggy-voice-agent"}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        self._provider = provider
+        self._tracer = provider.get_tracer("swiggy_voice.turns")
+
+    def export(self, records: list[dict]):
+        root, children = records[0], records[1:]
+        root_span = self._tracer.start_span(
+            root["name"], start_time=_ns(root["start_ts"]), attributes=_otel_attributes(root)
+        )
+        context = otel_trace.set_span_in_context(root_span)
+        for record in children:
+            span = self._tracer.start_span(
+                record["name"], context=context, start_time=_ns(record["start_ts"]),
+                attributes=_otel_attributes(record),
+            )
+            span.end(end_time=_ns(record["start_ts"] + record["duration_ms"] / 1000))
+        root_span.end(end_time=_ns(root["start_ts"] + root["duration_ms"] / 1000))
+
+
+def _ns(epoch_seconds: float) -> int:
+    return int(epoch_seconds * 1e9)
+
+
+def _otel_attributes(record: dict) -> dict:
+    attributes = {"session.id": record["session_id"], "agent": record["agent"], "turn": record["turn"]}
+    for key, value in record["attributes"].items():
+        attributes[key] = value if isinstance(value, (str, bool, int, float)) else json.dumps(value)
+    return attributes
+
+
+class TurnTracer:
+    """Collects stage marks and tool spans for the current turn of a session."""
+
+    def __init__(self, directory: Path = TRACE_DIR, otlp_endpoint: str | None = None):
+        self.directory = directory
+        self.path = directory / f"turns-{os.getpid()}.jsonl"
+        self.session_id: str | None = None
+        self.agent = ""
+        self._turn: _Turn | None = None
+        self._turns = 0
+        self._otlp = None
+        otlp_endpoint = otlp_endpoint or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+        if otlp_endpoint and not OTLP_AVAILABLE:
+            logger.warning("OTLP endpoint set but opentelemetry-sdk is not installed; JSONL only")
+        elif otlp_endpoint:
+            if "/v1/traces" not in otlp_endpoint:
+                otlp_endpoint = otlp_endpoint.rstrip("/") + "/v1/traces"
+            self._otlp = _OTLPExporter(otlp_endpoint)
+
+    def start_session(self, agent: str, session_id: str | None = None):
+        """Begin tracing a conversation; ends any session still open."""
+        self.end_session()
+        instrument_framework()
+        self.directory.mkdir(exist_ok=True)
+        self.session_id = session_id or uuid.uuid4().hex
+        self.agent = agent
+        self._turns = 0
+
+    def end_session(self):
+        if self.session_id is None:
+            return
+        self._finish_turn()
+        self.session_id = None
+
+    def mark(self, name: str):
+        """Timestamp a pipeline stage in the current turn."""
+        if self.session_id is None:
+            return
+        if name == "user_speech_start":
+            self._finish_turn()
+        self._current().mark(name, time.perf_counter())
+
+    def turn_anchor(self) -> float | None:
+        """perf_counter() time the user last finished speaking in this turn
+        (end of speech, final transcript or turn-detector decision), if any."""
+        if self.session_id is None or self._turn is None:
+            return None
+        times = [self._turn.marks[name][-1] for name in TURN_ANCHOR_MARKS if name in self._turn.marks]
+        return max(times, default=None)
+
+    def agent_speaking(self) -> bool:
+        """Whether agent audio started in this turn and has not ended."""
+        if self.session_id is None or self._turn is None:
+            return False
+        marks = self._turn.marks
+        if "playback_start" not in marks:
+            return False
+        return marks["playback_start"][-1] > max(marks.get("playback_end", []) + marks.get("interrupted", []), default=0.0)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block (e.g. a tool call) as a child span of the current turn."""
+        if self.session_id is None:
+            yield attributes
+            return
+        turn = self._current()
+        started = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes["error"] = type(e).__name__
+            raise
+        finally:
+            turn.spans.append((name, started, time.perf_counter(), attributes))
+
+    def _current(self) -> _Turn:
+        if self._turn is None:
+            self._turns += 1
+            self._turn = _Turn(self._turns)
+        return self._turn
+
+    def _finish_turn(self):
+        turn, self._turn = self._turn, None
+        if turn is None:
+            return
+        records = self._records(turn)
+        try:
+            with open(self.path, "a") as f:
+                f.write("".join(json.dumps(record) + "\n" for record in records))
+        except OSError as e:
+            logger.warning(f"Could not write turn trace: {e}")
+        if self._otlp is not None:
+            try:
+                self._otlp.export(records)
+            except Exception as e:
+                logger.warning(f"OTLP export failed: {e}")
+
+    def _records(self, turn: _Turn) -> list[dict]:
+        def record(name, span_id, parent, start, end, attributes):
+            return {
+                "trace_id": turn.trace_id,
+                "span_id": span_id,
+                "parent_span_id": parent,
+                "name": name,
+                "session_id": self.session_id,
+                "agent": self.agent,
+                "turn": turn.index,
+                "start_ts": round(start + _EPOCH_OFFSET, 6),
+                "duration_ms": round((end - start) * 1000, 3),
+                "attributes": attributes,
+            }
+
+        marks = {name: round((times[0] - turn.started) * 1000, 3) for name, times in turn.marks.items()}
+        root = record("turn", turn.span_id, None, turn.started, turn.ended(), {"marks_ms": marks})
+        records = [root]
+        for stage, (start_mark, end_mark, which) in STAGES.items():
+            window = turn.stage(start_mark, end_mark, which)
+            if window is not None:
+                records.append(record(stage, _span_id(), turn.span_id, *window, {}))
+        for name, start, end, attributes in turn.spans:
+            records.append(record(name, _span_id(), turn.span_id, start, end, attributes))
+        return records
+
+
+_tracer: TurnTracer | None = None
+
+
+def get_turn_tracer() -> TurnTracer:
+    """Process-wide turn tracer (one conversation per job process at a time)."""
+    global _tracer
+    if _tracer is None:
+        _tracer = TurnTracer()
+    return _tracer
+
+
+_instrumented = False
+
+
+def instrument_framework():
+    """Wrap the VideoSDK metrics collectors' stage hooks to feed TurnTracer."""
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+    try:
+        from videosdk.agents import metrics as framework_metrics
+    except ImportError:
+        logger.warning("videosdk.agents.metrics not available; only tool spans are traced")
+        return
+
+    hooked = 0
+    for class_name in COLLECTOR_CLASSES:
+        collector_class = getattr(framework_metrics, class_name, None)
+        if collector_class is None:
+            continue
+        for method_name, mark_name in COLLECTOR_HOOKS.items():
+            method = collector_class.__dict__.get(method_name)
+            if method is not None:
+                setattr(collector_class, method_name, _marking(method, mark_name))
+                hooked += 1
+    logger.info(f"Turn tracing attached to {hooked} framework pipeline hooks")
+
+
+def _marking(method, mark_name: str):
+    if inspect.iscoroutinefunction(method):
+        @wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            _safe_mark(mark_name)
+            return await method(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        _safe_mark(mark_name)
+        return method(*args, **kwargs)
+    return wrapper
+
+
+def _safe_mark(mark_name: str):
+    try:
+        get_turn_tracer().mark(mark_name)
+    except Exception as e:
+        logger.debug(f"Turn tracing mark '{mark_name}' failed: {e}")
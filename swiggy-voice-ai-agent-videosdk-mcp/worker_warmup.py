@@ -0,0 +1,170 @@
+"""
+Pre-warm for the phone worker and its job processes.
+
+A cold call pays for everything the worker has not done yet: importing the
+framework and plugins, checking the Swiggy login, listing tools from every
+endpoint and dialling MCP sessions. The worker is warmed in two stages:
+
+  prewarm_worker()     worker main process, before job.start() registers
+                       it, so no call is offered until it has:
+                         - imported the plugins (`plugins`)
+                         - run model downloads/loads (`models`)
+                         - validated the shared Swiggy login, refreshing a
+                           token that is about to expire
+                         - filled the on-disk tool catalog for endpoints
+                           missing from it or stale
+  warm_job_process()   each job process as it is forked: starts the
+                       session pool, which connects a session set on its
+                       own loop thread while the process starts up (with
+                       `wait`, blocks up to that long for one).
+                       The pool holds shared-login sessions, so this only
+                       runs once prewarm_worker(shared_login=True) has found
+                       that login stored (SHARED_POOL_ENV); otherwise the
+                       job process skips it.
+
+Job processes are forked from the framework's forkserver, which imports the
+agent module once, so module-level imports are paid once per worker.
+install_process_warmup() starts warm_job_process() after every fork
+without waiting, so the at-fork hook never blocks; the entrypoint calls it
+too, which covers spawn-based platforms (a no-op once warm).
+
+Each step is timed in swiggy_worker_warmup_seconds{step}.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+
+from metrics import timed
+from session_pool import get_session_pool
+from swiggy_mcp import (
+    SWIGGY_MCP_ENDPOINTS,
+    TOKEN_REFRESH_MARGIN,
+    SwiggyMCPServer,
+    create_oauth_provider,
+)
+from token_store import FileTokenStorage
+from tool_catalog import ToolCatalogCache
+
+logger = logging.getLogger(__name__)
+
+# Framework default for how long a new job process may take to report ready
+# is 10s; stay well inside it.
+PROCESS_WARMUP_TIMEOUT = 5.0
+
+# Set by prewarm_worker() once the shared login is enabled and stored; the
+# job processes (forked from a forkserver started later) inherit it.
+SHARED_POOL_ENV = "SWIGGY_SHARED_POOL_READY"
+
+_process_warm = False
+
+
+async def prewarm_worker(
+    plugins: tuple[str, ...] = (),
+    models: tuple = (),
+    endpoints: dict[str, str] | None = None,
+    storage=None,
+    catalog: ToolCatalogCache | None = None,
+    shared_login: bool = False,
+) -> dict[str, str]:
+    """Warm the worker before it registers; returns each step's outcome.
+
+    `models` are blocking callables (e.g. pre_download_model), run in a
+    thread. A missing login is reported, not raised: the worker still starts
+    and calls fail the way they would without the pre-warm. With
+    `shared_login` (calls may use the shared login) and a valid shared
+    login, job processes warm its session pool.
+    """
+    endpoints = dict(endpoints or SWIGGY_MCP_ENDPOINTS)
+    catalog = catalog or ToolCatalogCache()
+    storage = storage or FileTokenStorage()
+    report = {}
+    started = time.perf_counter()
+
+    with timed("swiggy_worker_warmup_seconds", {"step": "imports"}):
+        for module in plugins:
+            importlib.import_module(module)
+    report["imports"] = f"{len(plugins)} modules"
+
+    with timed("swiggy_worker_warmup_seconds", {"step": "models"}):
+        for load in models:
+            await asyncio.to_thread(load)
+    report["models"] = f"{len(models)} loaded"
+
+    auth = create_oauth_provider(storage=storage)
+    with timed("swiggy_worker_warmup_seconds", {"step": "token"}):
+        if await storage.get_tokens() is None:
+            report["token"] = "missing"
+            logger.warning("No Swiggy login stored; run `python swiggy_mcp.py` before taking calls")
+        else:
+            report["token"] = await auth.refresh_ahead(TOKEN_REFRESH_MARGIN)
+
+    with timed("swiggy_worker_warmup_seconds", {"step": "catalog"}):
+        entries = await asyncio.gather(*(catalog.get(url) for url in endpoints.values()))
+        cold = {name: url for (name, url), entry in zip(endpoints.items(), entries)
+                if entry is None or not catalog.is_fresh(entry)}
+        if not cold:
+            report["catalog"] = "fresh"
+        elif report["token"] in ("missing", "failed"):
+            report["catalog"] = f"{len(cold)} endpoints not cached (no valid login)"
+        else:
+            server = SwiggyMCPServer(endpoints=cold, auth=auth, catalog=catalog)
+            try:
+                await server.connect()
+                written = await server.refresh_catalog()
+                report["catalog"] = f"listed {sorted(written)}"
+            except Exception as e:
+                report["catalog"] = f"failed: {e}"
+                logger.warning(f"Could not pre-fill the tool catalog: {e}")
+            finally:
+                await server.disconnect()
+
+    if shared_login and report["token"] not in ("missing", "failed"):
+        os.environ[SHARED_POOL_ENV] = "1"
+        report["pool"] = "warmed per job process"
+    else:
+        os.environ.pop(SHARED_POOL_ENV, None)
+        report["pool"] = "skipped"
+
+    logger.info(f"Worker warm in {time.perf_counter() - started:.1f}s: {report}")
+    return report
+
+
+def warm_job_process(pool=None, wait: float = PROCESS_WARMUP_TIMEOUT) -> bool:
+    """Start this job process's session pool, waiting up to `wait` seconds
+    (on the pool's ready event) for a connected set; returns True once the
+    pool has one.
+
+    Without an explicit `pool`, the shared-login pool is only warmed when
+    prewarm_worker() set SHARED_POOL_ENV; otherwise this returns False.
+    """
+    global _process_warm
+    if _process_warm:
+        return True
+    if pool is None and os.environ.get(SHARED_POOL_ENV) != "1":
+        return False
+    _process_warm = True
+    pool = pool or get_session_pool()
+    with timed("swiggy_worker_warmup_seconds", {"step": "process"}):
+        pool.start()
+        ready = pool.wait_ready(wait) if wait else pool.stats()["idle"] >= 1
+    if wait:
+        logger.info(f"Job process {os.getpid()} warm: {pool.stats()}" if ready
+                    else f"Job process {os.getpid()} still connecting its session pool after {wait:.0f}s")
+    return ready
+
+
+def _start_job_process_warmup():
+    warm_job_process(wait=0)
+
+
+def install_process_warmup():
+    """Start warm_job_process() in every process forked from this one.
+
+    The at-fork hook must not block the new process, so it only starts the
+    pool (its own loop thread connects in the background) without waiting.
+    """
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_start_job_process_warmup)